@@ -0,0 +1,545 @@
+"""Throughput and peak memory benchmarks for transducers and reducers.
+
+Each transducer factory in transducer.transducers is timed under each of the
+transducible processes - eager, lazy, react, coop and lazy_coop - alongside an
+equivalent built from itertools or a plain generator. Each reducer in
+transducer.reducers is timed under the processes which accept a reducer,
+eager for synchronous reducers and coop for asynchronous ones, alongside an
+equivalent built-in.
+
+Usage:
+
+    python benchmarks/bench_transducers.py --sizes 1000 100000 --output results.json
+    python benchmarks/bench_transducers.py --compare results.json
+
+Results are written as JSON, so that runs from different versions can be
+compared with --compare, which exits with a non-zero status if any benchmark
+has slowed by more than --threshold.
+"""
+import argparse
+import asyncio
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+import inspect
+from itertools import accumulate, chain, dropwhile, groupby, islice, repeat, takewhile, tee
+import json
+from math import log, log1p
+import operator
+import os
+import platform
+from random import Random
+import statistics
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import transducer
+from transducer import coop, eager, lazy, lazy_coop, react
+from transducer import reducers
+from transducer import sketches
+from transducer import transducers as t
+from transducer.functional import compose
+from transducer.infrastructure import Transducer
+from transducer.sinks import CollectingSink
+from transducer.sources import iterable_source
+
+
+DEFAULT_SIZES = (100, 10000, 1000000)
+ENGINES = ('eager', 'lazy', 'react', 'coop', 'lazy_coop')
+
+
+# Module level functions, so that the benchmarks measure the transducers
+# rather than differences in the cost of calling lambdas and built-ins.
+
+def square(x):
+    return x * x
+
+
+def is_even(x):
+    return x % 2 == 0
+
+
+def pair(x):
+    return (x, x)
+
+
+def never(x):
+    return False
+
+
+def is_negative(x):
+    return x < 0
+
+
+def is_positive(x):
+    return x > 0
+
+
+def halve(x):
+    return x // 2
+
+
+def modulo(x):
+    return x % 1024
+
+
+async def asquare(x):
+    return x * x
+
+
+async def discard(batch):
+    pass
+
+
+class _NullStream:
+
+    def write(self, item):
+        pass
+
+    async def drain(self):
+        pass
+
+
+def _distinct(items):
+    seen = set()
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            yield item
+
+
+def _pairwise(items):
+    a, b = tee(items)
+    next(b, None)
+    return zip(a, b)
+
+
+def _batching(items, size):
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _windowing(items, size):
+    window = deque(maxlen=size)
+    for item in items:
+        window.append(item)
+        yield tuple(window)
+    while len(window) > 1:
+        window.popleft()
+        yield tuple(window)
+
+
+def _tumbling(items, duration):
+    return [(start, start + duration, sum(group))
+            for start, group in groupby(items, key=lambda item: item - item % duration)]
+
+
+def _sliding(items, duration, every):
+    windows = {}
+    for item in items:
+        start = item - item % every
+        while start > item - duration:
+            windows[start] = windows.get(start, 0) + item
+            start -= every
+    return [(start, start + duration, total) for start, total in sorted(windows.items())]
+
+
+def _grouping_by(items, key):
+    groups = {}
+    for item in items:
+        k = key(item)
+        groups[k] = groups.get(k, 0) + item
+    return list(groups.items())
+
+
+def _sampling(items, rate, seed):
+    # Geometric skips, drawn exactly as by sampling(), so that the samples match.
+    rng = Random(seed)
+    log_complement = log1p(-rate)
+    sampled = []
+    index = int(log(1.0 - rng.random()) / log_complement)
+    while index < len(items):
+        sampled.append(items[index])
+        index += 1 + int(log(1.0 - rng.random()) / log_complement)
+    return sampled
+
+
+def _partitioning_by_pairwise(items, key):
+    previous = {}
+    pairs = []
+    for item in items:
+        k = key(item)
+        if k in previous:
+            pairs.append((previous[k], item))
+        previous[k] = item
+    return pairs
+
+
+def _mapping_concurrent(items):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        return list(executor.map(square, items))
+
+
+def _amapping(items):
+    async def run():
+        return [await asquare(item) for item in items]
+    return asyncio.run(run())
+
+
+# Each transducer case is (name, transducer factory, baseline, engines). The
+# factory accepts the input size, and the baseline accepts the input items and
+# returns the equivalent list of output items.
+TRANSDUCER_CASES = [
+    ('mapping', lambda n: t.mapping(square),
+     lambda items: list(map(square, items)), ENGINES),
+    ('mapping_concurrent', lambda n: t.mapping_concurrent(square, max_workers=4),
+     _mapping_concurrent, ENGINES),
+    ('amapping', lambda n: t.amapping(asquare, concurrency=8),
+     _amapping, ('coop', 'lazy_coop')),
+    ('filtering', lambda n: t.filtering(is_even),
+     lambda items: list(filter(is_even, items)), ENGINES),
+    ('reducing', lambda n: t.reducing(operator.add),
+     lambda items: [reduce(operator.add, items)], ENGINES),
+    ('scanning', lambda n: t.scanning(operator.add),
+     lambda items: list(accumulate(items)), ENGINES),
+    ('enumerating', lambda n: t.enumerating(),
+     lambda items: list(enumerate(items)), ENGINES),
+    ('mapcatting', lambda n: t.mapcatting(pair),
+     lambda items: list(chain.from_iterable(map(pair, items))), ENGINES),
+    ('taking', lambda n: t.taking(n // 2),
+     lambda items: list(islice(items, max(len(items) // 2, 1))), ENGINES),
+    ('taking_while', lambda n: t.taking_while(is_positive),
+     lambda items: list(takewhile(is_positive, items)), ENGINES),
+    ('dropping', lambda n: t.dropping(n // 2),
+     lambda items: list(islice(items, len(items) // 2, None)), ENGINES),
+    ('dropping_while', lambda n: t.dropping_while(is_negative),
+     lambda items: list(dropwhile(is_negative, items)), ENGINES),
+    ('distinct', lambda n: compose(t.mapping(modulo), t.distinct()),
+     lambda items: list(_distinct(map(modulo, items))), ENGINES),
+    ('distinct_lru', lambda n: compose(t.mapping(modulo), t.distinct(max_size=2048)),
+     lambda items: list(_distinct(map(modulo, items))), ENGINES),
+    ('distinct_approximate', lambda n: compose(t.mapping(modulo), t.distinct(max_size=2048, approximate=True)),
+     lambda items: list(_distinct(map(modulo, items))), ENGINES),
+    ('pairwise', lambda n: t.pairwise(),
+     lambda items: list(_pairwise(items)), ENGINES),
+    ('batching', lambda n: t.batching(16),
+     lambda items: list(_batching(items, 16)), ENGINES),
+    ('windowing', lambda n: t.windowing(3),
+     lambda items: list(_windowing(items, 3)), ENGINES),
+    ('windowing_view', lambda n: compose(t.windowing(64, view=True), t.mapping(sum)),
+     lambda items: list(map(sum, _windowing(items, 64))), ENGINES),
+    ('pairwise_view', lambda n: compose(t.pairwise(view=True), t.mapping(sum)),
+     lambda items: list(map(sum, _pairwise(items))), ENGINES),
+    ('windowed_reducing', lambda n: t.windowed_reducing(64, operator.add, operator.sub),
+     lambda items: list(map(sum, _windowing(items, 64))), ENGINES),
+    ('windowed_reducing_max', lambda n: t.windowed_reducing(64, max),
+     lambda items: list(map(max, _windowing(items, 64))), ENGINES),
+    ('tumbling', lambda n: t.tumbling(64, reducer=reducers.completing(operator.add, 0, operator.add)),
+     lambda items: _tumbling(items, 64), ENGINES),
+    ('sliding', lambda n: t.sliding(128, 64, reducer=reducers.completing(operator.add, 0, operator.add)),
+     lambda items: _sliding(items, 128, 64), ENGINES),
+    ('session', lambda n: t.session(2, reducer=reducers.completing(operator.add, 0, operator.add)),
+     lambda items: [(items[0], items[-1] + 2, sum(items))], ENGINES),
+    ('first', lambda n: t.first(never),
+     lambda items: list(islice(filter(never, items), 1)), ENGINES),
+    ('last', lambda n: t.last(),
+     lambda items: list(deque(items, maxlen=1)), ENGINES),
+    ('element_at', lambda n: t.element_at(n - 1),
+     lambda items: list(islice(items, len(items) - 1, len(items))), ENGINES),
+    ('repeating', lambda n: t.repeating(2),
+     lambda items: list(chain.from_iterable(map(repeat, items, repeat(2)))), ENGINES),
+    ('reversing', lambda n: t.reversing(),
+     lambda items: list(reversed(list(items))), ENGINES),
+    ('ordering', lambda n: t.ordering(key=modulo),
+     lambda items: sorted(items, key=modulo), ENGINES),
+    ('ordering_top', lambda n: compose(t.ordering(key=modulo), t.taking(10)),
+     lambda items: sorted(items, key=modulo)[:10], ENGINES),
+    ('grouping_by', lambda n: t.grouping_by(modulo, reducer=reducers.completing(operator.add, 0, operator.add)),
+     lambda items: _grouping_by(items, modulo), ENGINES),
+    ('grouping_runs', lambda n: t.grouping_runs(halve, reducer=reducers.completing(operator.add, 0, operator.add)),
+     lambda items: [(k, sum(group)) for k, group in groupby(items, key=halve)], ENGINES),
+    ('distinct_consecutive', lambda n: t.distinct_consecutive(halve),
+     lambda items: [next(group) for _, group in groupby(items, key=halve)], ENGINES),
+    ('partitioning_by', lambda n: t.partitioning_by(modulo, t.pairwise()),
+     lambda items: _partitioning_by_pairwise(items, modulo), ENGINES),
+    ('sampling', lambda n: t.sampling(0.01, seed=0),
+     lambda items: _sampling(items, 0.01, 0), ENGINES),
+    ('reservoir_sampling', lambda n: compose(t.reservoir_sampling(100, seed=0), t.counting()),
+     lambda items: [min(len(items), 100)], ENGINES),
+    ('sampling_by', lambda n: compose(t.sampling_by(modulo, 2, seed=0), t.counting()),
+     lambda items: [sum(min(n, 2) for n in Counter(map(modulo, items)).values())], ENGINES),
+    ('counting', lambda n: t.counting(is_even),
+     lambda items: [sum(1 for item in items if is_even(item))], ENGINES),
+]
+
+
+async def _aputting(items):
+    queue = asyncio.Queue()
+    for item in items:
+        await queue.put(item)
+    return queue.qsize()
+
+
+def _run_async(loop, awaitable):
+    return loop.run_until_complete(awaitable)
+
+
+# Each reducer case is (name, reducer factory, transducer, baseline, engine).
+# The reducer factory is called for each run, since some reducers are stateful.
+REDUCER_CASES = [
+    ('appending', reducers.appending, Transducer,
+     list, 'eager'),
+    ('conjoining', reducers.conjoining, Transducer,
+     tuple, 'eager'),
+    ('adding', reducers.adding, Transducer,
+     set, 'eager'),
+    ('expecting_single', reducers.expecting_single, t.last(),
+     lambda items: deque(items, maxlen=1)[0], 'eager'),
+    ('sending', reducers.sending, Transducer,
+     lambda items: deque(items, maxlen=0), 'eager'),
+    ('completing', lambda: reducers.completing(operator.add, 0, operator.add), Transducer,
+     sum, 'eager'),
+    ('effecting', lambda: reducers.effecting(square), Transducer,
+     lambda items: deque(map(square, items), maxlen=1)[0], 'eager'),
+    ('broadcasting', lambda: reducers.broadcasting((Transducer, reducers.completing(operator.add, 0, operator.add)),
+                                                   (t.mapping(modulo), reducers.adding())), Transducer,
+     lambda items: (sum(items), set(map(modulo, items))), 'eager'),
+    ('hyperloglog', sketches.hyperloglog, t.mapping(modulo),
+     lambda items: len(set(map(modulo, items))), 'eager'),
+    ('quantiles', sketches.quantiles, Transducer,
+     lambda items: statistics.quantiles(items, n=100), 'eager'),
+    ('count_min', sketches.count_min, t.mapping(modulo),
+     lambda items: Counter(map(modulo, items)), 'eager'),
+    ('heavy_hitters', sketches.heavy_hitters, t.mapping(modulo),
+     lambda items: Counter(map(modulo, items)).most_common(100), 'eager'),
+    ('asending', lambda: reducers.asending(discard, batch_size=64), Transducer,
+     len, 'coop'),
+    ('awriting', lambda: reducers.awriting(_NullStream(), batch_size=64), Transducer,
+     len, 'coop'),
+    ('aputting', lambda: reducers.aputting(asyncio.Queue()), Transducer,
+     lambda items: asyncio.run(_aputting(items)), 'coop'),
+]
+
+
+async def _aiterate(items):
+    for item in items:
+        yield item
+
+
+async def _acollect(aiterable):
+    return [item async for item in aiterable]
+
+
+def transducer_runner(engine, factory, items, loop):
+    """Return a function of no arguments which transduces items with a fresh transducer."""
+    n = len(items)
+    if engine == 'eager':
+        return lambda: eager.transduce(factory(n), reducers.appending(), items)
+    if engine == 'lazy':
+        return lambda: list(lazy.transduce(factory(n), items))
+    if engine == 'react':
+        def run():
+            sink = CollectingSink()
+            target = react.transduce(factory(n), sink())
+            iterable_source(items, target)
+            target.close()
+            return list(sink)
+        return run
+    if engine == 'coop':
+        return lambda: _run_async(loop, coop.transduce(factory(n), reducers.appending(), _aiterate(items)))
+    if engine == 'lazy_coop':
+        return lambda: _run_async(loop, _acollect(lazy_coop.transduce(factory(n), _aiterate(items))))
+    raise ValueError("Unknown engine {!r}".format(engine))
+
+
+def reducer_runner(engine, factory, xform, items, loop):
+    """Return a function of no arguments which reduces items with a fresh reducer."""
+    if engine == 'eager':
+        return lambda: eager.transduce(xform, factory(), items)
+    if engine == 'coop':
+        return lambda: _run_async(loop, coop.transduce(xform, factory(), _aiterate(items)))
+    raise ValueError("Unknown engine {!r}".format(engine))
+
+
+def measure(function, repeat, min_time):
+    """Time a function, and measure the peak memory allocated by a single call.
+
+    Returns:
+        A dictionary with the best and median times per call in seconds, the
+        number of calls per timing and the peak memory in bytes.
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            break
+        number *= 2
+    times = [elapsed / number for elapsed in timer.repeat(repeat, number)]
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'best': min(times),
+        'median': statistics.median(times),
+        'number': number,
+        'peak_memory': peak,
+    }
+
+
+def _record(kind, name, engine, size, measurement):
+    measurement.update(kind=kind, name=name, engine=engine, size=size,
+                       items_per_second=size / measurement['best'] if measurement['best'] else None)
+    return measurement
+
+
+def _check(label, actual, expected):
+    if actual != expected:
+        print("warning: {} produced a result which differs from its baseline".format(label), file=sys.stderr)
+
+
+def _unbenchmarked():
+    """Names of public factories which have no benchmark case."""
+    covered = {case[0] for case in TRANSDUCER_CASES}
+    factories = {name for name, value in vars(t).items()
+                 if inspect.isfunction(value) and value.__module__ == t.__name__ and not name.startswith('_')}
+    covered.update(case[0] for case in REDUCER_CASES)
+    for module in (reducers, sketches):
+        factories.update(name for name, value in vars(module).items()
+                         if inspect.isfunction(value) and value.__module__ == module.__name__
+                         and not name.startswith('_'))
+    return sorted(factories - covered)
+
+
+def run(sizes, engines, pattern, repeat, min_time, baselines=True):
+    results = []
+    loop = asyncio.new_event_loop()
+    try:
+        for size in sizes:
+            items = list(range(1, size + 1))
+            for name, factory, baseline, case_engines in TRANSDUCER_CASES:
+                if pattern and pattern not in name:
+                    continue
+                expected = baseline(items)
+                if baselines:
+                    results.append(_record('transducer', name, 'baseline', size,
+                                           measure(lambda: baseline(items), repeat, min_time)))
+                for engine in case_engines:
+                    if engine not in engines:
+                        continue
+                    runner = transducer_runner(engine, factory, items, loop)
+                    _check("{} under {}".format(name, engine), runner(), expected)
+                    results.append(_record('transducer', name, engine, size, measure(runner, repeat, min_time)))
+                    _report(results[-1])
+            for name, factory, xform, baseline, engine in REDUCER_CASES:
+                if (pattern and pattern not in name) or engine not in engines:
+                    continue
+                if baselines:
+                    results.append(_record('reducer', name, 'baseline', size,
+                                           measure(lambda: baseline(items), repeat, min_time)))
+                runner = reducer_runner(engine, factory, xform, items, loop)
+                results.append(_record('reducer', name, engine, size, measure(runner, repeat, min_time)))
+                _report(results[-1])
+    finally:
+        loop.close()
+    return results
+
+
+def _report(result):
+    print("{kind:<10} {name:<20} {engine:<9} {size:>9} {best:>12.6f}s {items_per_second:>14,.0f}/s "
+          "{peak_memory:>12,d}B".format(**result), file=sys.stderr)
+
+
+def _key(result):
+    return result['kind'], result['name'], result['engine'], result['size']
+
+
+def compare(previous, current, threshold):
+    """Compare two sets of results, returning the benchmarks which have regressed.
+
+    Args:
+        previous: A list of result dictionaries from an earlier run.
+        current: A list of result dictionaries from this run.
+        threshold: The fractional slowdown in best time beyond which a
+            benchmark is considered to have regressed.
+
+    Returns:
+        A list of (key, ratio) pairs, where ratio is the current best time
+        divided by the previous best time.
+    """
+    earlier = {_key(result): result for result in previous}
+    regressions = []
+    for result in current:
+        before = earlier.get(_key(result))
+        if before is None or result['engine'] == 'baseline' or not before['best']:
+            continue
+        ratio = result['best'] / before['best']
+        print("{:<10} {:<20} {:<9} {:>9} {:>8.2f}x".format(*_key(result), ratio))
+        if ratio > 1.0 + threshold:
+            regressions.append((_key(result), ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Input sizes (default: %(default)s)")
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=ENGINES,
+                        help="Transducible processes to benchmark (default: all)")
+    parser.add_argument('--filter', dest='pattern', default=None,
+                        help="Only run benchmarks with names containing this string")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="Number of timings of each benchmark (default: %(default)s)")
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help="Minimum duration in seconds of each timing (default: %(default)s)")
+    parser.add_argument('--no-baselines', dest='baselines', action='store_false',
+                        help="Do not time the itertools and built-in baselines")
+    parser.add_argument('--output', default=None,
+                        help="Write results as JSON to this file rather than stdout")
+    parser.add_argument('--compare', default=None,
+                        help="A JSON results file with which to compare this run")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Fractional slowdown reported as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    for name in _unbenchmarked():
+        print("warning: {} has no benchmark".format(name), file=sys.stderr)
+
+    results = run(args.sizes, args.engines, args.pattern, args.repeat, args.min_time, args.baselines)
+    document = {
+        'transducer_version': transducer.__version__,
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+    if args.output is not None:
+        with open(args.output, 'w') as output:
+            json.dump(document, output, indent=2)
+    elif args.compare is None:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+
+    if args.compare is not None:
+        with open(args.compare) as previous:
+            regressions = compare(json.load(previous)['results'], results, args.threshold)
+        for key, ratio in regressions:
+            print("regression: {} {} {} {}: {:.2f}x slower".format(*key, ratio), file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -51,5 +51,8 @@ setup(
         "Topic :: Utilities",
         ],
     requires = [],
+    extras_require = {
+        "numpy": ["numpy>=1.20"],
+    },
     long_description = long_description
 )
@@ -0,0 +1,132 @@
+import operator
+import unittest
+from transducer import compiled
+from transducer.eager import transduce
+from transducer.functional import compose
+from transducer.infrastructure import Reduced, Transducer
+from transducer.reducers import appending, adding, conjoining, expecting_single, completing
+from transducer.transducers import (mapping, filtering, reducing, enumerating, first, last, reversing, ordering,
+                                    counting, scanning, taking, dropping_while, distinct, taking_while, dropping,
+                                    mapcatting, pairwise, batching, windowing, repeating)
+
+
+class Doubling(Transducer):
+
+    def step(self, result, item):
+        return self._reducer(result, item * 2)
+
+
+def doubling(reducer):
+    return Doubling(reducer)
+
+
+class TestCompiled(unittest.TestCase):
+
+    def assertCompiledEqual(self, transducer, reducer_factory, iterable):
+        expected = transduce(transducer, reducer_factory(), iterable)
+        result = compiled.transduce(transducer, reducer_factory(), iterable)
+        self.assertEqual(result, expected)
+
+    def test_single_transducers(self):
+        for transducer in (Transducer,
+                           mapping(lambda x: x * x),
+                           filtering(lambda x: x % 3 == 0),
+                           enumerating(start=2),
+                           mapcatting(lambda x: [x] * (x % 3)),
+                           repeating(2),
+                           taking(4),
+                           taking_while(lambda x: x < 6),
+                           dropping(4),
+                           dropping_while(lambda x: x < 6),
+                           distinct(),
+                           pairwise(),
+                           batching(3),
+                           windowing(3),
+                           windowing(3, padding=0),
+                           scanning(operator.add),
+                           scanning(operator.add, 10),
+                           reversing(),
+                           ordering(reverse=True),
+                           doubling):
+            with self.subTest(transducer=transducer):
+                self.assertCompiledEqual(transducer, appending, [4, 1, 7, 1, 9, 3, 4, 8, 2, 6])
+
+    def test_single_value_transducers(self):
+        for transducer in (reducing(operator.add),
+                           first(lambda x: x > 5),
+                           last(lambda x: x < 5),
+                           counting(lambda x: x % 2 == 0)):
+            with self.subTest(transducer=transducer):
+                self.assertCompiledEqual(transducer, expecting_single, [4, 1, 7, 1, 9, 3, 4, 8, 2, 6])
+
+    def test_reducers(self):
+        for reducer in (appending, adding, conjoining, lambda: completing(operator.add, 0)):
+            with self.subTest(reducer=reducer):
+                self.assertCompiledEqual(mapping(lambda x: x % 4), reducer, range(20))
+
+    def test_chained_transducers(self):
+        self.assertCompiledEqual(compose(mapping(lambda x: x*x),
+                                         filtering(lambda x: x % 5 != 0),
+                                         taking(6),
+                                         dropping_while(lambda x: x < 15),
+                                         distinct()),
+                                 appending,
+                                 range(20))
+
+    def test_termination_downstream_of_discarding_stage(self):
+        self.assertCompiledEqual(compose(taking(5),
+                                         filtering(lambda x: x % 2 == 0)),
+                                 appending,
+                                 range(20))
+
+    def test_flush_downstream_of_terminated_stage(self):
+        self.assertCompiledEqual(compose(taking(5), batching(2)), appending, range(20))
+
+    def test_windowing_after_mapcatting(self):
+        self.assertCompiledEqual(compose(mapcatting(lambda x: range(x)),
+                                         windowing(2),
+                                         pairwise(),
+                                         enumerating()),
+                                 appending,
+                                 range(6))
+
+    def test_unknown_stage_in_middle_of_chain(self):
+        self.assertCompiledEqual(compose(mapping(lambda x: x + 1),
+                                         doubling,
+                                         taking(3),
+                                         batching(2)),
+                                 appending,
+                                 range(20))
+
+    def test_reduced_from_final_reducer(self):
+        def summing_to_ten(result, item):
+            result += item
+            return Reduced(result) if result >= 10 else result
+
+        self.assertCompiledEqual(mapping(lambda x: x * 2), lambda: completing(summing_to_ten, 0), range(20))
+
+    def test_deep_pipeline(self):
+        transducer = compose(*([mapping(lambda x: x + 1), filtering(lambda x: x % 7 != 0)] * 40))
+        self.assertCompiledEqual(transducer, appending, range(100))
+
+    def test_many_looping_stages(self):
+        transducer = compose(*[repeating(1)] * 30)
+        self.assertCompiledEqual(transducer, appending, range(10))
+
+    def test_init(self):
+        result = compiled.transduce(mapping(lambda x: x + 1), appending(), range(3), init=[10])
+        self.assertListEqual(result, [10, 1, 2, 3])
+
+    def test_termination_consumes_no_further_items(self):
+        iterator = iter(range(20))
+        result = compiled.transduce(taking(4), appending(), iterator)
+        self.assertListEqual(result, [0, 1, 2, 3])
+        self.assertListEqual(list(iterator), list(range(4, 20)))
+
+    def test_compiled_function_is_reusable(self):
+        f = compiled.compile(compose(enumerating(), batching(2)), appending())
+        self.assertListEqual(f(range(3)), f(range(3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
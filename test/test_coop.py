@@ -0,0 +1,247 @@
+import asyncio
+import unittest
+from transducer import coop, lazy_coop
+from transducer.functional import compose
+from transducer.infrastructure import AsyncReducer, Transducer
+from transducer.reducers import appending, adding, asending, awriting, aputting, broadcasting
+from transducer.transducers import amapping, mapping, filtering, taking, batching, enumerating
+
+
+async def aiterate(iterable):
+    for item in iterable:
+        yield item
+        await asyncio.sleep(0)
+
+
+async def collect(aiterable):
+    return [item async for item in aiterable]
+
+
+def delayed(transform, delay=lambda item: 0):
+    async def delayed_transform(item):
+        await asyncio.sleep(delay(item))
+        return transform(item)
+    return delayed_transform
+
+
+class TestCoopTransduce(unittest.TestCase):
+
+    def test_synchronous_transducers(self):
+        result = asyncio.run(coop.transduce(compose(mapping(lambda x: x * x),
+                                                    filtering(lambda x: x % 2 == 0)),
+                                            appending(),
+                                            aiterate(range(10))))
+        self.assertListEqual(result, [0, 4, 16, 36, 64])
+
+    def test_early_termination(self):
+        result = asyncio.run(coop.transduce(taking(3), appending(), aiterate(range(10))))
+        self.assertListEqual(result, [0, 1, 2])
+
+    def test_broadcasting(self):
+        result = asyncio.run(coop.transduce(mapping(lambda x: x % 4),
+                                            broadcasting((taking(3), appending()),
+                                                         (Transducer, adding())),
+                                            aiterate(range(10))))
+        self.assertTupleEqual(result, ([0, 1, 2], {0, 1, 2, 3}))
+
+
+class TestAMapping(unittest.TestCase):
+
+    def test_amapping(self):
+        result = asyncio.run(coop.transduce(amapping(delayed(lambda x: x * x)),
+                                            appending(),
+                                            aiterate(range(10))))
+        self.assertListEqual(result, [x * x for x in range(10)])
+
+    def test_ordered_with_uneven_latency(self):
+        transform = delayed(lambda x: x, delay=lambda x: 0.01 * (5 - x))
+        result = asyncio.run(coop.transduce(amapping(transform, concurrency=5),
+                                            appending(),
+                                            aiterate(range(5))))
+        self.assertListEqual(result, [0, 1, 2, 3, 4])
+
+    def test_unordered_with_uneven_latency(self):
+        transform = delayed(lambda x: x, delay=lambda x: 0.01 * (5 - x))
+        result = asyncio.run(coop.transduce(amapping(transform, concurrency=5, ordered=False),
+                                            appending(),
+                                            aiterate(range(5))))
+        self.assertCountEqual(result, [0, 1, 2, 3, 4])
+        self.assertNotEqual(result, [0, 1, 2, 3, 4])
+
+    def test_concurrency_is_bounded(self):
+        counts = {'current': 0, 'peak': 0}
+
+        async def tracking(x):
+            counts['current'] += 1
+            counts['peak'] = max(counts['peak'], counts['current'])
+            await asyncio.sleep(0.001)
+            counts['current'] -= 1
+            return x
+
+        result = asyncio.run(coop.transduce(amapping(tracking, concurrency=3),
+                                            appending(),
+                                            aiterate(range(20))))
+        self.assertListEqual(result, list(range(20)))
+        self.assertEqual(counts['peak'], 3)
+
+    def test_amapping_between_synchronous_stages(self):
+        result = asyncio.run(coop.transduce(compose(filtering(lambda x: x % 2 == 0),
+                                                    batching(2),
+                                                    amapping(delayed(sum), concurrency=2),
+                                                    enumerating()),
+                                            appending(),
+                                            aiterate(range(13))))
+        self.assertListEqual(result, [(0, 2), (1, 10), (2, 18), (3, 12)])
+
+    def test_consecutive_amappings(self):
+        result = asyncio.run(coop.transduce(compose(amapping(delayed(lambda x: x + 1), concurrency=2),
+                                                    amapping(delayed(lambda x: x * 10), concurrency=3)),
+                                            appending(),
+                                            aiterate(range(6))))
+        self.assertListEqual(result, [10, 20, 30, 40, 50, 60])
+
+    def test_early_termination_downstream_cancels_tasks(self):
+        started = []
+        cancelled = []
+
+        async def slow(x):
+            started.append(x)
+            try:
+                await asyncio.sleep(0 if x < 3 else 10)
+            except asyncio.CancelledError:
+                cancelled.append(x)
+                raise
+            return x
+
+        async def run():
+            result = await coop.transduce(compose(amapping(slow, concurrency=4, ordered=False), taking(3)),
+                                          appending(),
+                                          aiterate(range(100)))
+            await asyncio.sleep(0)
+            return result
+
+        result = asyncio.run(run())
+        self.assertCountEqual(result, [0, 1, 2])
+        self.assertCountEqual(cancelled, [x for x in started if x >= 3])
+
+    def test_early_termination_upstream_drains_tasks(self):
+        result = asyncio.run(coop.transduce(compose(taking(4), amapping(delayed(str), concurrency=4)),
+                                            appending(),
+                                            aiterate(range(100))))
+        self.assertListEqual(result, ['0', '1', '2', '3'])
+
+    def test_exception_is_raised(self):
+        async def failing(x):
+            raise KeyError(x)
+
+        with self.assertRaises(KeyError):
+            asyncio.run(coop.transduce(amapping(failing), appending(), aiterate(range(5))))
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            amapping(delayed(str), concurrency=0)
+
+    def test_lazy_coop(self):
+        result = asyncio.run(collect(lazy_coop.transduce(compose(mapping(lambda x: x + 1),
+                                                                 amapping(delayed(lambda x: x * x), concurrency=3),
+                                                                 taking(5)),
+                                                         aiterate(range(100)))))
+        self.assertListEqual(result, [1, 4, 9, 16, 25])
+
+    def test_lazy_coop_drains_on_completion(self):
+        result = asyncio.run(collect(lazy_coop.transduce(amapping(delayed(lambda x: -x), concurrency=4),
+                                                         aiterate(range(6)))))
+        self.assertListEqual(result, [0, -1, -2, -3, -4, -5])
+
+
+class Recording(AsyncReducer):
+
+    def initial(self):
+        return []
+
+    async def step(self, result, item):
+        await asyncio.sleep(0)
+        result.append(item)
+        return result
+
+    async def complete(self, result):
+        await asyncio.sleep(0)
+        return tuple(result)
+
+
+class RecordingStream:
+
+    def __init__(self):
+        self.written = []
+        self.drains = 0
+
+    def write(self, data):
+        self.written.append(data)
+
+    async def drain(self):
+        await asyncio.sleep(0)
+        self.drains += 1
+
+
+class TestAsyncReducers(unittest.TestCase):
+
+    def test_async_reducer(self):
+        result = asyncio.run(coop.transduce(mapping(lambda x: x * 2), Recording(), aiterate(range(4))))
+        self.assertEqual(result, (0, 2, 4, 6))
+
+    def test_async_reducer_with_identity_transducer(self):
+        result = asyncio.run(coop.transduce(Transducer, Recording(), aiterate(range(4))))
+        self.assertEqual(result, (0, 1, 2, 3))
+
+    def test_async_reducer_after_amapping_and_completing_stage(self):
+        result = asyncio.run(coop.transduce(compose(amapping(delayed(lambda x: x + 1), concurrency=2),
+                                                    batching(3)),
+                                            Recording(),
+                                            aiterate(range(7))))
+        self.assertEqual(result, ([1, 2, 3], [4, 5, 6], [7]))
+
+    def test_asending(self):
+        batches = []
+
+        async def send(batch):
+            await asyncio.sleep(0)
+            batches.append(batch)
+
+        result = asyncio.run(coop.transduce(mapping(str), asending(send, batch_size=3), aiterate(range(7))))
+        self.assertEqual(result, 7)
+        self.assertListEqual(batches, [['0', '1', '2'], ['3', '4', '5'], ['6']])
+
+    def test_awriting(self):
+        stream = RecordingStream()
+        result = asyncio.run(coop.transduce(mapping(lambda x: bytes([x])),
+                                            awriting(stream, batch_size=4),
+                                            aiterate(range(10))))
+        self.assertEqual(result, 10)
+        self.assertEqual(b''.join(stream.written), bytes(range(10)))
+        self.assertEqual(stream.drains, 3)
+
+    def test_aputting_waits_for_consumer(self):
+        async def run():
+            queue = asyncio.Queue(maxsize=2)
+            received = []
+
+            async def consume():
+                for _ in range(6):
+                    received.append(await queue.get())
+
+            consumer = asyncio.ensure_future(consume())
+            count = await coop.transduce(Transducer, aputting(queue), aiterate(range(6)))
+            await consumer
+            return count, received
+
+        count, received = asyncio.run(run())
+        self.assertEqual(count, 6)
+        self.assertListEqual(received, list(range(6)))
+
+    def test_batch_size_validation(self):
+        with self.assertRaises(ValueError):
+            awriting(RecordingStream(), batch_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,24 @@
 from collections import deque
+from functools import reduce
+import math
 import operator
+import os
+import tempfile
+import threading
+import time
 import unittest
+from transducer._util import UNSET
 from transducer.eager import transduce
 from transducer.functional import compose
 from transducer.infrastructure import Transducer
-from transducer.reducers import appending, expecting_single, conjoining, adding
+from transducer.reducers import appending, expecting_single, conjoining, adding, completing
 from transducer.transducers import (mapping, filtering, reducing, enumerating, first, last,
                                     reversing, ordering, counting, scanning, taking, dropping_while, distinct,
                                     taking_while, dropping, element_at, mapcatting, pairwise, batching, windowing,
-                                    repeating)
+                                    repeating, mapping_concurrent, windowed_reducing, tumbling,
+                                    sliding, session, grouping_by, grouping_runs, distinct_consecutive,
+                                    partitioning_by, sampling, reservoir_sampling, sampling_by,
+                                    TopOrdering)
 
 
 class TestSingleTransducers(unittest.TestCase):
@@ -115,6 +125,94 @@ class TestSingleTransducers(unittest.TestCase):
                            iterable=[1, 1, 3, 5, 5, 2, 1, 2])
         self.assertListEqual(result, [1, 3, 5, 2])
 
+    def test_distinct_key(self):
+        result = transduce(transducer=distinct(key=str.lower),
+                           reducer=appending(),
+                           iterable=['a', 'B', 'A', 'b', 'c'])
+        self.assertListEqual(result, ['a', 'B', 'c'])
+
+    def test_distinct_max_size_evicts_least_recently_seen(self):
+        stats = {}
+        result = transduce(transducer=distinct(max_size=2, stats=stats),
+                           reducer=appending(),
+                           iterable=[1, 2, 1, 3, 1, 2, 3])
+        self.assertListEqual(result, [1, 2, 3, 2, 3])
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['evictions'], 3)
+
+    def test_distinct_ttl_forgets_old_items(self):
+        times = iter([0, 1, 2, 5, 6, 11])
+        stats = {}
+        result = transduce(transducer=distinct(ttl=5, clock=lambda: next(times), stats=stats),
+                           reducer=appending(),
+                           iterable=['a', 'b', 'a', 'a', 'b', 'a'])
+        self.assertListEqual(result, ['a', 'b', 'a', 'b', 'a'])
+        self.assertEqual(stats['expirations'], 4)
+
+    def test_distinct_max_size_with_ttl_evicts_first_seen(self):
+        result = transduce(transducer=distinct(max_size=2, ttl=100, clock=lambda: 0),
+                           reducer=appending(),
+                           iterable=['a', 'b', 'a', 'c', 'a'])
+        self.assertListEqual(result, ['a', 'b', 'c', 'a'])
+
+    def test_distinct_approximate(self):
+        stats = {}
+        result = transduce(transducer=distinct(approximate=True, max_size=1000, error_rate=0.001, stats=stats),
+                           reducer=appending(),
+                           iterable=[n % 500 for n in range(2000)])
+        self.assertLessEqual(len(result), 500)
+        self.assertGreater(len(result), 490)
+        self.assertEqual(len(set(result)), len(result))
+        self.assertLess(stats['false_positive_rate'], 0.001)
+        self.assertGreater(stats['bits'], 1000)
+
+    def test_distinct_approximate_beyond_capacity(self):
+        stats = {}
+        result = transduce(transducer=distinct(approximate=True, max_size=1000, error_rate=0.01, stats=stats),
+                           reducer=appending(),
+                           iterable=range(50000))
+        self.assertGreater(len(result) / 50000, 0.97)
+        self.assertLess(stats['false_positive_rate'], 0.03)
+        self.assertEqual(stats['rotations'], len(result) // 1000)
+
+    def test_distinct_approximate_remembers_recent_keys_across_rotation(self):
+        items = list(range(1500)) + list(range(1000, 1500)) + list(range(1500, 2500)) + [0]
+        result = transduce(transducer=distinct(approximate=True, max_size=1000, error_rate=0.0001),
+                           reducer=appending(),
+                           iterable=items)
+        self.assertListEqual(result, list(range(2500)) + [0])
+
+    def test_distinct_spilling_to_disk(self):
+        items = [(n * 7919) % 3000 for n in range(9000)]
+        stats = {}
+        with tempfile.TemporaryDirectory() as spill_dir:
+            result = transduce(transducer=distinct(memory_limit=100, spill_dir=spill_dir, stats=stats),
+                               reducer=appending(),
+                               iterable=items)
+            self.assertListEqual(os.listdir(spill_dir), [])
+        self.assertListEqual(result, list(dict.fromkeys(items)))
+        self.assertGreater(stats['spills'], 1)
+        self.assertGreater(stats['disk_lookups'], 1)
+
+    def test_distinct_spilling_with_key_and_early_termination(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            result = transduce(transducer=compose(distinct(key=lambda x: x % 5000, memory_limit=10,
+                                                           spill_dir=spill_dir),
+                                                  taking(4990)),
+                               reducer=appending(),
+                               iterable=range(20000))
+            self.assertListEqual(os.listdir(spill_dir), [])
+        self.assertListEqual(result, list(range(4990)))
+
+    def test_distinct_invalid_arguments(self):
+        for kwargs in [dict(max_size=0), dict(ttl=0), dict(approximate=True),
+                       dict(approximate=True, max_size=10, ttl=1),
+                       dict(approximate=True, max_size=10, error_rate=1),
+                       dict(memory_limit=0), dict(memory_limit=10, max_size=10)]:
+            with self.subTest(**kwargs):
+                with self.assertRaises(ValueError):
+                    distinct(**kwargs)
+
     def test_pairwise_at_least_two(self):
         result = transduce(transducer=pairwise(),
                            reducer=appending(),
@@ -190,6 +288,108 @@ class TestSingleTransducers(unittest.TestCase):
                       reducer=appending(),
                       iterable=[42, 12, 45, 9, 18, 3, 34, 13])
 
+    def test_windowing_step(self):
+        items = [42, 12, 45, 9, 18, 3, 34, 13]
+        for padding, expected in [(UNSET, [(42, 12), (45, 9), (18, 3), (34, 13)]),
+                                  (0, [(42, 12), (45, 9), (18, 3), (34, 13)])]:
+            with self.subTest(padding=padding):
+                result = transduce(transducer=windowing(2, padding=padding, step=2),
+                                   reducer=appending(),
+                                   iterable=items)
+                self.assertListEqual(result, expected)
+
+    def test_windowing_step_larger_than_size(self):
+        result = transduce(transducer=windowing(2, step=3),
+                           reducer=appending(),
+                           iterable=range(10))
+        self.assertListEqual(result, [(1, 2), (4, 5), (7, 8)])
+
+    def test_windowing_view_matches_tuples(self):
+        items = [42, 12, 45, 9, 18, 3, 34, 13]
+        for kwargs in [dict(), dict(padding=0), dict(step=3), dict(padding=-1, step=2), dict(typecode='q'),
+                       dict(typecode='d', padding=0.5, step=2)]:
+            with self.subTest(**kwargs):
+                copying_kwargs = {name: value for name, value in kwargs.items() if name != 'typecode'}
+                expected = transduce(transducer=windowing(3, **copying_kwargs),
+                                     reducer=appending(),
+                                     iterable=items)
+                result = transduce(transducer=compose(windowing(3, view=True, **kwargs), mapping(tuple)),
+                                   reducer=appending(),
+                                   iterable=items)
+                self.assertListEqual(result, expected)
+
+    def test_windowing_view_is_reused_and_read_only(self):
+        views = transduce(transducer=windowing(3, view=True),
+                          reducer=appending(),
+                          iterable=range(5))
+        self.assertTrue(all(view is views[0] for view in views))
+        with self.assertRaises(TypeError):
+            views[0][0] = 1
+        memoryviews = transduce(transducer=windowing(3, typecode='i'),
+                                reducer=appending(),
+                                iterable=range(5))
+        self.assertTrue(memoryviews[0].readonly)
+
+    def test_windowing_view_sequence_protocol(self):
+        result = transduce(transducer=compose(windowing(4, view=True),
+                                              mapping(lambda w: (len(w), w[0], w[-1], w[1:3], 5 in w))),
+                           reducer=appending(),
+                           iterable=range(6))
+        self.assertEqual(result[4], (4, 1, 4, [2, 3], False))
+        self.assertEqual(result[5], (4, 2, 5, [3, 4], True))
+
+    def test_windowing_view_validation(self):
+        with self.assertRaises(ValueError):
+            windowing(3, view=True, window_type=list)
+        with self.assertRaises(ValueError):
+            windowing(3, step=0)
+
+    def test_windowed_reducing_matches_windowing(self):
+        items = [42, 12, 45, 9, 18, 3, 34, 13]
+        for size, op, inverse, padding in [(3, operator.add, operator.sub, UNSET),
+                                           (3, operator.add, operator.sub, 0),
+                                           (1, operator.add, operator.sub, UNSET),
+                                           (3, max, None, UNSET),
+                                           (4, min, None, 100),
+                                           (1, min, None, UNSET),
+                                           (10, max, None, UNSET),
+                                           (5, math.gcd, None, UNSET)]:
+            with self.subTest(size=size, op=op, padding=padding):
+                expected = transduce(transducer=compose(windowing(size, padding=padding),
+                                                        mapping(lambda window: reduce(op, window))),
+                                     reducer=appending(),
+                                     iterable=items)
+                result = transduce(transducer=windowed_reducing(size, op, inverse, padding=padding),
+                                   reducer=appending(),
+                                   iterable=items)
+                self.assertListEqual(result, expected)
+
+    def test_windowed_reducing_preserves_order_for_non_commutative_op(self):
+        items = list('abcdefghij')
+        expected = transduce(transducer=compose(windowing(4), mapping(''.join)),
+                             reducer=appending(),
+                             iterable=items)
+        result = transduce(transducer=windowed_reducing(4, operator.add),
+                           reducer=appending(),
+                           iterable=items)
+        self.assertListEqual(result, expected)
+
+    def test_windowed_reducing_early_termination(self):
+        result = transduce(transducer=compose(windowed_reducing(3, operator.add, operator.sub), taking(9)),
+                           reducer=appending(),
+                           iterable=range(8))
+        self.assertListEqual(result, [0, 1, 3, 6, 9, 12, 15, 18, 13])
+
+    def test_windowed_reducing_validation(self):
+        with self.assertRaises(ValueError):
+            windowed_reducing(0, operator.add)
+
+    def test_pairwise_view(self):
+        result = transduce(transducer=compose(pairwise(view=True), mapping(tuple)),
+                           reducer=appending(),
+                           iterable=[1, 3, 5, 7, 2, 1, 9])
+        self.assertListEqual(result, [(1, 3), (3, 5), (5, 7), (7, 2), (2, 1), (1, 9)])
+
     def test_element_at(self):
         result = transduce(transducer=element_at(3),
                            reducer=expecting_single(),
@@ -302,6 +502,103 @@ class TestSingleTransducers(unittest.TestCase):
                            iterable="The quick brown fox jumped".split())
         self.assertSequenceEqual(result, ['jumped', 'quick', 'brown', 'The', 'fox'])
 
+    def test_ordering_limit_matches_sorting(self):
+        items = [(n * 7919) % 101 for n in range(500)]
+        for key, reverse, limit in [(None, False, 10), (None, True, 10), (lambda x: x % 7, False, 25),
+                                    (lambda x: x % 7, True, 25), (None, False, 1000)]:
+            with self.subTest(reverse=reverse, limit=limit):
+                result = transduce(transducer=ordering(key=key, reverse=reverse, limit=limit),
+                                   reducer=appending(),
+                                   iterable=items)
+                self.assertListEqual(result, sorted(items, key=key, reverse=reverse)[:limit])
+
+    def test_ordering_limit_is_stable(self):
+        words = "The quick brown fox jumped over the lazy dog".split()
+        for reverse in (False, True):
+            with self.subTest(reverse=reverse):
+                result = transduce(transducer=ordering(key=len, reverse=reverse, limit=4),
+                                   reducer=appending(),
+                                   iterable=words)
+                self.assertListEqual(result, sorted(words, key=len, reverse=reverse)[:4])
+
+    def test_ordering_followed_by_taking_uses_limit(self):
+        chain = compose(ordering(reverse=True), taking(3))(appending())
+        self.assertIsInstance(chain, TopOrdering)
+        result = transduce(transducer=compose(ordering(reverse=True), taking(3)),
+                           reducer=appending(),
+                           iterable=[4, 2, 6, 10, 8])
+        self.assertListEqual(result, [10, 8, 6])
+
+    def test_ordering_terminates_on_reduced(self):
+        result = transduce(transducer=compose(ordering(), first(lambda x: x > 4)),
+                           reducer=appending(),
+                           iterable=[4, 2, 6, 10, 8])
+        self.assertListEqual(result, [6])
+
+    def test_ordering_spilling_to_disk_matches_sorting(self):
+        items = [((n * 7919) % 101, n) for n in range(1000)]
+        for key, reverse in [(None, False), (None, True), (operator.itemgetter(0), False),
+                             (operator.itemgetter(0), True)]:
+            with self.subTest(key=key, reverse=reverse):
+                with tempfile.TemporaryDirectory() as spill_dir:
+                    result = transduce(transducer=ordering(key=key, reverse=reverse, memory_limit=64,
+                                                           spill_dir=spill_dir),
+                                       reducer=appending(),
+                                       iterable=items)
+                    self.assertListEqual(os.listdir(spill_dir), [])
+                self.assertListEqual(result, sorted(items, key=key, reverse=reverse))
+
+    def test_ordering_spilling_early_termination(self):
+        result = transduce(transducer=compose(ordering(memory_limit=10), first(lambda x: x > 50)),
+                           reducer=appending(),
+                           iterable=range(100, 0, -1))
+        self.assertListEqual(result, [51])
+
+    def test_reversing_spilling_to_disk(self):
+        for size in [0, 1, 10, 11, 12, 100]:
+            with self.subTest(size=size):
+                result = transduce(transducer=reversing(memory_limit=10),
+                                   reducer=appending(),
+                                   iterable=range(size))
+                self.assertListEqual(result, list(reversed(range(size))))
+
+    def test_reversing_spilling_early_termination(self):
+        result = transduce(transducer=compose(reversing(memory_limit=3), taking(5)),
+                           reducer=appending(),
+                           iterable=range(10))
+        self.assertListEqual(result, [9, 8, 7, 6, 5])
+
+    def test_ordering_parallel_matches_sorting(self):
+        items = [((n * 7919) % 1009, n) for n in range(60000)]
+        for key, reverse in [(None, False), (operator.itemgetter(0), True), (lambda item: item[0], False)]:
+            with self.subTest(key=key, reverse=reverse):
+                result = transduce(transducer=ordering(key=key, reverse=reverse, parallel=3),
+                                   reducer=appending(),
+                                   iterable=items)
+                self.assertListEqual(result, sorted(items, key=key, reverse=reverse))
+
+    def test_ordering_parallel_early_termination(self):
+        result = transduce(transducer=compose(ordering(parallel=2), first(lambda x: x > 10)),
+                           reducer=appending(),
+                           iterable=range(60000, 0, -1))
+        self.assertListEqual(result, [11])
+
+    def test_ordering_parallel_validation(self):
+        with self.assertRaises(ValueError):
+            ordering(parallel=0)
+        with self.assertRaises(ValueError):
+            ordering(parallel=2, memory_limit=100)
+
+    def test_memory_limit_validation(self):
+        with self.assertRaises(ValueError):
+            ordering(memory_limit=0)
+        with self.assertRaises(ValueError):
+            reversing(memory_limit=0)
+
+    def test_ordering_limit_validation(self):
+        with self.assertRaises(ValueError):
+            ordering(limit=0)
+
     def test_counting(self):
         result = transduce(transducer=counting(),
                            reducer=expecting_single(),
@@ -343,5 +640,509 @@ class TestComposedTransducers(unittest.TestCase):
         self.assertSequenceEqual(result, [16, 36, 49])
 
 
+class TestEventTimeWindows(unittest.TestCase):
+
+    def test_tumbling(self):
+        result = transduce(transducer=tumbling(10),
+                           reducer=appending(),
+                           iterable=[1, 3, 12, 15, 31, 35])
+        self.assertListEqual(result, [(0, 10, [1, 3]), (10, 20, [12, 15]), (30, 40, [31, 35])])
+
+    def test_tumbling_with_timestamp_and_reducer(self):
+        events = [(1, 'a'), (4, 'b'), (11, 'c'), (25, 'd')]
+        result = transduce(transducer=tumbling(10, reducer=completing(lambda n, event: n + 1, identity=0),
+                                               timestamp=lambda event: event[0]),
+                           reducer=appending(),
+                           iterable=events)
+        self.assertListEqual(result, [(0, 10, 2), (10, 20, 1), (20, 30, 1)])
+
+    def test_tumbling_out_of_order_within_lateness(self):
+        stats = {}
+        result = transduce(transducer=tumbling(10, lateness=5, stats=stats),
+                           reducer=appending(),
+                           iterable=[1, 12, 8, 16, 9, 22, 3, 14])
+        self.assertListEqual(result, [(0, 10, [1, 8]), (10, 20, [12, 16, 14]), (20, 30, [22])])
+        self.assertEqual(stats['late'], 2)
+
+    def test_tumbling_discards_late_items(self):
+        result = transduce(transducer=tumbling(10),
+                           reducer=appending(),
+                           iterable=[1, 12, 8, 25, 19])
+        self.assertListEqual(result, [(0, 10, [1]), (10, 20, [12]), (20, 30, [25])])
+
+    def test_windows_are_passed_on_as_the_watermark_advances(self):
+        result = transduce(transducer=compose(tumbling(10), taking(1)),
+                           reducer=appending(),
+                           iterable=[1, 2, 11, 100])
+        self.assertListEqual(result, [(0, 10, [1, 2])])
+
+    def test_sliding(self):
+        result = transduce(transducer=sliding(10, 5),
+                           reducer=appending(),
+                           iterable=[1, 6, 12, 13])
+        self.assertListEqual(result, [(-5, 5, [1]), (0, 10, [1, 6]), (5, 15, [6, 12, 13]), (10, 20, [12, 13])])
+
+    def test_sliding_with_floats(self):
+        result = transduce(transducer=sliding(1.0, 0.5, reducer=completing(max, identity=0.0)),
+                           reducer=appending(),
+                           iterable=[0.1, 0.7, 1.2])
+        self.assertListEqual(result, [(-0.5, 0.5, 0.1), (0.0, 1.0, 0.7), (0.5, 1.5, 1.2), (1.0, 2.0, 1.2)])
+
+    def test_session(self):
+        result = transduce(transducer=session(5),
+                           reducer=appending(),
+                           iterable=[1, 3, 6, 20, 22, 40])
+        self.assertListEqual(result, [(1, 11, [1, 3, 6]), (20, 27, [20, 22]), (40, 45, [40])])
+
+    def test_session_merged_by_out_of_order_item(self):
+        result = transduce(transducer=session(5, lateness=20),
+                           reducer=appending(),
+                           iterable=[1, 3, 12, 14, 7.5, 50])
+        self.assertListEqual(result, [(1, 19, [1, 3, 7.5, 12, 14]), (50, 55, [50])])
+
+    def test_stateful_window_reducer_factory(self):
+        for transducer, expected in ((tumbling(10, reducer=lambda: taking(2)(appending())),
+                                      [(0, 10, [1, 2]), (10, 20, [11, 12])]),
+                                     (sliding(10, 5, reducer=lambda: taking(2)(appending())),
+                                      [(-5, 5, [1, 2]), (0, 10, [1, 2]), (5, 15, [11, 12]), (10, 20, [11, 12])]),
+                                     (session(5, reducer=lambda: taking(2)(appending())),
+                                      [(1, 8, [1, 2]), (11, 18, [11, 12])])):
+            with self.subTest(transducer=transducer):
+                result = transduce(transducer=transducer,
+                                   reducer=appending(),
+                                   iterable=[1, 2, 3, 11, 12, 13])
+                self.assertListEqual(result, expected)
+
+    def test_window_reducer_not_callable_raises_type_error(self):
+        with self.assertRaises(TypeError):
+            tumbling(10, reducer=42)
+
+    def test_session_late_item_merges_into_open_session(self):
+        stats = {}
+        result = transduce(transducer=session(10, stats=stats),
+                           reducer=appending(),
+                           iterable=[5, 8, 16, 3, -2])
+        self.assertListEqual(result, [(-2, 26, [5, 8, 16, 3, -2])])
+        self.assertEqual(stats['late'], 0)
+
+    def test_session_late_item(self):
+        stats = {}
+        result = transduce(transducer=session(5, stats=stats),
+                           reducer=appending(),
+                           iterable=[1, 20, 2, 30])
+        self.assertListEqual(result, [(1, 6, [1]), (20, 25, [20]), (30, 35, [30])])
+        self.assertEqual(stats['late'], 1)
+
+    def test_validation(self):
+        for factory in [lambda: tumbling(0), lambda: sliding(10, 0), lambda: sliding(0, 1),
+                        lambda: session(0), lambda: tumbling(10, lateness=-1)]:
+            with self.assertRaises(ValueError):
+                factory()
+
+
+class TestGroupingBy(unittest.TestCase):
+
+    words = "the quick brown fox jumps over the lazy dog then the fox sleeps".split()
+
+    def test_appending_by_default(self):
+        result = transduce(transducer=grouping_by(len),
+                           reducer=appending(),
+                           iterable=self.words)
+        self.assertListEqual(result, [(3, ['the', 'fox', 'the', 'dog', 'the', 'fox']),
+                                      (5, ['quick', 'brown', 'jumps']),
+                                      (4, ['over', 'lazy', 'then']),
+                                      (6, ['sleeps'])])
+
+    def test_shared_reducer(self):
+        result = transduce(transducer=grouping_by(lambda word: word[0],
+                                                  reducer=completing(lambda n, word: n + 1, identity=0)),
+                           reducer=appending(),
+                           iterable=self.words)
+        self.assertListEqual(result, [('t', 4), ('q', 1), ('b', 1), ('f', 2), ('j', 1), ('o', 1), ('l', 1),
+                                      ('d', 1), ('s', 1)])
+
+    def test_reducer_factory_and_per_group_termination(self):
+        result = transduce(transducer=grouping_by(len, reducer=expecting_single, transducer=first()),
+                           reducer=appending(),
+                           iterable=self.words)
+        self.assertListEqual(result, [(3, 'the'), (5, 'quick'), (4, 'over'), (6, 'sleeps')])
+
+    def test_transducer_per_group(self):
+        result = transduce(transducer=grouping_by(len, transducer=compose(distinct(), taking(2))),
+                           reducer=appending(),
+                           iterable=self.words)
+        self.assertListEqual(result, [(3, ['the', 'fox']), (5, ['quick', 'brown']), (4, ['over', 'lazy']),
+                                      (6, ['sleeps'])])
+
+    def test_downstream_early_termination(self):
+        result = transduce(transducer=compose(grouping_by(len), taking(2)),
+                           reducer=appending(),
+                           iterable=self.words)
+        self.assertListEqual([k for k, _ in result], [3, 5])
+
+    def test_spilling_to_disk(self):
+        items = [(n * 7919) % 1000 for n in range(5000)]
+        expected = {}
+        for item in items:
+            expected[item] = expected.get(item, 0) + 1
+        for memory_limit in [1, 10, 100, 2000]:
+            with self.subTest(memory_limit=memory_limit):
+                result = transduce(transducer=grouping_by(lambda x: x, reducer=completing(lambda n, x: n + 1, 0),
+                                                          memory_limit=memory_limit),
+                                   reducer=appending(),
+                                   iterable=items)
+                self.assertEqual(len(result), len(expected))
+                self.assertDictEqual(dict(result), expected)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            grouping_by(len, memory_limit=0)
+        with self.assertRaises(TypeError):
+            grouping_by(len, reducer=42)
+
+
+class TestGroupingRuns(unittest.TestCase):
+
+    def test_runs(self):
+        result = transduce(transducer=grouping_runs(lambda x: x // 10),
+                           reducer=appending(),
+                           iterable=[1, 5, 12, 13, 14, 27, 3])
+        self.assertListEqual(result, [(0, [1, 5]), (1, [12, 13, 14]), (2, [27]), (0, [3])])
+
+    def test_empty(self):
+        result = transduce(transducer=grouping_runs(len),
+                           reducer=appending(),
+                           iterable=[])
+        self.assertListEqual(result, [])
+
+    def test_reducer_and_per_run_termination(self):
+        result = transduce(transducer=grouping_runs(lambda x: x // 10,
+                                                    reducer=completing(operator.add, identity=0),
+                                                    transducer=taking(2)),
+                           reducer=appending(),
+                           iterable=[1, 5, 7, 12, 13, 14, 27])
+        self.assertListEqual(result, [(0, 6), (1, 25), (2, 27)])
+
+    def test_downstream_early_termination(self):
+        result = transduce(transducer=compose(grouping_runs(lambda x: x // 10), taking(2)),
+                           reducer=appending(),
+                           iterable=[1, 5, 12, 13, 27, 28])
+        self.assertListEqual(result, [(0, [1, 5]), (1, [12, 13])])
+
+    def test_matches_grouping_by_for_sorted_input(self):
+        items = sorted((n * 7919) % 100 for n in range(1000))
+        self.assertListEqual(transduce(grouping_runs(lambda x: x // 7), appending(), items),
+                             transduce(grouping_by(lambda x: x // 7), appending(), items))
+
+    def test_distinct_consecutive(self):
+        result = transduce(transducer=distinct_consecutive(),
+                           reducer=appending(),
+                           iterable=[1, 1, 3, 5, 5, 2, 1, 2, 2])
+        self.assertListEqual(result, [1, 3, 5, 2, 1, 2])
+
+    def test_distinct_consecutive_key(self):
+        result = transduce(transducer=distinct_consecutive(key=str.lower),
+                           reducer=appending(),
+                           iterable=['a', 'A', 'b', 'B', 'a'])
+        self.assertListEqual(result, ['a', 'b', 'a'])
+
+
+class TestPartitioningBy(unittest.TestCase):
+
+    def test_independent_state_per_key(self):
+        result = transduce(transducer=partitioning_by(lambda x: x % 2, compose(pairwise(), mapping(sum))),
+                           reducer=appending(),
+                           iterable=range(8))
+        self.assertListEqual(result, [2, 4, 6, 8, 10, 12])
+
+    def test_complete_flushes_partitions(self):
+        result = transduce(transducer=partitioning_by(str.lower, batching(2), tagged=True),
+                           reducer=appending(),
+                           iterable=['a', 'b', 'A', 'c', 'B'])
+        self.assertListEqual(result, [('a', ['a', 'A']), ('b', ['b', 'B']), ('c', ['c'])])
+
+    def test_partition_termination_is_local(self):
+        result = transduce(transducer=partitioning_by(lambda x: x % 3, taking(2)),
+                           reducer=appending(),
+                           iterable=range(12))
+        self.assertListEqual(result, [0, 1, 2, 3, 4, 5])
+
+    def test_downstream_termination_propagates(self):
+        stats = {}
+        result = transduce(transducer=compose(partitioning_by(lambda x: x % 2, batching(3), stats=stats),
+                                              taking(2)),
+                           reducer=appending(),
+                           iterable=range(5))
+        self.assertListEqual(result, [[0, 2, 4], [1, 3]])
+        self.assertEqual(stats['partitions'], 2)
+
+    def test_partitions_are_not_flushed_after_downstream_termination(self):
+        result = transduce(transducer=compose(partitioning_by(lambda x: x % 2, batching(2)), taking(3)),
+                           reducer=appending(),
+                           iterable=range(20))
+        self.assertListEqual(result, [[0, 2], [1, 3], [4, 6]])
+
+    def test_max_partitions_evicts_least_recently_active(self):
+        stats = {}
+        result = transduce(transducer=partitioning_by(lambda x: x[0], batching(5), max_partitions=2,
+                                                      tagged=True, stats=stats),
+                           reducer=appending(),
+                           iterable=['a1', 'b1', 'a2', 'c1', 'a3', 'b2'])
+        self.assertListEqual(result, [('b', ['b1']), ('c', ['c1']), ('a', ['a1', 'a2', 'a3']), ('b', ['b2'])])
+        self.assertDictEqual(stats, {'partitions': 4, 'evictions': 2})
+
+    def test_idle_partitions_are_evicted(self):
+        now = [0]
+        result = transduce(transducer=partitioning_by(lambda x: x[0], batching(5), idle=10, clock=lambda: now[0]),
+                           reducer=appending(),
+                           iterable=(now.__setitem__(0, t) or item
+                                     for t, item in [(0, 'a1'), (5, 'b1'), (12, 'b2'), (13, 'a2'), (14, 'b3')]))
+        self.assertListEqual(result, [['a1'], ['a2'], ['b1', 'b2', 'b3']])
+
+    def test_evicted_terminated_partition_restarts(self):
+        result = transduce(transducer=partitioning_by(lambda x: x[0], taking(1), max_partitions=1),
+                           reducer=appending(),
+                           iterable=['a1', 'a2', 'b1', 'a3'])
+        self.assertListEqual(result, ['a1', 'b1', 'a3'])
+
+    def test_max_partitions_less_than_one_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            partitioning_by(len, mapping(str), max_partitions=0)
+
+    def test_idle_not_positive_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            partitioning_by(len, mapping(str), idle=0)
+
+
+class TestSampling(unittest.TestCase):
+
+    def test_sample_size_is_near_rate(self):
+        result = transduce(transducer=sampling(0.01, seed=0),
+                           reducer=appending(),
+                           iterable=range(100000))
+        self.assertAlmostEqual(len(result), 1000, delta=150)
+        self.assertListEqual(result, sorted(set(result)))
+
+    def test_seed_is_deterministic(self):
+        first = transduce(sampling(0.1, seed=42), appending(), range(1000))
+        second = transduce(sampling(0.1, seed=42), appending(), range(1000))
+        self.assertListEqual(first, second)
+
+    def test_batches_match_steps(self):
+        self.assertListEqual(transduce(sampling(0.05, seed=3), appending(), range(10000), chunk_size=64),
+                             transduce(sampling(0.05, seed=3), appending(), range(10000)))
+
+    def test_rate_of_one_passes_every_item(self):
+        self.assertListEqual(transduce(sampling(1), appending(), range(10)), list(range(10)))
+
+    def test_rate_out_of_range_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            sampling(0)
+        with self.assertRaises(ValueError):
+            sampling(1.5)
+
+
+class TestReservoirSampling(unittest.TestCase):
+
+    def test_sample_has_k_distinct_items(self):
+        result = transduce(transducer=reservoir_sampling(10, seed=0),
+                           reducer=appending(),
+                           iterable=range(10000))
+        self.assertEqual(len(set(result)), 10)
+        self.assertTrue(all(0 <= item < 10000 for item in result))
+
+    def test_fewer_than_k_items_are_all_passed_on(self):
+        result = transduce(reservoir_sampling(10), appending(), range(4))
+        self.assertListEqual(result, [0, 1, 2, 3])
+
+    def test_every_item_is_equally_likely(self):
+        counts = [0] * 20
+        for seed in range(2000):
+            for item in transduce(reservoir_sampling(5, seed=seed), appending(), range(20)):
+                counts[item] += 1
+        for count in counts:
+            self.assertAlmostEqual(count, 500, delta=100)
+
+    def test_batches_match_steps(self):
+        self.assertListEqual(transduce(reservoir_sampling(7, seed=5), appending(), range(5000), chunk_size=64),
+                             transduce(reservoir_sampling(7, seed=5), appending(), range(5000)))
+
+    def test_downstream_early_termination(self):
+        result = transduce(compose(reservoir_sampling(10, seed=0), taking(3)), appending(), range(100))
+        self.assertEqual(len(result), 3)
+
+    def test_k_less_than_one_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            reservoir_sampling(0)
+
+
+class TestSamplingBy(unittest.TestCase):
+
+    def test_k_items_from_each_stratum(self):
+        result = transduce(transducer=sampling_by(lambda x: x % 3, 4, seed=0),
+                           reducer=appending(),
+                           iterable=range(300))
+        self.assertListEqual([item % 3 for item in result], [0] * 4 + [1] * 4 + [2] * 4)
+        self.assertEqual(len(set(result)), 12)
+
+    def test_small_strata_are_passed_on_whole(self):
+        result = transduce(sampling_by(len, 3, seed=0), appending(), ['a', 'bb', 'c', 'dd', 'eee'])
+        self.assertListEqual(result, ['a', 'c', 'bb', 'dd', 'eee'])
+
+    def test_seed_is_deterministic(self):
+        self.assertListEqual(transduce(sampling_by(lambda x: x % 5, 2, seed=9), appending(), range(1000)),
+                             transduce(sampling_by(lambda x: x % 5, 2, seed=9), appending(), range(1000)))
+
+    def test_k_less_than_one_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            sampling_by(len, 0)
+
+
+class TestMappingConcurrent(unittest.TestCase):
+
+    def test_ordered(self):
+        result = transduce(transducer=mapping_concurrent(lambda x: x*x, max_workers=4),
+                           reducer=appending(),
+                           iterable=range(50))
+        self.assertListEqual(result, [x*x for x in range(50)])
+
+    def test_ordered_with_uneven_latency(self):
+        def slow_for_small(x):
+            time.sleep(0.01 * (5 - x))
+            return x
+        result = transduce(transducer=mapping_concurrent(slow_for_small, max_workers=5),
+                           reducer=appending(),
+                           iterable=range(5))
+        self.assertListEqual(result, [0, 1, 2, 3, 4])
+
+    def test_unordered(self):
+        result = transduce(transducer=mapping_concurrent(lambda x: x*x, max_workers=4, ordered=False),
+                           reducer=appending(),
+                           iterable=range(50))
+        self.assertCountEqual(result, [x*x for x in range(50)])
+
+    def test_transforms_run_concurrently(self):
+        barrier = threading.Barrier(4, timeout=5)
+
+        def waiting(x):
+            barrier.wait()
+            return x
+
+        result = transduce(transducer=mapping_concurrent(waiting, max_workers=4),
+                           reducer=appending(),
+                           iterable=range(8))
+        self.assertListEqual(result, list(range(8)))
+
+    def test_in_flight_is_bounded(self):
+        lock = threading.Lock()
+        counts = {'current': 0, 'peak': 0}
+
+        def tracking(x):
+            with lock:
+                counts['current'] += 1
+                counts['peak'] = max(counts['peak'], counts['current'])
+            time.sleep(0.001)
+            with lock:
+                counts['current'] -= 1
+            return x
+
+        transduce(transducer=mapping_concurrent(tracking, max_workers=8, max_in_flight=3),
+                  reducer=appending(),
+                  iterable=range(30))
+        self.assertLessEqual(counts['peak'], 3)
+
+    def test_early_termination(self):
+        result = transduce(transducer=compose(mapping_concurrent(lambda x: x + 1, max_workers=4),
+                                              taking(3)),
+                           reducer=appending(),
+                           iterable=range(100))
+        self.assertListEqual(result, [1, 2, 3])
+
+    def test_transform_exception_is_raised(self):
+        def failing(x):
+            raise KeyError(x)
+
+        with self.assertRaises(KeyError):
+            transduce(transducer=mapping_concurrent(failing),
+                      reducer=appending(),
+                      iterable=range(5))
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            mapping_concurrent(str, max_workers=0)
+        with self.assertRaises(ValueError):
+            mapping_concurrent(str, max_in_flight=0)
+
+
+class TestChunkedTransduction(unittest.TestCase):
+
+    def assertChunkedEqual(self, transducer, reducer, iterable):
+        expected = transduce(transducer, reducer, iterable)
+        for chunk_size in (1, 2, 3, 7, 100):
+            result = transduce(transducer, reducer, iterable, chunk_size=chunk_size)
+            self.assertEqual(result, expected, "chunk_size={}".format(chunk_size))
+
+    def test_chunk_size_validation(self):
+        with self.assertRaises(ValueError):
+            transduce(mapping(lambda x: x), appending(), range(5), chunk_size=0)
+
+    def test_identity(self):
+        self.assertChunkedEqual(Transducer, appending(), range(20))
+
+    def test_mapping(self):
+        self.assertChunkedEqual(mapping(lambda x: x*x), appending(), range(20))
+
+    def test_filtering(self):
+        self.assertChunkedEqual(filtering(lambda x: x % 3 == 0), appending(), range(20))
+
+    def test_enumerating(self):
+        self.assertChunkedEqual(enumerating(start=5), appending(), range(20))
+
+    def test_mapcatting(self):
+        self.assertChunkedEqual(mapcatting(list), appending(), ['new', 'found', 'land'])
+
+    def test_taking(self):
+        for n in (1, 5, 10, 25):
+            self.assertChunkedEqual(taking(n), appending(), range(20))
+
+    def test_taking_while(self):
+        self.assertChunkedEqual(taking_while(lambda x: x < 11), appending(), range(20))
+
+    def test_dropping(self):
+        for n in (0, 5, 10, 25):
+            self.assertChunkedEqual(dropping(n), appending(), range(20))
+
+    def test_dropping_while(self):
+        self.assertChunkedEqual(dropping_while(lambda x: x < 11), appending(), range(20))
+
+    def test_repeating(self):
+        self.assertChunkedEqual(repeating(3), appending(), range(20))
+
+    def test_stateful_transducer_without_step_batch(self):
+        self.assertChunkedEqual(batching(3), appending(), range(20))
+
+    def test_adding_reducer(self):
+        self.assertChunkedEqual(mapping(lambda x: x % 4), adding(), range(20))
+
+    def test_conjoining_reducer(self):
+        self.assertChunkedEqual(mapping(lambda x: x * 2), conjoining(), range(20))
+
+    def test_chained_transducers(self):
+        self.assertChunkedEqual(compose(mapping(lambda x: x*x),
+                                        filtering(lambda x: x % 5 != 0),
+                                        enumerating(),
+                                        dropping(2),
+                                        taking(6),
+                                        mapping(lambda p: p[1])),
+                                appending(),
+                                range(100))
+
+    def test_termination_consumes_no_further_items(self):
+        iterator = iter(range(20))
+        result = transduce(taking(4), appending(), iterator, chunk_size=3)
+        self.assertListEqual(result, [0, 1, 2, 3])
+        self.assertListEqual(list(iterator), list(range(6, 20)))
+
+
 if __name__ == '__main__':
     unittest.main()
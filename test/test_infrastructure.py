@@ -1 +1,79 @@
+import pickle
+import unittest
+from transducer.functional import compose
+from transducer.infrastructure import Reduced, Transducer, stages, step_batch
+from transducer.reducers import appending, adding, conjoining, expecting_single, completing
+from transducer.transducers import (mapping, filtering, reducing, enumerating, first, last, reversing, ordering,
+                                    counting, scanning, taking, dropping_while, distinct, taking_while, dropping,
+                                    element_at, mapcatting, pairwise, batching, windowing, repeating)
 
+
+class TestReduced(unittest.TestCase):
+
+    def test_value(self):
+        self.assertEqual(Reduced(42).value, 42)
+
+    def test_idempotent(self):
+        reduced = Reduced(42)
+        self.assertIs(Reduced(reduced), reduced)
+
+    def test_has_no_instance_dictionary(self):
+        with self.assertRaises(AttributeError):
+            Reduced(42).__dict__
+
+    def test_pickle(self):
+        reduced = pickle.loads(pickle.dumps(Reduced([1, 2])))
+        self.assertIsInstance(reduced, Reduced)
+        self.assertEqual(reduced.value, [1, 2])
+
+
+class TestSlots(unittest.TestCase):
+
+    def test_built_in_stages_have_no_instance_dictionary(self):
+        transducer = compose(mapping(str), filtering(bool), reducing(max), enumerating(), first(), last(),
+                             reversing(), ordering(), counting(), scanning(max), taking(1), dropping_while(bool),
+                             distinct(), taking_while(bool), dropping(1), element_at(1), mapcatting(list),
+                             pairwise(), batching(1), windowing(1), repeating(1), Transducer)
+        for reducer in (appending(), adding(), conjoining(), expecting_single(), completing(max)):
+            for stage in stages(transducer(reducer)):
+                with self.subTest(stage=stage):
+                    self.assertFalse(hasattr(stage, '__dict__'))
+
+    def test_subclasses_without_slots_remain_supported(self):
+        class Doubling(Transducer):
+
+            def step(self, result, item):
+                self.last_item = item
+                return self._reducer(result, item * 2)
+
+        doubling = Doubling(appending())
+        self.assertListEqual(doubling.step([], 3), [6])
+        self.assertEqual(doubling.last_item, 3)
+
+
+class TestStepBatch(unittest.TestCase):
+
+    def test_reducer_with_step_batch(self):
+        result = step_batch(appending(), [1], [2, 3, 4])
+        self.assertListEqual(result, [1, 2, 3, 4])
+
+    def test_plain_reducing_function(self):
+        result = step_batch(lambda x, y: x + y, 0, [2, 3, 4])
+        self.assertEqual(result, 9)
+
+    def test_plain_reducing_function_terminates_early(self):
+        calls = []
+
+        def summing_to_five(x, y):
+            calls.append(y)
+            total = x + y
+            return Reduced(total) if total >= 5 else total
+
+        result = step_batch(summing_to_five, 0, [2, 3, 4])
+        self.assertIsInstance(result, Reduced)
+        self.assertEqual(result.value, 5)
+        self.assertListEqual(calls, [2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import time
+import unittest
+from transducer import coop, eager, lazy, lazy_coop, react
+from transducer.functional import compose
+from transducer.instrument import profiled, Profiled
+from transducer.reducers import appending
+from transducer.sinks import CollectingSink
+from transducer.sources import iterable_source
+from transducer.transducers import amapping, mapping, filtering, taking, batching
+
+
+async def aiterate(iterable):
+    for item in iterable:
+        yield item
+
+
+async def collect(aiterable):
+    return [item async for item in aiterable]
+
+
+async def double(item):
+    return item * 2
+
+
+def pipeline():
+    return compose(mapping(lambda x: x + 1),
+                   filtering(lambda x: x % 2 == 0),
+                   batching(2))
+
+
+class TestProfiled(unittest.TestCase):
+
+    def test_disabled_returns_transducer(self):
+        transducer = pipeline()
+        self.assertIs(profiled(transducer, enabled=False), transducer)
+
+    def test_sample_less_than_one_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            profiled(pipeline(), sample=0)
+
+    def test_result_is_unchanged(self):
+        profile = profiled(pipeline())
+        self.assertListEqual(eager.transduce(profile, appending(), range(10)),
+                             eager.transduce(pipeline(), appending(), range(10)))
+
+    def test_item_counts_and_selectivity(self):
+        profile = profiled(pipeline())
+        eager.transduce(profile, appending(), range(10))
+        records = profile.as_dict()['stages']
+        self.assertListEqual([record['name'] for record in records],
+                             ['Mapping', 'Filtering', 'Batching', 'Appending'])
+        self.assertListEqual([record['items_in'] for record in records], [10, 10, 5, 3])
+        self.assertListEqual([record['items_out'] for record in records], [10, 5, 3, None])
+        self.assertEqual(records[1]['selectivity'], 0.5)
+        self.assertTrue(all(record['terminations'] == 0 for record in records))
+
+    def test_self_time_excludes_downstream_time(self):
+        def slow(x):
+            time.sleep(0.01)
+            return x
+        profile = profiled(compose(mapping(lambda x: x), mapping(slow)))
+        eager.transduce(profile, appending(), range(3))
+        outer, inner, _ = profile.as_dict()['stages']
+        self.assertGreaterEqual(outer['step_time'], 0.03)
+        self.assertLess(outer['step_self_time'], 0.01)
+        self.assertGreaterEqual(inner['step_self_time'], 0.03)
+
+    def test_termination_is_attributed_to_originating_stage(self):
+        profile = profiled(compose(mapping(str), taking(3), mapping(int)))
+        self.assertListEqual(eager.transduce(profile, appending(), range(10)), [0, 1, 2])
+        self.assertListEqual([record['terminations'] for record in profile.as_dict()['stages']],
+                             [0, 1, 0, 0])
+
+    def test_sampling_times_subset_of_steps(self):
+        profile = profiled(pipeline(), sample=4)
+        eager.transduce(profile, appending(), range(20))
+        first = profile.as_dict()['stages'][0]
+        self.assertEqual(first['items_in'], 20)
+        self.assertEqual(first['timed_steps'], 5)
+
+    def test_measurements_accumulate_until_reset(self):
+        profile = profiled(pipeline())
+        eager.transduce(profile, appending(), range(10))
+        eager.transduce(profile, appending(), range(10))
+        self.assertEqual(profile.profiles[0].items_in, 20)
+        profile.reset()
+        self.assertEqual(profile.profiles[0].items_in, 0)
+
+    def test_chunked_eager(self):
+        profile = profiled(pipeline())
+        result = eager.transduce(profile, appending(), range(10), chunk_size=3)
+        self.assertListEqual(result, [[2, 4], [6, 8], [10]])
+        self.assertListEqual([record['items_in'] for record in profile.as_dict()['stages']], [10, 10, 5, 3])
+
+    def test_lazy(self):
+        profile = profiled(pipeline())
+        self.assertListEqual(list(lazy.transduce(profile, range(10))), [[2, 4], [6, 8], [10]])
+        self.assertEqual(profile.as_dict()['stages'][2]['items_out'], 3)
+
+    def test_react(self):
+        profile = profiled(pipeline())
+        sink = CollectingSink()
+        target = react.transduce(profile, sink())
+        iterable_source(range(10), target)
+        target.close()
+        self.assertListEqual(list(sink), [[2, 4], [6, 8], [10]])
+        self.assertEqual(profile.as_dict()['stages'][3]['items_in'], 3)
+
+    def test_coop(self):
+        profile = profiled(pipeline())
+        result = asyncio.run(coop.transduce(profile, appending(), aiterate(range(10))))
+        self.assertListEqual(result, [[2, 4], [6, 8], [10]])
+
+    def test_asynchronous_stages_are_not_measured(self):
+        profile = profiled(compose(mapping(lambda x: x + 1), amapping(double), taking(2)))
+        self.assertListEqual(asyncio.run(collect(lazy_coop.transduce(profile, aiterate(range(10))))), [2, 4])
+        records = profile.as_dict()['stages']
+        self.assertTrue(records[1]['asynchronous'])
+        self.assertIsNone(records[1]['items_in'])
+        self.assertIsNone(records[0]['items_out'])
+        self.assertEqual(records[2]['items_in'], 2)
+        self.assertEqual(records[2]['terminations'], 1)
+
+    def test_report_and_json(self):
+        profile = profiled(pipeline())
+        eager.transduce(profile, appending(), range(10))
+        lines = profile.report().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertIn('Filtering', lines[2])
+        self.assertEqual(json.loads(profile.to_json()), profile.as_dict())
+
+    def test_returns_profiled(self):
+        self.assertIsInstance(profiled(pipeline()), Profiled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,5 +19,10 @@ class TestComposedTransducers(unittest.TestCase):
         for r, e in zip(result, expected):
             self.assertEqual(r, e)
 
+    def test_distinct_spilling_to_disk(self):
+        items = [(n * 7919) % 3000 for n in range(9000)]
+        result = transduce(transducer=distinct(memory_limit=100), iterable=items)
+        self.assertListEqual(list(result), list(dict.fromkeys(items)))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,115 @@
+import operator
+import unittest
+from transducer.eager import transduce
+from transducer.functional import compose
+from transducer.reducers import appending
+from transducer.transducers import (mapping, filtering, reducing, enumerating, first, reversing, ordering, counting,
+                                    scanning, taking, dropping_while, distinct, taking_while, dropping, pairwise,
+                                    batching, windowing, repeating)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+else:
+    from transducer import numpy as tnp
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestVectorizedTransduction(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.array([4.0, 1.0, 7.0, 1.0, 9.0, 3.0, 4.0, 8.0, 2.0, 6.0])
+
+    def assertTransducesLikeEager(self, transducer, data=None):
+        data = self.data if data is None else data
+        expected = transduce(transducer, appending(), data.tolist())
+        result = tnp.transduce(transducer, data)
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual(len(result), len(expected))
+        for r, e in zip(result, expected):
+            np.testing.assert_array_equal(r, e)
+
+    def test_vectorized_stages(self):
+        for transducer in (mapping(np.sqrt),
+                           mapping(tnp.vectorized(lambda a: a * 2 + 1)),
+                           filtering(tnp.vectorized(lambda a: a > 3)),
+                           scanning(operator.add),
+                           scanning(max, 5.0),
+                           reducing(operator.mul),
+                           reducing(np.add, 100.0),
+                           taking(4),
+                           dropping(4),
+                           taking_while(tnp.vectorized(lambda a: a < 8)),
+                           dropping_while(tnp.vectorized(lambda a: a < 8)),
+                           distinct(),
+                           pairwise(),
+                           windowing(3, padding=0.0),
+                           batching(5),
+                           batching(3),
+                           counting(),
+                           counting(tnp.vectorized(lambda a: a > 3)),
+                           reversing(),
+                           ordering(),
+                           ordering(reverse=True),
+                           repeating(2)):
+            with self.subTest(transducer=transducer):
+                self.assertTransducesLikeEager(transducer)
+
+    def test_per_item_stages(self):
+        for transducer in (mapping(lambda x: x * 2 if x > 3 else 0.0),
+                           filtering(lambda x: x > 3),
+                           enumerating(),
+                           windowing(3),
+                           first(lambda x: x > 5),
+                           ordering(key=lambda x: -x)):
+            with self.subTest(transducer=transducer):
+                self.assertTransducesLikeEager(transducer)
+
+    def test_distinct_keeps_each_nan(self):
+        data = np.array([1.0, np.nan, 2.0, np.nan, 1.0])
+        self.assertTransducesLikeEager(distinct(), data)
+        self.assertEqual(len(tnp.transduce(distinct(), data)), 4)
+
+    def test_vectorized_stages_remain_as_array(self):
+        result = tnp.transduce(compose(mapping(np.square), pairwise()), self.data)
+        self.assertEqual(result.shape, (9, 2))
+        self.assertEqual(result.dtype, self.data.dtype)
+
+    def test_mixed_chain(self):
+        self.assertTransducesLikeEager(compose(mapping(np.sqrt),
+                                               filtering(lambda x: x != 2.0),
+                                               scanning(operator.add),
+                                               pairwise(),
+                                               mapping(tnp.vectorized(lambda p: np.asarray(p).T[1] - np.asarray(p).T[0])),
+                                               taking(5)))
+
+    def test_per_item_stage_is_terminated_by_following_stage(self):
+        data = np.arange(10.0)
+        for terminating in (taking(3),
+                            taking_while(lambda x: x > -1),
+                            first(lambda x: x < 0)):
+            transducer = compose(mapping(lambda x: 1 / (x - 5)), terminating)
+            with self.subTest(transducer=terminating):
+                self.assertTransducesLikeEager(transducer, data)
+
+    def test_enumerating_retains_integer_indexes(self):
+        result = tnp.transduce(enumerating(), self.data)
+        self.assertListEqual([index for index, _ in result], list(range(10)))
+        self.assertTrue(all(type(index) is int for index, _ in result))
+        self.assertListEqual([item for _, item in result], self.data.tolist())
+
+    def test_empty_array(self):
+        self.assertTransducesLikeEager(compose(mapping(np.sqrt), windowing(2, padding=0.0)), np.array([]))
+
+    def test_vectorized_transform_with_wrong_shape_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            tnp.transduce(mapping(tnp.vectorized(np.sum)), self.data)
+
+    def test_vectorized_function_is_callable_per_item(self):
+        result = transduce(mapping(tnp.vectorized(lambda a: a * 2)), appending(), [1, 2, 3])
+        self.assertListEqual(result, [2, 4, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()
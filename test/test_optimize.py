@@ -0,0 +1,73 @@
+import unittest
+from transducer.eager import transduce
+from transducer.functional import compose
+from transducer.infrastructure import stages
+from transducer.optimize import fuse, Fused
+from transducer.reducers import appending
+from transducer.transducers import (mapping, filtering, enumerating, taking, batching, distinct,
+                                    Mapping, Taking)
+
+
+class TestFuse(unittest.TestCase):
+
+    def assertFusedEqual(self, transducer, iterable, **kwargs):
+        expected = transduce(transducer, appending(), iterable, **kwargs)
+        result = transduce(fuse(transducer), appending(), iterable, **kwargs)
+        self.assertListEqual(result, expected)
+
+    def test_run_of_stateless_stages_is_fused(self):
+        transducer = compose(mapping(lambda x: x + 1),
+                             mapping(lambda x: x * 2),
+                             filtering(lambda x: x % 3 != 0),
+                             enumerating())
+        chain = stages(fuse(transducer)(appending()))
+        self.assertEqual(len(chain), 2)
+        self.assertIsInstance(chain[0], Fused)
+        self.assertListEqual(transduce(fuse(transducer), appending(), range(6)),
+                             [(0, 2), (1, 4), (2, 8), (3, 10)])
+
+    def test_single_stage_is_not_fused(self):
+        chain = stages(fuse(mapping(str))(appending()))
+        self.assertEqual(len(chain), 2)
+        self.assertIsInstance(chain[0], Mapping)
+
+    def test_stateful_stages_separate_runs(self):
+        transducer = compose(mapping(lambda x: x * x),
+                             filtering(lambda x: x % 5 != 0),
+                             taking(6),
+                             mapping(lambda x: x + 1),
+                             mapping(lambda x: x // 2))
+        chain = stages(fuse(transducer)(appending()))
+        self.assertEqual([type(stage) for stage in chain[:-1]], [Fused, Taking, Fused])
+        self.assertFusedEqual(transducer, range(20))
+
+    def test_early_termination_downstream_of_fused_stage(self):
+        self.assertFusedEqual(compose(filtering(lambda x: x % 2 == 0),
+                                      mapping(lambda x: x * 3),
+                                      taking(3)),
+                              range(100))
+
+    def test_fused_stages_with_completion(self):
+        self.assertFusedEqual(compose(mapping(lambda x: x % 7),
+                                      filtering(lambda x: x != 3),
+                                      distinct(),
+                                      batching(2)),
+                              range(50))
+
+    def test_fused_transducer_is_reusable(self):
+        transducer = fuse(compose(enumerating(), mapping(lambda p: p[0] * p[1])))
+        first = transduce(transducer, appending(), range(5))
+        second = transduce(transducer, appending(), range(5))
+        self.assertListEqual(first, second)
+
+    def test_chunked(self):
+        self.assertFusedEqual(compose(mapping(lambda x: x * x),
+                                      filtering(lambda x: x % 5 != 0),
+                                      enumerating(start=1),
+                                      taking(7)),
+                              range(100),
+                              chunk_size=8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+from functools import partial
+import operator
+import unittest
+from transducer import parallel
+from transducer.eager import transduce
+from transducer.functional import compose
+from transducer.reducers import appending, adding, conjoining, completing
+from transducer.transducers import mapping, filtering, mapcatting, taking, enumerating, batching, pairwise
+
+
+def is_odd(x):
+    return x % 2 == 1
+
+
+def digits(x):
+    return str(x)
+
+
+class TestParallelTransduce(unittest.TestCase):
+
+    def assertParallelEqual(self, transducer, reducer_factory, iterable, **kwargs):
+        expected = transduce(transducer, reducer_factory(), iterable)
+        result = parallel.transduce(transducer, reducer_factory(), iterable, workers=2, chunk_size=7, **kwargs)
+        self.assertEqual(result, expected)
+
+    def test_stateless_stages_with_combining_reducers(self):
+        transducer = compose(mapping(partial(operator.mul, 3)), filtering(is_odd))
+        for reducer_factory in (appending, adding, conjoining, partial(completing, operator.add, 0, operator.add)):
+            with self.subTest(reducer=reducer_factory):
+                self.assertParallelEqual(transducer, reducer_factory, range(100))
+
+    def test_mapcatting(self):
+        self.assertParallelEqual(mapcatting(digits), appending, range(100))
+
+    def test_stateful_stages_run_serially(self):
+        self.assertParallelEqual(compose(filtering(is_odd),
+                                         mapping(partial(operator.mul, 3)),
+                                         enumerating(),
+                                         pairwise(),
+                                         batching(4)),
+                                 appending,
+                                 range(100))
+
+    def test_early_termination(self):
+        self.assertParallelEqual(compose(mapping(partial(operator.add, 1)), taking(30)), appending, range(1000))
+
+    def test_no_stateless_stages(self):
+        self.assertParallelEqual(taking(5), appending, range(100))
+
+    def test_init(self):
+        result = parallel.transduce(mapping(partial(operator.mul, 2)), completing(operator.add, 0, operator.add), range(10),
+                                    init=100, workers=2, chunk_size=3)
+        self.assertEqual(result, 190)
+
+    def test_chunk_size_validation(self):
+        with self.assertRaises(ValueError):
+            parallel.transduce(mapping(digits), appending(), range(10), chunk_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
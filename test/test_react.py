@@ -1,9 +1,11 @@
 import unittest
 from transducer.functional import compose
 from transducer.react import transduce
-from transducer.sinks import CollectingSink, SingularSink
+from transducer.infrastructure import Transducer
+from transducer.reducers import adding, appending, broadcasting
+from transducer.sinks import CollectingSink, ReducingSink, SingularSink
 from transducer.sources import iterable_source
-from transducer.transducers import (mapping, pairwise, filtering, first)
+from transducer.transducers import (mapping, pairwise, filtering, first, session, taking)
 
 
 class TestComposedTransducers(unittest.TestCase):
@@ -32,6 +34,32 @@ class TestComposedTransducers(unittest.TestCase):
         result = list(output)
         self.assertListEqual(result, ['double-click', 'double-click', 'double-click', 'double-click', 'double-click'])
 
+    def test_event_time_windows_are_sent_as_they_close(self):
+        clicks = [0.0, 0.2, 0.3, 2.0, 2.1, 5.0]
+        output = CollectingSink()
+        target = transduce(session(1.0), target=output())
+        iterable_source(iterable=clicks[:4], target=target)
+        self.assertListEqual(list(output), [(0.0, 1.3, [0.0, 0.2, 0.3])])
+        iterable_source(iterable=clicks[4:], target=target)
+        self.assertListEqual(list(output), [(2.0, 3.1, [2.0, 2.1])])
+        target.close()
+        self.assertListEqual(list(output), [(5.0, 6.0, [5.0])])
+
+    def test_broadcasting_to_reducing_sink(self):
+        output = ReducingSink(broadcasting((taking(2), appending()),
+                                           (Transducer, adding())))
+        target = transduce(mapping(len), target=output())
+        iterable_source(iterable=['a', 'bb', 'cc', 'a'], target=target)
+        target.close()
+        self.assertTupleEqual(output.value, ([1, 2], {1, 2}))
+
+    def test_broadcasting_to_reducing_sink_stops_when_all_branches_terminate(self):
+        output = ReducingSink(broadcasting((taking(2), appending()),
+                                           (first(lambda x: x > 1), appending())))
+        target = transduce(mapping(len), target=output())
+        iterable_source(iterable=['a', 'bb', 'cc', 'a'], target=target)
+        self.assertTupleEqual(output.value, ([1, 2], [2]))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,10 +1,12 @@
+import operator
 import unittest
 from transducer._util import empty_iter
 from transducer.eager import transduce
 from transducer.infrastructure import Transducer
-from transducer.reducers import expecting_single, appending, conjoining, adding, sending, completing
+from transducer.reducers import (expecting_single, appending, conjoining, adding, sending, completing,
+                                 broadcasting)
 from transducer.sinks import CollectingSink, SingularSink
-from transducer.transducers import mapping
+from transducer.transducers import mapping, filtering, taking, batching
 
 
 class TestAppending(unittest.TestCase):
@@ -57,6 +59,9 @@ class TestConjoining(unittest.TestCase):
                            init=[])
         self.assertEqual(result, [23, 78])
 
+    def test_combine(self):
+        self.assertEqual(conjoining().combine((1, 2), (3,)), (1, 2, 3))
+
 
 class TestAdding(unittest.TestCase):
 
@@ -79,6 +84,9 @@ class TestAdding(unittest.TestCase):
                       (23, 78),
                       init=tuple())
 
+    def test_combine(self):
+        self.assertEqual(adding().combine({1, 2}, {2, 3}), {1, 2, 3})
+
 
 class TestExpectingSingle(unittest.TestCase):
 
@@ -190,3 +198,75 @@ class TestCompleting(unittest.TestCase):
                            multiplying,
                            [4, 2, 1, 9])
         self.assertEqual(result, 72)
+
+
+class TestCombining(unittest.TestCase):
+
+    def test_completing_without_combiner_raises_not_implemented_error(self):
+        with self.assertRaises(NotImplementedError):
+            completing(lambda count, item: count + 1, 0).combine(3, 4)
+
+    def test_completing_combines_with_combiner(self):
+        counting = completing(lambda count, item: count + 1, 0, combiner=operator.add)
+        self.assertEqual(counting.combine(3, 4), 7)
+
+    def test_unsupported_combine_raises_not_implemented_error(self):
+        with self.assertRaises(NotImplementedError):
+            expecting_single().combine(None, None)
+
+
+class TestBroadcasting(unittest.TestCase):
+
+    def test_each_branch_reduces_every_item(self):
+        result = transduce(Transducer,
+                           broadcasting((Transducer, completing(lambda count, _: count + 1, 0)),
+                                        (mapping(lambda x: x % 3), adding()),
+                                        (Transducer, completing(max, float('-inf')))),
+                           [4, 1, 7, 3, 5])
+        self.assertTupleEqual(result, (5, {0, 1, 2}, 7))
+
+    def test_branches_terminate_independently(self):
+        consumed = []
+        result = transduce(mapping(lambda x: consumed.append(x) or x),
+                           broadcasting((taking(2), appending()),
+                                        (filtering(lambda x: x == 4), expecting_single()),
+                                        (taking(3), conjoining())),
+                           range(10))
+        self.assertTupleEqual(result, ([0, 1], 4, (0, 1, 2)))
+        self.assertListEqual(consumed, list(range(10)))
+
+    def test_terminates_when_all_branches_have_terminated(self):
+        consumed = []
+        result = transduce(mapping(lambda x: consumed.append(x) or x),
+                           broadcasting((taking(2), appending()),
+                                        (taking(4), appending())),
+                           range(10))
+        self.assertTupleEqual(result, ([0, 1], [0, 1, 2, 3]))
+        self.assertListEqual(consumed, [0, 1, 2, 3])
+
+    def test_terminated_branches_are_completed(self):
+        result = transduce(Transducer,
+                           broadcasting((taking(3), appending()),
+                                        (batching(2), appending())),
+                           range(5))
+        self.assertTupleEqual(result, ([0, 1, 2], [[0, 1], [2, 3], [4]]))
+
+    def test_batches(self):
+        result = transduce(Transducer,
+                           broadcasting((taking(3), appending()),
+                                        (mapping(lambda x: x * x), appending())),
+                           range(7),
+                           chunk_size=2)
+        self.assertTupleEqual(result, ([0, 1, 2], [0, 1, 4, 9, 16, 25, 36]))
+
+    def test_instance_can_be_reused(self):
+        reducer = broadcasting((taking(2), appending()),
+                               (mapping(lambda x: x * 10), appending()))
+        first = transduce(Transducer, reducer, range(5))
+        second = transduce(Transducer, reducer, range(5))
+        self.assertTupleEqual(first, ([0, 1], [0, 10, 20, 30, 40]))
+        self.assertTupleEqual(second, first)
+
+    def test_no_branches_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            broadcasting()
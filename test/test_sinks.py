@@ -1,7 +1,9 @@
 import unittest
 from io import StringIO
 
-from transducer.sinks import rprint, null_sink, CollectingSink, SingularSink
+from transducer.reducers import appending, completing
+from transducer.sinks import rprint, null_sink, CollectingSink, SingularSink, ReducingSink
+from transducer.transducers import taking
 
 
 class TestNullSink(unittest.TestCase):
@@ -176,4 +178,31 @@ class TestSingularSink(unittest.TestCase):
         singular_sink = SingularSink()
         sink = singular_sink()
         sink.send(78)
-        self.assertTrue(singular_sink.has_value)
\ No newline at end of file
+        self.assertTrue(singular_sink.has_value)
+
+
+class TestReducingSink(unittest.TestCase):
+
+    def test_closed_sink_has_completed_value(self):
+        reducing_sink = ReducingSink(completing(lambda x, y: x + y, 0))
+        sink = reducing_sink()
+        sink.send(3)
+        sink.send(4)
+        self.assertFalse(reducing_sink.has_value)
+        sink.close()
+        self.assertEqual(reducing_sink.value, 7)
+
+    def test_unclosed_sink_value_raises_runtime_error(self):
+        reducing_sink = ReducingSink(appending())
+        sink = reducing_sink()
+        sink.send(1)
+        with self.assertRaises(RuntimeError):
+            reducing_sink.value
+
+    def test_early_termination_finishes_sink(self):
+        reducing_sink = ReducingSink(taking(2)(appending()))
+        sink = reducing_sink()
+        sink.send(42)
+        with self.assertRaises(StopIteration):
+            sink.send(43)
+        self.assertListEqual(reducing_sink.value, [42, 43])
@@ -0,0 +1,199 @@
+from collections import Counter
+import pickle
+import random
+import unittest
+from transducer import parallel
+from transducer.eager import transduce
+from transducer.functional import compose
+from transducer.infrastructure import Transducer
+from transducer.sketches import count_min, heavy_hitters, hyperloglog, quantiles
+from transducer.transducers import mapping, taking
+
+
+def zipf_items(n, seed=0):
+    rng = random.Random(seed)
+    return [int(rng.paretovariate(1.2)) for _ in range(n)]
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+    def test_empty(self):
+        self.assertEqual(transduce(Transducer, hyperloglog(), []).cardinality(), 0)
+
+    def test_small_cardinality_is_nearly_exact(self):
+        sketch = transduce(Transducer, hyperloglog(), [1, 2, 3, 2, 1, 'a', 'a', b'a', (1, 'a')])
+        self.assertEqual(sketch.cardinality(), 6)
+
+    def test_large_cardinality_is_within_error(self):
+        sketch = transduce(mapping(lambda x: x % 50000), hyperloglog(precision=12), range(200000))
+        self.assertAlmostEqual(sketch.cardinality(), 50000, delta=50000 * 4 * 1.04 / 64)
+
+    def test_merge_matches_single_sketch(self):
+        items = list(range(30000))
+        whole = transduce(Transducer, hyperloglog(), items)
+        reducer = hyperloglog()
+        left = transduce(Transducer, reducer, items[:20000])
+        right = transduce(Transducer, reducer, items[10000:])
+        self.assertEqual(reducer.combine(left, right).cardinality(), whole.cardinality())
+
+    def test_merge_different_precision_raises_value_error(self):
+        left = transduce(Transducer, hyperloglog(precision=10), [1])
+        right = transduce(Transducer, hyperloglog(precision=11), [1])
+        with self.assertRaises(ValueError):
+            left.merge(right)
+
+    def test_precision_out_of_range_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            hyperloglog(precision=3)
+        with self.assertRaises(ValueError):
+            hyperloglog(precision=19)
+
+
+class TestQuantiles(unittest.TestCase):
+
+    def setUp(self):
+        self.items = list(range(100000))
+        random.Random(1).shuffle(self.items)
+
+    def test_quantiles_are_within_error(self):
+        sketch = transduce(Transducer, quantiles(seed=0), self.items)
+        self.assertEqual(len(sketch), 100000)
+        for q, estimate in zip((0.1, 0.5, 0.9, 0.99), sketch.quantiles((0.1, 0.5, 0.9, 0.99))):
+            self.assertAlmostEqual(estimate / 100000, q, delta=0.02)
+        self.assertAlmostEqual(sketch.rank(25000), 0.25, delta=0.02)
+
+    def test_extremes_are_exact(self):
+        sketch = transduce(Transducer, quantiles(seed=0), self.items)
+        self.assertEqual(sketch.quantile(0), 0)
+        self.assertEqual(sketch.quantile(1), 99999)
+
+    def test_memory_is_bounded(self):
+        sketch = transduce(Transducer, quantiles(k=100, seed=0), self.items)
+        self.assertLess(sum(len(level) for level in sketch._levels), 400)
+
+    def test_small_input_is_exact(self):
+        sketch = transduce(Transducer, quantiles(), [5, 1, 4, 2, 3])
+        self.assertListEqual(sketch.quantiles((0.2, 0.6, 1.0)), [1, 3, 5])
+
+    def test_merge(self):
+        reducer = quantiles(seed=0)
+        left = transduce(Transducer, reducer, self.items[:60000])
+        right = transduce(Transducer, reducer, self.items[60000:])
+        merged = reducer.combine(left, right)
+        self.assertEqual(len(merged), 100000)
+        self.assertAlmostEqual(merged.quantile(0.5) / 100000, 0.5, delta=0.02)
+        self.assertLess(sum(len(level) for level in merged._levels), 700)
+
+    def test_seed_is_reproducible(self):
+        self.assertListEqual(transduce(Transducer, quantiles(k=20, seed=7), self.items).quantiles((0.1, 0.5, 0.9)),
+                             transduce(Transducer, quantiles(k=20, seed=7), self.items).quantiles((0.1, 0.5, 0.9)))
+
+    def test_reducer_instance_is_reproducible(self):
+        reducer = quantiles(k=20, seed=7)
+        first = transduce(Transducer, reducer, self.items)
+        second = transduce(Transducer, reducer, self.items)
+        self.assertListEqual(first._levels, second._levels)
+        self.assertListEqual(first.quantiles((0.1, 0.5, 0.9)), second.quantiles((0.1, 0.5, 0.9)))
+
+    def test_seeded_sketches_of_different_items_make_independent_choices(self):
+        reducer = quantiles(k=20, seed=7)
+        # Copies of a reducer, as in separate worker processes.
+        copies = [pickle.loads(pickle.dumps(reducer)) for _ in range(2)]
+        left = transduce(Transducer, copies[0], self.items[:1000])
+        right = transduce(Transducer, copies[1], self.items[1000:2000])
+        self.assertNotEqual(left._random.getstate(), right._random.getstate())
+
+    def test_empty_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            transduce(Transducer, quantiles(), []).quantile(0.5)
+
+    def test_q_out_of_range_raises_value_error(self):
+        sketch = transduce(Transducer, quantiles(), [1])
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+
+
+class TestCountMin(unittest.TestCase):
+
+    def test_estimates_are_bounded(self):
+        items = zipf_items(50000)
+        counts = Counter(items)
+        sketch = transduce(Transducer, count_min(epsilon=0.001, delta=0.01), items)
+        self.assertEqual(sketch.total, 50000)
+        for item, n in counts.items():
+            self.assertGreaterEqual(sketch.estimate(item), n)
+            self.assertLessEqual(sketch.estimate(item), n + 0.001 * 50000 * 2)
+
+    def test_merge(self):
+        items = ['a', 'b', 'a', 'c', 'a', 'b']
+        reducer = count_min(epsilon=0.01)
+        merged = reducer.combine(transduce(Transducer, reducer, items[:3]),
+                                 transduce(Transducer, reducer, items[3:]))
+        self.assertListEqual([merged.estimate(item) for item in 'abcd'], [3, 2, 1, 0])
+
+    def test_merge_different_dimensions_raises_value_error(self):
+        left = transduce(Transducer, count_min(epsilon=0.01), [1])
+        right = transduce(Transducer, count_min(epsilon=0.02), [1])
+        with self.assertRaises(ValueError):
+            left.merge(right)
+
+    def test_epsilon_out_of_range_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            count_min(epsilon=0)
+
+
+class TestHeavyHitters(unittest.TestCase):
+
+    def test_finds_most_frequent_items(self):
+        items = zipf_items(50000)
+        sketch = transduce(Transducer, heavy_hitters(capacity=50), items)
+        self.assertListEqual([item for item, _, _ in sketch.top(5)],
+                             [item for item, _ in Counter(items).most_common(5)])
+        counts = Counter(items)
+        for item, n, error in sketch.top():
+            self.assertTrue(n - error <= counts[item] <= n)
+
+    def test_evicts_lowest_count(self):
+        sketch = transduce(Transducer, heavy_hitters(capacity=2), ['a', 'a', 'b', 'c'])
+        self.assertListEqual(sketch.top(), [('a', 2, 0), ('c', 2, 1)])
+        self.assertEqual(sketch.estimate('b'), 2)
+
+    def test_merge(self):
+        items = zipf_items(20000)
+        reducer = heavy_hitters(capacity=30)
+        merged = reducer.combine(transduce(Transducer, reducer, items[:12000]),
+                                 transduce(Transducer, reducer, items[12000:]))
+        self.assertEqual(merged.total, 20000)
+        self.assertEqual(len(merged.top()), 30)
+        counts = Counter(items)
+        self.assertListEqual([item for item, _, _ in merged.top(3)],
+                             [item for item, _ in counts.most_common(3)])
+        for item, n, error in merged.top():
+            self.assertTrue(n - error <= counts[item] <= n)
+
+    def test_capacity_less_than_one_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            heavy_hitters(capacity=0)
+
+
+class TestSketchReduction(unittest.TestCase):
+
+    def test_early_termination(self):
+        sketch = transduce(taking(10), hyperloglog(), range(100))
+        self.assertEqual(sketch.cardinality(), 10)
+
+    def test_batches(self):
+        sketch = transduce(compose(mapping(str), taking(1000)), heavy_hitters(10), range(5000), chunk_size=64)
+        self.assertEqual(sketch.total, 1000)
+
+    def test_sketches_are_picklable(self):
+        sketch = transduce(Transducer, quantiles(seed=0), range(1000))
+        self.assertEqual(pickle.loads(pickle.dumps(sketch)).quantile(0.5), sketch.quantile(0.5))
+
+    def test_parallel(self):
+        sketch = parallel.transduce(Transducer, hyperloglog(), range(40000), workers=2, chunk_size=10000)
+        self.assertEqual(sketch.cardinality(), transduce(Transducer, hyperloglog(), range(40000)).cardinality())
+
+
+if __name__ == '__main__':
+    unittest.main()
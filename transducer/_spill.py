@@ -0,0 +1,108 @@
+"""Storage on disk for transducers whose state may exceed memory."""
+import os
+import pickle
+import sqlite3
+import tempfile
+import weakref
+
+
+def _remove(connection, path):
+    connection.close()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class SpilledSet:
+    """A set of keys stored in a temporary SQLite database.
+
+    Keys are stored in pickled form, so equal keys must pickle identically,
+    as do strings, bytes, integers and tuples of them. The database is
+    deleted by close(), or when the set is garbage collected.
+
+    Args:
+        spill_dir: The directory in which to create the database, or None
+            for the default temporary directory.
+    """
+
+    # The maximum number of keys looked up in each query, within SQLite's
+    # default limit on the number of parameters.
+    QUERY_SIZE = 500
+
+    def __init__(self, spill_dir=None):
+        descriptor, self._path = tempfile.mkstemp(prefix='transducer-', suffix='.sqlite', dir=spill_dir)
+        os.close(descriptor)
+        self._connection = sqlite3.connect(self._path)
+        self._connection.execute('PRAGMA journal_mode = OFF')
+        self._connection.execute('PRAGMA synchronous = OFF')
+        self._connection.execute('CREATE TABLE keys (key BLOB PRIMARY KEY) WITHOUT ROWID')
+        self._finalizer = weakref.finalize(self, _remove, self._connection, self._path)
+        self._size = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    def __len__(self):
+        return self._size
+
+    def update(self, keys):
+        """Add keys, none of which may already be present."""
+        rows = [(pickle.dumps(key, pickle.HIGHEST_PROTOCOL),) for key in keys]
+        with self._connection:
+            self._connection.executemany('INSERT INTO keys VALUES (?)', rows)
+        self._size += len(rows)
+
+    def intersection(self, keys):
+        """Return the set of those keys which are present."""
+        pickled = {pickle.dumps(key, pickle.HIGHEST_PROTOCOL): key for key in keys}
+        candidates = list(pickled)
+        present = set()
+        for start in range(0, len(candidates), self.QUERY_SIZE):
+            chunk = candidates[start:start + self.QUERY_SIZE]
+            query = 'SELECT key FROM keys WHERE key IN ({})'.format(', '.join('?' * len(chunk)))
+            present.update(pickled[row[0]] for row in self._connection.execute(query, chunk))
+        return present
+
+    def close(self):
+        """Delete the database."""
+        self._finalizer()
+
+
+class SpillFile:
+    """A temporary file holding runs of pickled items.
+
+    Each run is written in blocks, and can be read back lazily. Several runs
+    may be read concurrently, as when merging them, since each read seeks
+    to the block it needs. The file is deleted when closed.
+
+    Args:
+        spill_dir: The directory in which to create the file, or None for
+            the default temporary directory.
+        block_size: The number of items pickled together.
+    """
+
+    def __init__(self, spill_dir=None, block_size=1024):
+        self._file = tempfile.TemporaryFile(prefix='transducer-', dir=spill_dir)
+        self._block_size = block_size
+
+    def write(self, items):
+        """Write a sequence of items as a run, returning a handle with which to read it."""
+        file = self._file
+        file.seek(0, os.SEEK_END)
+        offsets = []
+        for start in range(0, len(items), self._block_size):
+            offsets.append(file.tell())
+            pickle.dump(items[start:start + self._block_size], file, pickle.HIGHEST_PROTOCOL)
+        return offsets
+
+    def read(self, run):
+        """Iterate over the items of a run."""
+        file = self._file
+        for offset in run:
+            file.seek(offset)
+            yield from pickle.load(file)
+
+    def close(self):
+        self._file.close()
@@ -1,4 +1,7 @@
+from array import array
+from collections.abc import Sequence
 from functools import wraps
+import math
 
 
 #  A sentinel for indicating unset function arguments in places
@@ -43,3 +46,154 @@ def iterator_or_none(iterator):
     except StopIteration:
         return None
     return prepend(first, iterator)
+
+
+class BloomFilter:
+    """A compact set which may report false positives but never false negatives.
+
+    Args:
+        capacity: The number of distinct items the filter is sized for.
+        error_rate: The target false positive rate when capacity items have
+            been added.
+    """
+
+    __slots__ = ('_bits', '_num_bits', '_num_hashes', '_count')
+
+    def __init__(self, capacity, error_rate):
+        self._num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._num_hashes = max(1, round(self._num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self._num_bits + 7) // 8)
+        self._count = 0
+
+    @property
+    def num_bits(self):
+        return self._num_bits
+
+    @property
+    def num_hashes(self):
+        return self._num_hashes
+
+    def __len__(self):
+        """The number of items added which were not already (apparently) present."""
+        return self._count
+
+    def _indexes(self, item):
+        h = hash((item,)) & 0xFFFFFFFFFFFFFFFF
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        num_bits = self._num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self._num_hashes)]
+
+    def __contains__(self, item):
+        """Whether an item is possibly present."""
+        bits = self._bits
+        return all(bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(item))
+
+    def add(self, item):
+        """Add an item, returning True if it was possibly already present."""
+        bits = self._bits
+        present = True
+        for index in self._indexes(item):
+            mask = 1 << (index & 7)
+            if not bits[index >> 3] & mask:
+                bits[index >> 3] |= mask
+                present = False
+        if not present:
+            self._count += 1
+        return present
+
+    @property
+    def false_positive_rate(self):
+        """The estimated probability that an item not added is reported as present."""
+        return (1.0 - math.exp(-self._num_hashes * self._count / self._num_bits)) ** self._num_hashes
+
+
+class WindowView(Sequence):
+    """A read-only view of the items in a RingBuffer.
+
+    The view is reused, and its contents change, as items are added to and
+    removed from the buffer.
+    """
+
+    __slots__ = ('_buffer', '_start', '_stop')
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._start = 0
+        self._stop = 0
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._buffer[i] for i in range(self._start, self._stop)[index]]
+        length = self._stop - self._start
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("WindowView index out of range")
+        return self._buffer[self._start + index]
+
+    def __iter__(self):
+        return map(self._buffer.__getitem__, range(self._start, self._stop))
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, list(self))
+
+
+class RingBuffer:
+    """A fixed capacity buffer of the most recent items, viewable without copying.
+
+    Each item is stored twice, size items apart, so that the current contents
+    always occupy a contiguous slice of the underlying storage.
+
+    Args:
+        size: The capacity of the buffer.
+        padding: If supplied, the buffer is initially full of this value.
+        typecode: If supplied, items are stored in an array.array with this
+            typecode, and views are read-only memoryviews.
+    """
+
+    __slots__ = ('_size', '_buffer', '_start', '_length', '_view')
+
+    def __init__(self, size, padding=UNSET, typecode=None):
+        self._size = size
+        fill = (0 if typecode is not None else None) if padding is UNSET else padding
+        if typecode is None:
+            self._buffer = [fill] * (2 * size)
+            self._view = WindowView(self._buffer)
+        else:
+            self._buffer = array(typecode, [fill]) * (2 * size)
+            self._view = memoryview(self._buffer).toreadonly()
+        self._start = 0
+        self._length = 0 if padding is UNSET else size
+
+    def __len__(self):
+        return self._length
+
+    def append(self, item):
+        """Add an item, discarding the oldest item if the buffer is full."""
+        size = self._size
+        if self._length == size:
+            position = self._start
+            self._start = (position + 1) % size
+        else:
+            position = (self._start + self._length) % size
+            self._length += 1
+        self._buffer[position] = item
+        self._buffer[position + size] = item
+
+    def popleft(self):
+        """Discard the oldest item."""
+        self._start = (self._start + 1) % self._size
+        self._length -= 1
+
+    def view(self):
+        """A view of the items in the buffer, oldest first, valid until the buffer is next modified."""
+        view = self._view
+        if isinstance(view, WindowView):
+            view._start = self._start
+            view._stop = self._start + self._length
+            return view
+        return view[self._start:self._start + self._length]
@@ -0,0 +1,471 @@
+"""Compilation of transducer chains into specialised loops.
+
+The chain of stages built by a transducer is inspected and Python source for
+a single function containing the whole reduction loop is generated, with the
+state of each stage held in local variables. Generated functions are cached
+by the shape of the chain, so compiling many chains of the same shape is
+cheap.
+"""
+import builtins
+from functools import lru_cache
+from itertools import repeat
+
+from transducer._util import UNSET
+from transducer.infrastructure import Reduced, Transducer, stages
+from transducer.reducers import Adding, Appending
+from transducer.transducers import (Mapping, Filtering, Enumerating, Mapcatting, Taking, TakingWhile, Dropping,
+                                    DroppingWhile, Distinct, Pairwise, Batching, Windowing, Scanning, Reducing,
+                                    First, Last, Counting, Repeating)
+
+
+class _Stop(Exception):
+    """Raised within generated code to terminate reduction."""
+
+
+# CPython limits the number of statically nested loops and try blocks, so
+# stages which introduce loops are only inlined up to this depth.
+_MAX_LOOP_DEPTH = 15
+
+
+def _indent(lines, levels=1):
+    return ['    ' * levels + line for line in lines]
+
+
+def _stop(index):
+    return ['stopped_at = {}'.format(index),
+            'raise _Stop']
+
+
+# ---------------------------------------------------------------------
+# Code generators for each known stage
+#
+# Stage i reads its input from the variable named by var and calls
+# rest(var) to obtain the code which passes an item on to stage i+1.
+# Items are discarded by continuing the innermost enclosing loop.
+
+class _Stage:
+
+    loops = 0
+
+    def variant(self, stage):
+        return None
+
+    def setup(self, i, variant):
+        return []
+
+    def step(self, i, variant, var, rest):
+        raise NotImplementedError
+
+    def complete(self, i, variant, rest):
+        return []
+
+
+class _Mapping(_Stage):
+
+    def setup(self, i, variant):
+        return ['s{0}_f = stages[{0}]._transform'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['x{0} = s{1}_f({2})'.format(i + 1, i, var)] + rest('x{}'.format(i + 1))
+
+
+class _Filtering(_Stage):
+
+    def setup(self, i, variant):
+        return ['s{0}_p = stages[{0}]._predicate'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['if not s{}_p({}):'.format(i, var),
+                '    continue'] + rest(var)
+
+
+class _Enumerating(_Stage):
+
+    def setup(self, i, variant):
+        return ['s{0}_n = stages[{0}]._counter'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['x{0} = (s{1}_n, {2})'.format(i + 1, i, var),
+                's{}_n += 1'.format(i)] + rest('x{}'.format(i + 1))
+
+
+class _Mapcatting(_Stage):
+
+    loops = 1
+
+    def setup(self, i, variant):
+        return ['s{0}_f = stages[{0}]._transform'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['for x{} in s{}_f({}):'.format(i + 1, i, var)] + _indent(rest('x{}'.format(i + 1)))
+
+
+class _Repeating(_Stage):
+
+    loops = 1
+
+    def setup(self, i, variant):
+        return ['s{0}_n = stages[{0}]._num_times'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['for x{} in repeat({}, s{}_n):'.format(i + 1, var, i)] + _indent(rest('x{}'.format(i + 1)))
+
+
+class _Taking(_Stage):
+
+    loops = 1
+
+    def setup(self, i, variant):
+        return ['s{0}_k = stages[{0}]._counter'.format(i),
+                's{0}_n = stages[{0}]._n'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        # The single-iteration loop ensures the termination test is reached
+        # even when a downstream stage discards the item.
+        return (['s{}_k += 1'.format(i),
+                 'for x{} in ({},):'.format(i + 1, var)]
+                + _indent(rest('x{}'.format(i + 1)))
+                + ['if s{0}_k >= s{0}_n:'.format(i)]
+                + _indent(_stop(i)))
+
+
+class _TakingWhile(_Stage):
+
+    def setup(self, i, variant):
+        return ['s{0}_p = stages[{0}]._predicate'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['if not s{}_p({}):'.format(i, var)] + _indent(_stop(i)) + rest(var)
+
+
+class _Dropping(_Stage):
+
+    def setup(self, i, variant):
+        return ['s{0}_k = stages[{0}]._counter'.format(i),
+                's{0}_n = stages[{0}]._n'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['if s{0}_k < s{0}_n:'.format(i),
+                '    s{}_k += 1'.format(i),
+                '    continue'] + rest(var)
+
+
+class _DroppingWhile(_Stage):
+
+    def setup(self, i, variant):
+        return ['s{0}_p = stages[{0}]._predicate'.format(i),
+                's{0}_d = stages[{0}]._dropping'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['if s{}_d:'.format(i),
+                '    s{0}_d = s{0}_p({1})'.format(i, var),
+                '    if s{}_d:'.format(i),
+                '        continue'] + rest(var)
+
+
+class _Distinct(_Stage):
+
+    def setup(self, i, variant):
+        return ['s{0}_seen = stages[{0}]._seen'.format(i),
+                's{0}_add = s{0}_seen.add'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['if {} in s{}_seen:'.format(var, i),
+                '    continue',
+                's{}_add({})'.format(i, var)] + rest(var)
+
+
+class _Pairwise(_Stage):
+
+    def setup(self, i, variant):
+        return ['s{0}_prev = stages[{0}]._previous_item'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['if s{}_prev is UNSET:'.format(i),
+                '    s{}_prev = {}'.format(i, var),
+                '    continue',
+                'x{} = (s{}_prev, {})'.format(i + 1, i, var),
+                's{}_prev = {}'.format(i, var)] + rest('x{}'.format(i + 1))
+
+
+class _Batching(_Stage):
+
+    loops = 1
+
+    def setup(self, i, variant):
+        return ['s{0}_pending = stages[{0}]._pending'.format(i),
+                's{0}_size = stages[{0}]._size'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['s{}_pending.append({})'.format(i, var),
+                'if len(s{0}_pending) < s{0}_size:'.format(i),
+                '    continue',
+                'x{} = s{}_pending'.format(i + 1, i),
+                's{}_pending = []'.format(i)] + rest('x{}'.format(i + 1))
+
+    def complete(self, i, variant, rest):
+        return (['if s{}_pending:'.format(i),
+                 '    for x{0} in (s{1}_pending,):'.format(i + 1, i)]
+                + _indent(rest('x{}'.format(i + 1)), 2))
+
+
+class _Windowing(_Stage):
+
+    loops = 1
+
+    def variant(self, stage):
+        return stage._padding is UNSET
+
+    def setup(self, i, variant):
+        return ['s{0}_w = stages[{0}]._window'.format(i),
+                's{0}_wt = stages[{0}]._window_type'.format(i),
+                's{0}_size = stages[{0}]._size'.format(i),
+                's{0}_pad = stages[{0}]._padding'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['s{}_w.append({})'.format(i, var),
+                'x{0} = s{1}_wt(s{1}_w)'.format(i + 1, i)] + rest('x{}'.format(i + 1))
+
+    def complete(self, i, unpadded, rest):
+        if unpadded:
+            lines = ['for _ in range(len(s{}_w) - 1):'.format(i),
+                     '    s{}_w.popleft()'.format(i)]
+        else:
+            lines = ['for _ in range(s{}_size - 1):'.format(i),
+                     '    s{0}_w.append(s{0}_pad)'.format(i)]
+        return (lines
+                + ['    x{0} = s{1}_wt(s{1}_w)'.format(i + 1, i)]
+                + _indent(rest('x{}'.format(i + 1))))
+
+
+class _Scanning(_Stage):
+
+    def setup(self, i, variant):
+        return ['s{0}_r = stages[{0}]._reducer2'.format(i),
+                's{0}_acc = stages[{0}]._accumulator'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['s{0}_acc = {1} if s{0}_acc is UNSET else s{0}_r(s{0}_acc, {1})'.format(i, var),
+                'x{} = s{}_acc'.format(i + 1, i)] + rest('x{}'.format(i + 1))
+
+
+class _Reducing(_Scanning):
+
+    loops = 1
+
+    def step(self, i, variant, var, rest):
+        return ['s{0}_acc = {1} if s{0}_acc is UNSET else s{0}_r(s{0}_acc, {1})'.format(i, var),
+                'continue']
+
+    def complete(self, i, variant, rest):
+        return ['for x{} in (s{}_acc,):'.format(i + 1, i)] + _indent(rest('x{}'.format(i + 1)))
+
+
+class _First(_Stage):
+
+    loops = 1
+
+    def setup(self, i, variant):
+        return ['s{0}_p = stages[{0}]._predicate'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return (['if not s{}_p({}):'.format(i, var),
+                 '    continue',
+                 'for x{} in ({},):'.format(i + 1, var)]
+                + _indent(rest('x{}'.format(i + 1)))
+                + _stop(i))
+
+
+class _Last(_Stage):
+
+    loops = 1
+
+    def setup(self, i, variant):
+        return ['s{0}_p = stages[{0}]._predicate'.format(i),
+                's{0}_last = stages[{0}]._last_seen'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['if s{}_p({}):'.format(i, var),
+                '    s{}_last = {}'.format(i, var),
+                'continue']
+
+    def complete(self, i, variant, rest):
+        return (['if s{}_last is not UNSET:'.format(i),
+                 '    for x{0} in (s{1}_last,):'.format(i + 1, i)]
+                + _indent(rest('x{}'.format(i + 1)), 2))
+
+
+class _Counting(_Stage):
+
+    loops = 1
+
+    def setup(self, i, variant):
+        return ['s{0}_p = stages[{0}]._predicate'.format(i),
+                's{0}_count = stages[{0}]._count'.format(i)]
+
+    def step(self, i, variant, var, rest):
+        return ['if s{}_p({}):'.format(i, var),
+                '    s{}_count += 1'.format(i),
+                'continue']
+
+    def complete(self, i, variant, rest):
+        return ['for x{} in (s{}_count,):'.format(i + 1, i)] + _indent(rest('x{}'.format(i + 1)))
+
+
+_STAGES = {
+    Mapping: _Mapping(),
+    Filtering: _Filtering(),
+    Enumerating: _Enumerating(),
+    Mapcatting: _Mapcatting(),
+    Repeating: _Repeating(),
+    Taking: _Taking(),
+    TakingWhile: _TakingWhile(),
+    Dropping: _Dropping(),
+    DroppingWhile: _DroppingWhile(),
+    Distinct: _Distinct(),
+    Pairwise: _Pairwise(),
+    Batching: _Batching(),
+    Windowing: _Windowing(),
+    Scanning: _Scanning(),
+    Reducing: _Reducing(),
+    First: _First(),
+    Last: _Last(),
+    Counting: _Counting(),
+}
+
+
+# ---------------------------------------------------------------------
+# Code generators for the final call in the loop, which is either to a
+# known reducer or to the first stage which could not be inlined.
+
+class _Appending(_Stage):
+
+    def step(self, i, variant, var, rest):
+        return ['result.append({})'.format(var)]
+
+
+class _Adding(_Stage):
+
+    def step(self, i, variant, var, rest):
+        return ['result.add({})'.format(var)]
+
+
+class _Calling(_Stage):
+
+    def setup(self, i, variant):
+        return ['final_step = final.step']
+
+    def step(self, i, variant, var, rest):
+        return (['result = final_step(result, {})'.format(var),
+                 'if isinstance(result, Reduced):',
+                 '    result = result.value']
+                + _indent(_stop(i)))
+
+
+_FINALS = {
+    Appending: _Appending(),
+    Adding: _Adding(),
+}
+
+_CALLING = _Calling()
+
+
+# ---------------------------------------------------------------------
+
+def _plan(reducer):
+    """Determine the inlinable stages of a chain.
+
+    Returns:
+        A 3-tuple containing the list of inlinable stage objects, the
+        signature of the generated code, and the final reducer to be called
+        from the generated loop, which is either the underlying reducer or
+        the first stage which cannot be inlined.
+    """
+    chain = stages(reducer)
+    inlined = []
+    signature = []
+    depth = 0
+    for stage in chain[:-1]:
+        generator = _STAGES.get(type(stage))
+        if generator is None or depth + generator.loops > _MAX_LOOP_DEPTH:
+            break
+        depth += generator.loops
+        inlined.append(stage)
+        signature.append((generator, generator.variant(stage)))
+    final = chain[len(inlined)]
+    if isinstance(final, Transducer):
+        signature.append((_CALLING, None))
+    else:
+        signature.append((_FINALS.get(type(final), _CALLING), None))
+    return inlined, tuple(signature), final
+
+
+def _emit(signature, i, var):
+    generator, variant = signature[i]
+    return generator.step(i, variant, var, lambda v: _emit(signature, i + 1, v))
+
+
+def _source(signature):
+    body = []
+    for i, (generator, variant) in enumerate(signature):
+        body.extend(generator.setup(i, variant))
+    body.append('stopped_at = -1')
+    body.append('try:')
+    body.append('    for x0 in iterable:')
+    body.extend(_indent(_emit(signature, 0, 'x0'), 2))
+    body.append('except _Stop:')
+    body.append('    pass')
+    for i, (generator, variant) in enumerate(signature[:-1]):
+        completion = generator.complete(i, variant, lambda v, i=i: _emit(signature, i + 1, v))
+        if completion:
+            # Stages upstream of a terminated stage do not flush on completion.
+            body.append('if stopped_at < {}:'.format(i))
+            body.append('    try:')
+            body.extend(_indent(completion, 2))
+            body.append('    except _Stop:')
+            body.append('        pass')
+    body.append('return result')
+    return '\n'.join(['def run(stages, final, iterable, result):'] + _indent(body))
+
+
+@lru_cache(maxsize=None)
+def _loop(signature):
+    namespace = {'Reduced': Reduced, 'UNSET': UNSET, '_Stop': _Stop, 'repeat': repeat}
+    code = builtins.compile(_source(signature), '<transducer.compiled>', 'exec')
+    exec(code, namespace)
+    return namespace['run']
+
+
+def compile(transducer, reducer):
+    """Compile a transducer and reducer into a single reducing function.
+
+    Known stages from transducer.transducers are inlined into one loop with
+    their state held in local variables. The first stage of an unknown type,
+    or one with a custom subclass, is called through its step() method from
+    the generated loop, and handles all stages downstream of it as usual.
+
+    Args:
+        transducer: The transducer to be compiled.
+        reducer: The reducer to which the transformed items will be passed.
+
+    Returns:
+        A function accepting an iterable and an optional init value, which
+        behaves like transducer.eager.transduce() for the given transducer
+        and reducer.
+    """
+
+    def compiled(iterable, init=UNSET):
+        r = transducer(reducer)
+        inlined, signature, final = _plan(r)
+        run = _loop(signature)
+        accumulator = r.initial() if init is UNSET else init
+        result = run(inlined, final, iterable, accumulator)
+        return final.complete(result)
+
+    return compiled
+
+
+# Transducible processes
+
+def transduce(transducer, reducer, iterable, init=UNSET):
+    return compile(transducer, reducer)(iterable, init)
@@ -1,5 +1,91 @@
+from collections import deque
+import inspect
+
 from transducer._util import UNSET
-from transducer.infrastructure import Reduced
+from transducer.infrastructure import AsyncReducer, Reduced, Reducer, stages
+
+
+class _Buffering(Reducer):
+    """Holds the items passed from a synchronous stage to an asynchronous one."""
+
+    __slots__ = ('items',)
+
+    def __init__(self):
+        self.items = deque()
+
+    def initial(self):
+        raise NotImplementedError
+
+    def step(self, result, item):
+        self.items.append(item)
+        return result
+
+
+def _is_asynchronous(reducer):
+    return isinstance(reducer, AsyncReducer) or inspect.iscoroutinefunction(getattr(reducer, 'step', None))
+
+
+class Pipeline:
+    """A chain of stages some of which have asynchronous step() and complete() methods.
+
+    The chain is divided into synchronous segments at each asynchronous
+    stage. The last synchronous stage of each segment passes its items to a
+    buffer, from which they are awaited into the following asynchronous stage.
+
+    Args:
+        reducer: The outermost stage of a chain of stages, as returned by
+            a transducer.
+    """
+
+    def __init__(self, reducer):
+        chain = stages(reducer)
+        self._head = chain[0]
+        self._head_is_asynchronous = _is_asynchronous(self._head)
+        self._links = []
+        for upstream, stage in zip(chain, chain[1:]):
+            if _is_asynchronous(stage):
+                buffer = _Buffering()
+                upstream._reducer = buffer
+                self._links.append((buffer.items, stage))
+        # Links before this index have terminated and accept no more items.
+        self._live = 0
+
+    @property
+    def is_asynchronous(self):
+        return bool(self._links) or self._head_is_asynchronous
+
+    async def step(self, result, item):
+        result = self._head.step(result, item)
+        if self._head_is_asynchronous:
+            result = await result
+        terminated = isinstance(result, Reduced)
+        if terminated:
+            result = result.value
+        for index in range(self._live, len(self._links)):
+            result = await self._feed(index, result)
+        return Reduced(result) if terminated or self._live > 0 else result
+
+    async def complete(self, result):
+        result = self._head.complete(result)
+        if self._head_is_asynchronous:
+            result = await result
+        for index, (buffer, stage) in enumerate(self._links):
+            if index >= self._live:
+                result = await self._feed(index, result)
+            buffer.clear()
+            result = await stage.complete(result)
+        return result
+
+    async def _feed(self, index, result):
+        """Pass the items in one buffer to its asynchronous stage."""
+        buffer, stage = self._links[index]
+        while buffer:
+            result = await stage.step(result, buffer.popleft())
+            if isinstance(result, Reduced):
+                result = result.value
+                self._live = index + 1
+                buffer.clear()
+        return result
 
 
 # Transducible processes
@@ -7,8 +93,18 @@ from transducer.infrastructure import Reduced
 async def transduce(transducer, reducer, aiterable, init=UNSET):
     r = transducer(reducer)
     accumulator = r.initial() if init is UNSET else init
+    pipeline = Pipeline(r)
+    if pipeline.is_asynchronous:
+        async for item in aiterable:
+            accumulator = await pipeline.step(accumulator, item)
+            if isinstance(accumulator, Reduced):
+                accumulator = accumulator.value
+                break
+        return await pipeline.complete(accumulator)
+
+    step = r.step
     async for item in aiterable:
-        accumulator = r.step(accumulator, item)
+        accumulator = step(accumulator, item)
         if isinstance(accumulator, Reduced):
             accumulator = accumulator.value
             break
@@ -1,15 +1,47 @@
+from itertools import islice
+
 from transducer._util import UNSET
 from transducer.infrastructure import Reduced
 
 
 # Transducible processes
 
-def transduce(transducer, reducer, iterable, init=UNSET):
+def transduce(transducer, reducer, iterable, init=UNSET, chunk_size=None):
+    """Eagerly reduce an iterable through a transducer.
+
+    Args:
+        transducer: A transducer, such as one returned by one of the factory
+            functions in transducer.transducers.
+        reducer: The reducer to which the transformed items will be passed.
+        iterable: The series of items to be transduced.
+        init: An optional initial value for the reduction. If not supplied
+            the initial value is obtained from the reducer.
+        chunk_size: An optional positive integer. If supplied, items are drawn
+            from the iterable in lists of this size and passed through the
+            step_batch() method of the transducer rather than step().
+
+    Returns:
+        The completed result of the reduction.
+    """
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError("transduce() chunk_size {} is not at least 1".format(chunk_size))
+
     r = transducer(reducer)
     accumulator = r.initial() if init is UNSET else init
-    for item in iterable:
-        accumulator = r.step(accumulator, item)
-        if isinstance(accumulator, Reduced):
-            accumulator = accumulator.value
-            break
+    if chunk_size is None:
+        step = r.step
+        for item in iterable:
+            accumulator = step(accumulator, item)
+            if isinstance(accumulator, Reduced):
+                accumulator = accumulator.value
+                break
+    else:
+        iterator = iter(iterable)
+        chunk = list(islice(iterator, chunk_size))
+        while chunk:
+            accumulator = r.step_batch(accumulator, chunk)
+            if isinstance(accumulator, Reduced):
+                accumulator = accumulator.value
+                break
+            chunk = list(islice(iterator, chunk_size))
     return r.complete(accumulator)
@@ -10,6 +10,8 @@ class Reduced:
     Reduced(Reduced(item)) is equivalent to Reduced(item)
     """
 
+    __slots__ = ('_value',)
+
     def __new__(cls, value):
         if isinstance(value, cls):
             return value
@@ -21,12 +23,17 @@ class Reduced:
     def value(self):
         return self._value
 
+    def __reduce__(self):
+        return self.__class__, (self._value,)
+
     def __repr__(self):
         return '{}({!r})'.format(self.__class__.__name__, self._value)
 
 
 class Reducer(object, metaclass=ABCMeta):
 
+    __slots__ = ()
+
     @abstractmethod
     def initial(self):
         raise NotImplementedError
@@ -38,15 +45,79 @@ class Reducer(object, metaclass=ABCMeta):
     def complete(self, result):
         return result
 
+    def step_batch(self, result, items):
+        """Reduce a batch of items.
+
+        The default implementation calls step() for each item in turn. Overrides
+        should process the whole batch at once, but must honour early termination
+        in the same way as step().
+
+        Args:
+            result: The reduced result thus far.
+            items: A sequence of items to be combined in order with result.
+
+        Returns:
+            The newly reduced result. If reduction needs to be terminated, this
+            method should return the sentinel Reduced(result), in which case any
+            remaining items in the batch will not have been reduced.
+        """
+        for item in items:
+            result = self.step(result, item)
+            if isinstance(result, Reduced):
+                break
+        return result
+
+    def combine(self, left, right):
+        """Combine two partial results.
+
+        Optional. Reducers which support the reduction of separate portions of
+        a series of items, which can then be combined, should override this
+        method.
+
+        Args:
+            left: A result reduced from earlier items, before completion.
+            right: A result reduced from later items, before completion,
+                starting from a fresh initial() value.
+
+        Returns:
+            A result equivalent to that which would have been obtained by
+            reducing all of the items behind left and then right in turn.
+        """
+        raise NotImplementedError("{} does not support combine()".format(type(self).__name__))
+
     def __call__(self, result, item):
         """Reducing objects are callable so they can be used like functions."""
         return self.step(result, item)
 
 
+class AsyncReducer(object, metaclass=ABCMeta):
+    """A reducer with asynchronous step() and complete() methods.
+
+    Asynchronous reducers can be used with the transducible process in
+    transducer.coop, which awaits them, so they may perform asynchronous
+    I/O without blocking the event loop.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def initial(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def step(self, result, item):
+        raise NotImplementedError
+
+    async def complete(self, result):
+        return result
+
+
 class Transducer(Reducer):
     """An Base Class for Transducers which also serves as the identity transducer.
     """
 
+    __slots__ = ('_reducer',)
+
     def __init__(self, reducer):
         self._reducer = reducer
 
@@ -86,3 +157,33 @@ class Transducer(Reducer):
             The completed result.
         """
         return self._reducer.complete(result)
+
+
+def step_batch(reducer, result, items):
+    """Reduce a batch of items with any reducer.
+
+    Uses the step_batch() method of reducer if it has one, otherwise falls
+    back to calling the 2-arity reducer once per item.
+    """
+    try:
+        batch_step = reducer.step_batch
+    except AttributeError:
+        for item in items:
+            result = reducer(result, item)
+            if isinstance(result, Reduced):
+                break
+        return result
+    return batch_step(result, items)
+
+
+def stages(reducer):
+    """The stages of a chain of transducers, outermost first.
+
+    Follows the links from each Transducer to the reducer it wraps. The last
+    element of the returned list is the underlying reducer.
+    """
+    chain = [reducer]
+    while isinstance(reducer, Transducer):
+        reducer = reducer._reducer
+        chain.append(reducer)
+    return chain
@@ -0,0 +1,278 @@
+"""Instrumentation of chains of transducers.
+
+The profiled() function wraps a transducer so that each stage of the chains
+it produces records how many items pass through it and how long it spends
+in step() and complete().
+"""
+import json
+from time import perf_counter
+
+from transducer.coop import _is_asynchronous
+from transducer.infrastructure import Reduced, Transducer, stages, step_batch
+
+
+class StageProfile:
+    """The measurements recorded for one stage of a chain.
+
+    Times are in seconds. Cumulative times include the time spent in the
+    downstream stages called by a stage; self times exclude it.
+    """
+
+    __slots__ = ('name', 'asynchronous', 'items_in', 'steps', 'timed_steps', 'step_time', 'step_self_time',
+                 'completions', 'complete_time', 'complete_self_time', 'terminations')
+
+    def __init__(self, name, asynchronous=False):
+        self.name = name
+        self.asynchronous = asynchronous
+        self.reset()
+
+    def reset(self):
+        self.items_in = 0
+        self.steps = 0
+        self.timed_steps = 0
+        self.step_time = 0.0
+        self.step_self_time = 0.0
+        self.completions = 0
+        self.complete_time = 0.0
+        self.complete_self_time = 0.0
+        self.terminations = 0
+
+    def _estimate(self, sampled_time):
+        """Scale a time measured over the timed steps to all steps."""
+        return sampled_time * self.steps / self.timed_steps if self.timed_steps else 0.0
+
+    @property
+    def estimated_step_time(self):
+        return self._estimate(self.step_time)
+
+    @property
+    def estimated_step_self_time(self):
+        return self._estimate(self.step_self_time)
+
+
+class _Shared:
+    """State shared by the probes of one chain."""
+
+    __slots__ = ('sample', 'steps', 'timing', 'child_time', 'reduced_below')
+
+    def __init__(self, sample):
+        self.sample = sample
+        self.steps = 0
+        self.timing = True
+        self.child_time = 0.0
+        self.reduced_below = False
+
+
+class Probe(Transducer):
+    """Records measurements of the stage which it wraps into a StageProfile."""
+
+    __slots__ = ('_profile', '_shared', '_outermost')
+
+    def __init__(self, reducer, profile, shared, outermost=False):
+        super().__init__(reducer)
+        self._profile = profile
+        self._shared = shared
+        self._outermost = outermost
+
+    def step(self, result, item):
+        profile = self._profile
+        shared = self._shared
+        profile.items_in += 1
+        profile.steps += 1
+        if self._outermost:
+            shared.timing = shared.steps % shared.sample == 0
+            shared.steps += 1
+        shared.reduced_below = False
+        if shared.timing:
+            outer_child_time = shared.child_time
+            shared.child_time = 0.0
+            start = perf_counter()
+            result = self._reducer(result, item)
+            elapsed = perf_counter() - start
+            profile.timed_steps += 1
+            profile.step_time += elapsed
+            profile.step_self_time += elapsed - shared.child_time
+            shared.child_time = outer_child_time + elapsed
+        else:
+            result = self._reducer(result, item)
+        self._terminated(result)
+        return result
+
+    def step_batch(self, result, items):
+        profile = self._profile
+        shared = self._shared
+        profile.items_in += len(items)
+        profile.steps += len(items)
+        profile.timed_steps += len(items)
+        if self._outermost:
+            shared.timing = True
+        shared.reduced_below = False
+        outer_child_time = shared.child_time
+        shared.child_time = 0.0
+        start = perf_counter()
+        result = step_batch(self._reducer, result, items)
+        elapsed = perf_counter() - start
+        profile.step_time += elapsed
+        profile.step_self_time += elapsed - shared.child_time
+        shared.child_time = outer_child_time + elapsed
+        self._terminated(result)
+        return result
+
+    def complete(self, result):
+        profile = self._profile
+        shared = self._shared
+        # Completion happens once, so is always timed, as are any steps it causes.
+        shared.timing = True
+        outer_child_time = shared.child_time
+        shared.child_time = 0.0
+        start = perf_counter()
+        result = self._reducer.complete(result)
+        elapsed = perf_counter() - start
+        profile.completions += 1
+        profile.complete_time += elapsed
+        profile.complete_self_time += elapsed - shared.child_time
+        shared.child_time = outer_child_time + elapsed
+        return result
+
+    def _terminated(self, result):
+        # A stage originates early termination if it returns Reduced when the
+        # stage it called did not.
+        reduced = isinstance(result, Reduced)
+        if reduced and not self._shared.reduced_below:
+            self._profile.terminations += 1
+        self._shared.reduced_below = reduced
+
+
+def _name(stage):
+    return type(stage).__name__ if hasattr(stage, 'initial') else getattr(stage, '__name__', repr(stage))
+
+
+class Profiled:
+    """A transducer which profiles each stage of the chains it produces.
+
+    Measurements accumulate over every chain produced, until reset() is
+    called. See profiled().
+    """
+
+    def __init__(self, transducer, sample):
+        self._transducer = transducer
+        self._sample = sample
+        self._profiles = []
+
+    def __call__(self, reducer):
+        chain = stages(self._transducer(reducer))
+        names = [_name(stage) for stage in chain]
+        if [profile.name for profile in self._profiles] != names:
+            self._profiles = [StageProfile(name, _is_asynchronous(stage)) for name, stage in zip(names, chain)]
+
+        shared = _Shared(self._sample)
+        downstream = None
+        for stage, profile in zip(reversed(chain), reversed(self._profiles)):
+            if downstream is not None:
+                stage._reducer = downstream
+            # Asynchronous stages must remain visible to transducer.coop.Pipeline.
+            downstream = stage if profile.asynchronous else Probe(stage, profile, shared)
+        if isinstance(downstream, Probe):
+            downstream._outermost = True
+        return downstream
+
+    @property
+    def profiles(self):
+        """The StageProfile of each stage, outermost first, ending with the reducer."""
+        return list(self._profiles)
+
+    def reset(self):
+        """Discard all measurements."""
+        for profile in self._profiles:
+            profile.reset()
+
+    def as_dict(self):
+        """The measurements as a dictionary suitable for serialization."""
+        records = []
+        for index, profile in enumerate(self._profiles):
+            following = self._profiles[index + 1] if index + 1 < len(self._profiles) else None
+            items_out = (following.items_in if following is not None and not following.asynchronous
+                         and not profile.asynchronous else None)
+            records.append({
+                'stage': index,
+                'name': profile.name,
+                'asynchronous': profile.asynchronous,
+                'items_in': None if profile.asynchronous else profile.items_in,
+                'items_out': items_out,
+                'selectivity': items_out / profile.items_in if items_out is not None and profile.items_in else None,
+                'step_time': profile.estimated_step_time,
+                'step_self_time': profile.estimated_step_self_time,
+                'timed_steps': profile.timed_steps,
+                'complete_time': profile.complete_time,
+                'complete_self_time': profile.complete_self_time,
+                'terminations': profile.terminations,
+            })
+        return {'sample': self._sample, 'stages': records}
+
+    def to_json(self, **kwargs):
+        """The measurements as a JSON string. Keyword arguments are passed to json.dumps()."""
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def report(self):
+        """The measurements as a table, with one row per stage."""
+        header = ('#', 'stage', 'in', 'out', 'select', 'step (s)', 'self (s)', 'complete (s)', 'self (s)',
+                  'reduced')
+        rows = [header]
+        for record in self.as_dict()['stages']:
+            rows.append((
+                str(record['stage']),
+                record['name'],
+                _format(record['items_in'], '{:d}'),
+                _format(record['items_out'], '{:d}'),
+                _format(record['selectivity'], '{:.3f}'),
+                _format(record['step_time'], '{:.6f}'),
+                _format(record['step_self_time'], '{:.6f}'),
+                _format(record['complete_time'], '{:.6f}'),
+                _format(record['complete_self_time'], '{:.6f}'),
+                str(record['terminations']),
+            ))
+        widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+        lines = ['  '.join(cell.ljust(width) if column == 1 else cell.rjust(width)
+                           for column, (cell, width) in enumerate(zip(row, widths)))
+                 for row in rows]
+        return '\n'.join(lines)
+
+
+def _format(value, template):
+    return '-' if value is None else template.format(value)
+
+
+def profiled(transducer, sample=1, enabled=True):
+    """Profile each stage of a transducer.
+
+    Each stage of the chains produced by the returned transducer, including
+    the reducer, records the number of items passed to it, the time spent in
+    its step() and complete() methods, with and without the time spent in
+    the stages downstream of it, and the number of times it terminated
+    reduction early by returning Reduced.
+
+    The profiled transducer can be used with any of the transducible
+    processes. Asynchronous stages are not measured. Stages run in other
+    processes, as by transducer.parallel, record measurements in those
+    processes only.
+
+    Args:
+        transducer: The transducer to be profiled.
+        sample: Time only one in every sample steps, to reduce the overhead
+            of profiling. Items are always counted, and step times are
+            scaled up to estimate the total.
+        enabled: If False, return transducer itself, so that profiling can
+            be disabled at no cost.
+
+    Returns:
+        A Profiled transducer, with report(), as_dict() and to_json()
+        methods for retrieving the measurements, or transducer if not
+        enabled.
+    """
+    if not enabled:
+        return transducer
+
+    if sample < 1:
+        raise ValueError("profiled() sample {} is not at least 1".format(sample))
+
+    return Profiled(transducer, sample)
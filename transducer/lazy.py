@@ -12,8 +12,9 @@ def transduce(transducer, iterable):
     r = transducer(appending())
     accumulator = deque()
     reduced = False
+    step = r.step
     for item in iterable:
-        accumulator = r.step(accumulator, item)
+        accumulator = step(accumulator, item)
         if isinstance(accumulator, Reduced):
             accumulator = accumulator.value
             reduced = True
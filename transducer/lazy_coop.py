@@ -1,5 +1,6 @@
 from collections import deque
 
+from transducer.coop import Pipeline
 from transducer.infrastructure import Reduced
 from transducer.reducers import appending
 
@@ -8,10 +9,12 @@ from transducer.reducers import appending
 
 async def transduce(transducer, aiterable):
     r = transducer(appending())
+    pipeline = Pipeline(r)
+    step = pipeline.step if pipeline.is_asynchronous else None
     accumulator = deque()
     reduced = False
     async for item in aiterable:
-        accumulator = r.step(accumulator, item)
+        accumulator = r.step(accumulator, item) if step is None else await step(accumulator, item)
         if isinstance(accumulator, Reduced):
             accumulator = accumulator.value
             reduced = True
@@ -22,7 +25,7 @@ async def transduce(transducer, aiterable):
         if reduced:
             break
 
-    completed_result = r.complete(accumulator)
+    completed_result = r.complete(accumulator) if step is None else await pipeline.complete(accumulator)
     assert completed_result is accumulator
 
     while accumulator:
@@ -0,0 +1,296 @@
+"""Vectorized execution of transducers over NumPy arrays.
+
+This module requires NumPy. Leading stages with a vectorized equivalent are
+applied to whole arrays at once. From the first stage without one, the rest
+of the chain is run item by item, as by transducer.eager, so that a later
+stage such as taking() can terminate reduction before the earlier stage has
+seen every item. The output is then converted back to an array.
+
+Mapping and filtering functions are only applied to whole arrays if they are
+NumPy ufuncs or have been marked with vectorized(), since an arbitrary
+function cannot safely be assumed to operate element-wise.
+"""
+import operator
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from transducer._util import UNSET
+from transducer.functional import true
+from transducer.infrastructure import Reduced, stages
+from transducer.reducers import appending
+from transducer.transducers import (Mapping, Filtering, Scanning, Reducing, Taking, Dropping, TakingWhile,
+                                    DroppingWhile, Distinct, Pairwise, Windowing, Batching, Counting, Reversing,
+                                    Ordering, Repeating)
+
+
+class Vectorized:
+    """A function which accepts a whole array as well as a single item."""
+
+    def __init__(self, function):
+        self._function = function
+
+    def __call__(self, *args, **kwargs):
+        return self._function(*args, **kwargs)
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self._function)
+
+
+def vectorized(function):
+    """Mark a function as vectorizable.
+
+    Args:
+        function: A function which, when passed an array of items, returns an
+            array containing the result of applying the function to each item
+            along the first axis.
+
+    Returns:
+        A callable equivalent to function, which will be applied to whole
+        arrays by transduce() in this module.
+    """
+    return Vectorized(function)
+
+
+# Binary operators with ufunc equivalents suitable for scanning and reducing.
+_UFUNCS = {
+    operator.add: np.add,
+    operator.mul: np.multiply,
+    operator.and_: np.bitwise_and,
+    operator.or_: np.bitwise_or,
+    operator.xor: np.bitwise_xor,
+    max: np.maximum,
+    min: np.minimum,
+}
+
+
+def _is_vectorized(function):
+    return isinstance(function, (np.ufunc, Vectorized))
+
+
+def _binary_ufunc(function):
+    ufunc = _UFUNCS.get(function, function)
+    return ufunc if isinstance(ufunc, np.ufunc) and ufunc.nin == 2 else None
+
+
+def _is_heterogeneous(items):
+    """Whether the items are tuples whose elements are of different types, as from enumerating()."""
+    return bool(items) and isinstance(items[0], tuple) and len(set(map(type, items[0]))) > 1
+
+
+def _as_array(items):
+    """Convert a list of items to an array with the items along the first axis.
+
+    Tuples of mixed types, which NumPy would coerce to a common type, are
+    retained as the elements of an object array.
+    """
+    if _is_heterogeneous(items):
+        return _object_array(items)
+    try:
+        array = np.array(items)
+    except ValueError:
+        pass
+    else:
+        if array.ndim <= 1 or array.dtype.kind not in 'OSU':
+            return array
+    return _object_array(items)
+
+
+def _object_array(items):
+    array = np.empty(len(items), dtype=object)
+    for index, item in enumerate(items):
+        array[index] = item
+    return array
+
+
+def _first_false(mask):
+    return len(mask) if mask.all() else int(np.argmin(mask))
+
+
+# ---------------------------------------------------------------------
+# Vectorized stages. Each accepts a stage and an array, returning either the
+# output array of the stage or NotImplemented.
+
+def _mapping(stage, items):
+    if not _is_vectorized(stage._transform):
+        return NotImplemented
+    result = np.asarray(stage._transform(items))
+    if result.shape[:1] != items.shape[:1]:
+        raise ValueError("Vectorized transform {!r} returned an array of shape {} for an input array "
+                         "of shape {}".format(stage._transform, result.shape, items.shape))
+    return result
+
+
+def _mask(predicate, items):
+    mask = np.asarray(predicate(items), dtype=bool)
+    if mask.shape != items.shape[:1]:
+        raise ValueError("Vectorized predicate {!r} returned an array of shape {} for an input array "
+                         "of shape {}".format(predicate, mask.shape, items.shape))
+    return mask
+
+
+def _filtering(stage, items):
+    if not _is_vectorized(stage._predicate):
+        return NotImplemented
+    return items[_mask(stage._predicate, items)]
+
+
+def _scanning(stage, items):
+    ufunc = _binary_ufunc(stage._reducer2)
+    if ufunc is None or items.dtype.kind == 'O':
+        return NotImplemented
+    if stage._accumulator is UNSET:
+        return ufunc.accumulate(items, axis=0)
+    initial = np.broadcast_to(stage._accumulator, (1,) + items.shape[1:])
+    return ufunc.accumulate(np.concatenate((initial, items)), axis=0)[1:]
+
+
+def _reducing(stage, items):
+    ufunc = _binary_ufunc(stage._reducer2)
+    if ufunc is None or items.dtype.kind == 'O':
+        return NotImplemented
+    if stage._accumulator is UNSET:
+        if len(items) == 0:
+            return NotImplemented
+        result = ufunc.reduce(items, axis=0)
+    else:
+        result = ufunc.reduce(items, axis=0, initial=stage._accumulator)
+    return np.asarray(result)[np.newaxis]
+
+
+def _taking(stage, items):
+    # Like Taking.step(), always pass on at least one item.
+    return items[:max(stage._n, 1)]
+
+
+def _dropping(stage, items):
+    return items[stage._n:]
+
+
+def _taking_while(stage, items):
+    if not _is_vectorized(stage._predicate):
+        return NotImplemented
+    return items[:_first_false(_mask(stage._predicate, items))]
+
+
+def _dropping_while(stage, items):
+    if not _is_vectorized(stage._predicate):
+        return NotImplemented
+    return items[_first_false(_mask(stage._predicate, items)):]
+
+
+def _distinct(stage, items):
+    if items.ndim != 1 or items.dtype.kind == 'O':
+        return NotImplemented
+    # np.unique() treats all NaNs as one value, whereas each NaN is distinct
+    # from every other item when compared by equality.
+    if items.dtype.kind in 'fc' and np.isnan(items).any():
+        return NotImplemented
+    _, first_indexes = np.unique(items, return_index=True)
+    return items[np.sort(first_indexes)]
+
+
+def _pairwise(stage, items):
+    return np.stack((items[:-1], items[1:]), axis=1)
+
+
+def _windowing(stage, items):
+    # Without padding the leading and trailing windows are ragged.
+    if stage._padding is UNSET or items.ndim != 1:
+        return NotImplemented
+    padding = np.full(stage._size - 1, stage._padding)
+    return sliding_window_view(np.concatenate((padding, items, padding)), stage._size)
+
+
+def _batching(stage, items):
+    size = stage._size
+    if len(items) % size == 0:
+        return items.reshape((-1, size) + items.shape[1:])
+    return _as_array(np.split(items, range(size, len(items), size)))
+
+
+def _counting(stage, items):
+    if stage._predicate is true:
+        return np.array([len(items)])
+    if not _is_vectorized(stage._predicate):
+        return NotImplemented
+    return np.array([np.count_nonzero(_mask(stage._predicate, items))])
+
+
+def _reversing(stage, items):
+    return items[::-1]
+
+
+def _ordering(stage, items):
+    if stage._key is not None or items.ndim != 1 or items.dtype.kind == 'O':
+        return NotImplemented
+    if not stage._reverse:
+        return np.sort(items, kind='stable')
+    # A stable descending sort, which retains the input order of equal items.
+    backwards = items[::-1]
+    return backwards[np.argsort(backwards, kind='stable')][::-1]
+
+
+def _repeating(stage, items):
+    return np.repeat(items, stage._num_times, axis=0)
+
+
+_VECTORIZED = {
+    Mapping: _mapping,
+    Filtering: _filtering,
+    Scanning: _scanning,
+    Reducing: _reducing,
+    Taking: _taking,
+    Dropping: _dropping,
+    TakingWhile: _taking_while,
+    DroppingWhile: _dropping_while,
+    Distinct: _distinct,
+    Pairwise: _pairwise,
+    Windowing: _windowing,
+    Batching: _batching,
+    Counting: _counting,
+    Reversing: _reversing,
+    Ordering: _ordering,
+    Repeating: _repeating,
+}
+
+# ---------------------------------------------------------------------
+
+
+def _per_item(reducer, items):
+    """Run a chain of stages over each item of an array in turn, stopping when it terminates."""
+    result = []
+    step = reducer.step
+    for item in (items.tolist() if items.ndim == 1 else items):
+        result = step(result, item)
+        if isinstance(result, Reduced):
+            result = result.value
+            break
+    return _as_array(reducer.complete(result))
+
+
+# Transducible processes
+
+def transduce(transducer, array):
+    """Transduce an array, vectorizing stages where possible.
+
+    Args:
+        transducer: The transducer to be applied to the items of the array.
+        array: An array, or anything convertible to an array, the items of
+            which lie along its first axis.
+
+    Returns:
+        An array containing the items produced by the transducer along its
+        first axis. Stages which produce sequences, such as pairwise(),
+        windowing() and batching(), produce the rows of a two-dimensional
+        array where the sequences are of equal length.
+    """
+    items = np.asarray(array)
+    for stage in stages(transducer(appending()))[:-1]:
+        vectorized_stage = _VECTORIZED.get(type(stage))
+        result = vectorized_stage(stage, items) if vectorized_stage is not None else NotImplemented
+        if result is NotImplemented:
+            # The stage and those following it, ending with appending().
+            return _per_item(stage, items)
+        items = result
+    return items
@@ -0,0 +1,105 @@
+"""Optimizations for chains of transducers.
+
+The functions in this module accept transducers and return equivalent
+transducers which do less work per item.
+"""
+from itertools import count
+
+from transducer.infrastructure import Transducer, stages, step_batch
+from transducer.transducers import Enumerating, Filtering, Mapping
+
+
+class Fused(Transducer):
+    """A single stage equivalent to a run of mapping and filtering stages.
+
+    Args:
+        reducer: The reducer to which surviving, transformed items are passed.
+        operations: A sequence of (is_predicate, function) pairs applied in
+            order to each item. Predicates discard items for which they return
+            False; other functions replace the item with their return value.
+    """
+
+    __slots__ = ('_operations',)
+
+    def __init__(self, reducer, operations):
+        super().__init__(reducer)
+        self._operations = tuple(operations)
+
+    def step(self, result, item):
+        for is_predicate, function in self._operations:
+            if is_predicate:
+                if not function(item):
+                    return result
+            else:
+                item = function(item)
+        return self._reducer(result, item)
+
+    def step_batch(self, result, items):
+        for is_predicate, function in self._operations:
+            if is_predicate:
+                items = [item for item in items if function(item)]
+            else:
+                items = [function(item) for item in items]
+        return step_batch(self._reducer, result, items)
+
+
+def _enumerator(start):
+    counter = count(start)
+
+    def enumerate_item(item):
+        return (next(counter), item)
+
+    return enumerate_item
+
+
+# Functions which extract a fusable operation from each stateless stage.
+_FUSABLE = {
+    Mapping: lambda stage: (False, stage._transform),
+    Filtering: lambda stage: (True, stage._predicate),
+    Enumerating: lambda stage: (False, _enumerator(stage._counter)),
+}
+
+
+def _fuse_run(run, downstream):
+    """Replace a run of fusable stages, given innermost first, with one stage."""
+    if len(run) == 0:
+        return downstream
+    if len(run) == 1:
+        run[0]._reducer = downstream
+        return run[0]
+    return Fused(downstream, [_FUSABLE[type(stage)](stage) for stage in reversed(run)])
+
+
+def _fuse_chain(reducer):
+    chain = stages(reducer)
+    downstream = chain.pop()
+    run = []
+    for stage in reversed(chain):
+        if type(stage) in _FUSABLE:
+            run.append(stage)
+        else:
+            stage._reducer = _fuse_run(run, downstream)
+            downstream = stage
+            run = []
+    return _fuse_run(run, downstream)
+
+
+def fuse(transducer):
+    """Fuse adjacent stateless stages of a transducer.
+
+    Runs of two or more adjacent mapping(), filtering() and enumerating()
+    stages are collapsed into a single stage which applies each of their
+    functions in turn, removing a method call per stage per item. Other
+    stages are retained unchanged, so the fused transducer is equivalent
+    to the original, including with respect to early termination.
+
+    Args:
+        transducer: Any transducer, typically built with compose().
+
+    Returns: A transducer equivalent to the argument.
+    """
+
+    def fused_transducer(reducer):
+        return _fuse_chain(transducer(reducer))
+
+    return fused_transducer
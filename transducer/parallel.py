@@ -0,0 +1,118 @@
+"""Parallel transduction using a pool of worker processes.
+
+The input is divided into chunks which are transduced independently by the
+workers. The transducer, the reducer and the items must be picklable, so
+the functions passed to transducer factories should be defined at module
+level rather than as lambdas.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import os
+
+from transducer import eager
+from transducer._util import UNSET
+from transducer.infrastructure import Reduced, stages, step_batch
+from transducer.reducers import appending
+from transducer.transducers import Filtering, Mapcatting, Mapping, Repeating
+
+
+# Stages which hold no state between items, and so may be applied to
+# separate chunks of the input independently.
+_CHUNK_SAFE = {Mapping, Filtering, Mapcatting, Repeating}
+
+
+def _reduce_chunk(reducer, items):
+    result = step_batch(reducer, reducer.initial(), items)
+    if isinstance(result, Reduced):
+        return result.value, True
+    return result, False
+
+
+def _reduced_chunks(reducer, iterable, workers, chunk_size):
+    """Reduce chunks of items in worker processes, yielding results in order."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        iterator = iter(iterable)
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < 2 * workers:
+                    chunk = list(islice(iterator, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(executor.submit(_reduce_chunk, reducer, chunk))
+                if not pending:
+                    return
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+# Transducible processes
+
+def transduce(transducer, reducer, iterable, init=UNSET, workers=None, chunk_size=10000):
+    """Transduce an iterable using a pool of worker processes.
+
+    The leading stateless stages of the transducer (mapping, filtering,
+    mapcatting and repeating) are applied to chunks of the input in the
+    worker processes. If every stage is stateless, the workers also reduce
+    their chunks and the partial results are merged in order with the
+    combine() method of the reducer. Otherwise the output of the workers is
+    passed, in order, through the remaining stages in this process.
+
+    Args:
+        transducer: The transducer to be applied.
+        reducer: The reducer to which the transformed items will be passed.
+            If every stage of the transducer is stateless, this must support
+            combine().
+        iterable: The series of items to be transduced.
+        init: An optional initial value for the reduction.
+        workers: The number of worker processes. Defaults to the number of
+            processors.
+        chunk_size: The number of items in each chunk sent to a worker.
+
+    Returns:
+        The completed result of the reduction.
+    """
+    if chunk_size < 1:
+        raise ValueError("transduce() chunk_size {} is not at least 1".format(chunk_size))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("transduce() workers {} is not at least 1".format(workers))
+
+    r = transducer(reducer)
+    chain = stages(r)
+    num_chunk_safe = 0
+    while num_chunk_safe < len(chain) - 1 and type(chain[num_chunk_safe]) in _CHUNK_SAFE:
+        num_chunk_safe += 1
+
+    if num_chunk_safe == 0:
+        return eager.transduce(transducer, reducer, iterable, init, chunk_size)
+
+    if num_chunk_safe == len(chain) - 1:
+        accumulator = r.initial() if init is UNSET else init
+        chunks = _reduced_chunks(r, iterable, workers, chunk_size)
+        try:
+            for partial, reduced in chunks:
+                accumulator = reducer.combine(accumulator, partial)
+                if reduced:
+                    break
+        finally:
+            chunks.close()
+        return r.complete(accumulator)
+
+    remainder = chain[num_chunk_safe]
+    chain[num_chunk_safe - 1]._reducer = appending()
+    accumulator = remainder.initial() if init is UNSET else init
+    chunks = _reduced_chunks(r, iterable, workers, chunk_size)
+    try:
+        for items, _ in chunks:
+            accumulator = step_batch(remainder, accumulator, items)
+            if isinstance(accumulator, Reduced):
+                accumulator = accumulator.value
+                break
+    finally:
+        chunks.close()
+    return remainder.complete(accumulator)
@@ -6,10 +6,11 @@ from transducer.reducers import sending
 def transduce(transducer, target=UNSET):
     reducer = transducer(sending())
     accumulator = target if target is not UNSET else reducer.initial()
+    step = reducer.step
     try:
         while True:
             item = (yield)
-            accumulator = reducer.step(accumulator, item)
+            accumulator = step(accumulator, item)
             if isinstance(accumulator, Reduced):
                 accumulator = accumulator.value
                 break
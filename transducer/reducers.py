@@ -1,9 +1,13 @@
-from transducer.infrastructure import Reducer, Reduced
+from abc import abstractmethod
+
+from transducer.infrastructure import AsyncReducer, Reducer, Reduced, step_batch
 from transducer.sinks import null_sink
 
 
 class Appending(Reducer):
 
+    __slots__ = ()
+
     def initial(self):
         return []
 
@@ -11,6 +15,14 @@ class Appending(Reducer):
         result.append(item)
         return result
 
+    def step_batch(self, result, items):
+        result.extend(items)
+        return result
+
+    def combine(self, left, right):
+        left.extend(right)
+        return left
+
 _appending = Appending()
 
 
@@ -20,12 +32,20 @@ def appending():
 
 class Conjoining(Reducer):
 
+    __slots__ = ()
+
     def initial(self):
         return tuple()
 
     def step(self, result, item):
         return result + type(result)((item,))
 
+    def step_batch(self, result, items):
+        return result + type(result)(items)
+
+    def combine(self, left, right):
+        return left + right
+
 _conjoining = Conjoining()
 
 
@@ -35,6 +55,8 @@ def conjoining():
 
 class Adding(Reducer):
 
+    __slots__ = ()
+
     def initial(self):
         return set()
 
@@ -42,6 +64,14 @@ class Adding(Reducer):
         result.add(item)
         return result
 
+    def step_batch(self, result, items):
+        result.update(items)
+        return result
+
+    def combine(self, left, right):
+        left.update(right)
+        return left
+
 _adding = Adding()
 
 
@@ -51,6 +81,8 @@ def adding():
 
 class Joining(Reducer):
 
+    __slots__ = ('_separator',)
+
     def __init__(self, separator):
         self._separator = separator
 
@@ -61,12 +93,22 @@ class Joining(Reducer):
         result.append(item)
         return result
 
+    def step_batch(self, result, items):
+        result.extend(items)
+        return result
+
+    def combine(self, left, right):
+        left.extend(right)
+        return left
+
     def complete(self, result):
         return self._separator.join(result)
 
 
 class ExpectingSingle(Reducer):
 
+    __slots__ = ('_num_steps',)
+
     def __init__(self):
         self._num_steps = 0
 
@@ -92,6 +134,8 @@ def expecting_single():
 
 class Sending(Reducer):
 
+    __slots__ = ()
+
     def initial(self):
         return null_sink()
 
@@ -116,9 +160,12 @@ def sending():
 
 class Completing(Reducer):
 
-    def __init__(self, reducer, identity):
+    __slots__ = ('_reducer', '_identity', '_combiner')
+
+    def __init__(self, reducer, identity, combiner=None):
         self._reducer = reducer
         self._identity = identity
+        self._combiner = combiner
 
     def initial(self):
         return self._identity
@@ -126,23 +173,34 @@ class Completing(Reducer):
     def step(self, result, item):
         return self._reducer(result, item)
 
+    def combine(self, left, right):
+        if self._combiner is None:
+            return super().combine(left, right)
+        return self._combiner(left, right)
 
-def completing(reducer, identity=None):
+
+def completing(reducer, identity=None, combiner=None):
     """Complete a regular reducing function to support the Reducer protocol.
 
     Args:
         reducer: A reducing function. e.g. lambda x, y: x+y
         identity: The identity (i.e. seed) value for reducer. e.g. zero
+        combiner: An optional function for combining two partial results,
+            required by combine(). For associative reducers whose items are
+            of the same kind as their results, as with addition, this may
+            be the reducer itself.
 
     Returns:
         An instance of the Completing reducer.
     """
 
-    return Completing(reducer, identity)
+    return Completing(reducer, identity, combiner)
 
 
 class Effecting(Reducer):
 
+    __slots__ = ('_f',)
+
     def __init__(self, f):
         if not callable(f):
             raise TypeError("{f} is not callable".format(f=f))
@@ -169,4 +227,208 @@ def effecting(f):
     Returns:
         An instance of the Effecting reducer.
     """
-    return Effecting(f)
\ No newline at end of file
+    return Effecting(f)
+
+
+class Broadcast:
+    """The accumulated state of a Broadcasting reduction.
+
+    Holds the chain for each branch, its result so far, and the indexes of
+    the branches which have not terminated early.
+    """
+
+    __slots__ = ('chains', 'results', 'active')
+
+    def __init__(self, chains):
+        self.chains = chains
+        self.results = [chain.initial() for chain in chains]
+        self.active = list(range(len(chains)))
+
+
+class Broadcasting(Reducer):
+    """Reduces each item with several independent chains.
+
+    The chains are created afresh by initial(), and held with their results
+    in the Broadcast accumulator, so an instance may be reused.
+    """
+
+    __slots__ = ('_branches',)
+
+    def __init__(self, branches):
+        self._branches = branches
+
+    def initial(self):
+        return Broadcast([transducer(reducer) for transducer, reducer in self._branches])
+
+    def step(self, result, item):
+        chains = result.chains
+        results = result.results
+        terminated = []
+        for index in result.active:
+            branch = chains[index].step(results[index], item)
+            if isinstance(branch, Reduced):
+                branch = branch.value
+                terminated.append(index)
+            results[index] = branch
+        return self._terminate(result, terminated) if terminated else result
+
+    def step_batch(self, result, items):
+        # Each chain is independent, so can reduce the whole batch in turn.
+        chains = result.chains
+        results = result.results
+        terminated = []
+        for index in result.active:
+            branch = step_batch(chains[index], results[index], items)
+            if isinstance(branch, Reduced):
+                branch = branch.value
+                terminated.append(index)
+            results[index] = branch
+        return self._terminate(result, terminated) if terminated else result
+
+    def complete(self, result):
+        return tuple(chain.complete(branch) for chain, branch in zip(result.chains, result.results))
+
+    def _terminate(self, result, terminated):
+        result.active = [index for index in result.active if index not in terminated]
+        return result if result.active else Reduced(result)
+
+
+def broadcasting(*branches):
+    """Reduce each item with several transducer and reducer pairs in a single pass.
+
+    Each item is passed to every branch which has not yet terminated early.
+    Reduction terminates only when every branch has done so. On completion,
+    each branch is completed, including those which terminated early.
+
+    Args:
+        *branches: Pairs of (transducer, reducer), such as
+            (mapping(len), completing(operator.add, 0)). Use Transducer,
+            the identity transducer, to reduce the items unchanged.
+
+    Returns:
+        An instance of the Broadcasting reducer, the result of which is a
+        tuple of the results of each branch, in order.
+    """
+    if not branches:
+        raise ValueError("broadcasting() has no branches")
+
+    return Broadcasting(tuple(branches))
+
+
+class AsyncBatching(AsyncReducer):
+    """A base for asynchronous sinks which deliver items in batches.
+
+    The result is the number of items delivered so far.
+    """
+
+    __slots__ = ('_batch_size', '_pending')
+
+    def __init__(self, batch_size):
+        if batch_size < 1:
+            raise ValueError("batch_size {} is not at least 1".format(batch_size))
+        self._batch_size = batch_size
+        self._pending = []
+
+    def initial(self):
+        return 0
+
+    async def step(self, result, item):
+        self._pending.append(item)
+        if len(self._pending) >= self._batch_size:
+            result = await self._flush(result)
+        return result
+
+    async def complete(self, result):
+        if self._pending:
+            result = await self._flush(result)
+        return result
+
+    async def _flush(self, result):
+        batch = self._pending
+        self._pending = []
+        await self.deliver(batch)
+        return result + len(batch)
+
+    @abstractmethod
+    async def deliver(self, batch):
+        raise NotImplementedError
+
+
+class AsyncSending(AsyncBatching):
+
+    __slots__ = ('_send',)
+
+    def __init__(self, send, batch_size):
+        super().__init__(batch_size)
+        self._send = send
+
+    async def deliver(self, batch):
+        await self._send(batch)
+
+
+def asending(send, batch_size=1):
+    """Deliver items in batches to a coroutine function.
+
+    Args:
+        send: A coroutine function which will be passed, and awaited with,
+            each list of items.
+        batch_size: The number of items in each batch. Any remaining items
+            are delivered on completion.
+
+    Returns:
+        An instance of the AsyncSending reducer, the result of which is the
+        number of items delivered.
+    """
+    return AsyncSending(send, batch_size)
+
+
+class AsyncWriting(AsyncBatching):
+
+    __slots__ = ('_stream',)
+
+    def __init__(self, stream, batch_size):
+        super().__init__(batch_size)
+        self._stream = stream
+
+    async def deliver(self, batch):
+        for item in batch:
+            self._stream.write(item)
+        await self._stream.drain()
+
+
+def awriting(stream, batch_size=1):
+    """Write items to an asynchronous stream, draining after each batch.
+
+    Args:
+        stream: A stream such as an asyncio.StreamWriter, with a write()
+            method and a drain() coroutine method.
+        batch_size: The number of items written between each drain.
+
+    Returns:
+        An instance of the AsyncWriting reducer, the result of which is the
+        number of items written.
+    """
+    return AsyncWriting(stream, batch_size)
+
+
+class AsyncPutting(AsyncBatching):
+
+    __slots__ = ('_queue',)
+
+    def __init__(self, queue):
+        super().__init__(1)
+        self._queue = queue
+
+    async def deliver(self, batch):
+        for item in batch:
+            await self._queue.put(item)
+
+
+def aputting(queue):
+    """Put items into an asyncio.Queue, waiting while it is full.
+
+    Returns:
+        An instance of the AsyncPutting reducer, the result of which is the
+        number of items put.
+    """
+    return AsyncPutting(queue)
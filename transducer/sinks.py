@@ -2,6 +2,7 @@ from collections.abc import Iterable, Sized
 from collections import deque
 import sys
 from transducer._util import coroutine, pending_in, UNSET
+from transducer.infrastructure import Reduced
 
 
 @coroutine
@@ -90,3 +91,51 @@ class SingularSink:
     @property
     def has_value(self):
         return self._item is not UNSET
+
+
+class ReducingSink:
+    """A sink which reduces the items sent to it with a reducer.
+
+    The sink finishes when the reducer terminates early, so that a
+    transducer sending to it, as in transducer.react, stops too. The
+    completed result is available once the sink has finished or been
+    closed.
+
+    Usage:
+
+        sink = ReducingSink(broadcasting((taking(10), appending()),
+                                         (Transducer, adding())))
+        target = sink()
+        some_source(target=target)
+        target.close()
+        first_ten, distinct = sink.value
+    """
+
+    def __init__(self, reducer):
+        self._reducer = reducer
+        self._result = UNSET
+
+    @coroutine
+    def __call__(self):
+        reducer = self._reducer
+        accumulator = reducer.initial()
+        try:
+            while True:
+                item = (yield)
+                accumulator = reducer.step(accumulator, item)
+                if isinstance(accumulator, Reduced):
+                    accumulator = accumulator.value
+                    break
+        except GeneratorExit:
+            pass
+        self._result = reducer.complete(accumulator)
+
+    @property
+    def value(self):
+        if self._result is UNSET:
+            raise RuntimeError("Reducing sink has not been closed.")
+        return self._result
+
+    @property
+    def has_value(self):
+        return self._result is not UNSET
@@ -0,0 +1,485 @@
+"""Reducers which summarize items in a fixed amount of memory.
+
+Each reducer accumulates items into a sketch: an approximate summary whose
+size does not grow with the number of items. Sketches of separate portions
+of a series of items can be merged, so each reducer supports combine(), as
+used by transducer.parallel. The result of each reducer is the sketch
+itself, which is queried for estimates.
+
+Items are hashed with BLAKE2, so sketches built in different processes
+agree. Integers, strings and bytes are hashed directly, and other items in
+their pickled form, so equal items of other types must pickle identically,
+as do tuples of strings and integers.
+"""
+from array import array
+from bisect import bisect_left
+from functools import partial
+from hashlib import blake2b
+from heapq import heapify, heappop, heappush, heapreplace
+from itertools import count
+import math
+import pickle
+from random import Random
+
+from transducer.infrastructure import Reducer
+
+
+def _digest(item):
+    if type(item) is int:
+        data = b'i' + str(item).encode('ascii')
+    elif isinstance(item, str):
+        data = b's' + item.encode('utf-8')
+    elif isinstance(item, bytes):
+        data = b'b' + item
+    else:
+        data = b'p' + pickle.dumps(item, 4)
+    return blake2b(data, digest_size=16).digest()
+
+
+def _hash64(item):
+    return int.from_bytes(_digest(item)[:8], 'little')
+
+
+class HyperLogLog:
+    """An estimate of the number of distinct items.
+
+    The relative standard error is about 1.04 / sqrt(2 ** precision), using
+    one byte of memory for each of the 2 ** precision registers.
+    """
+
+    __slots__ = ('_precision', '_registers')
+
+    def __init__(self, precision=14):
+        self._precision = precision
+        self._registers = bytearray(1 << precision)
+
+    @property
+    def precision(self):
+        return self._precision
+
+    def add(self, item):
+        precision = self._precision
+        h = _hash64(item)
+        index = h >> (64 - precision)
+        rank = 64 - precision - (h & ((1 << (64 - precision)) - 1)).bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def update(self, items):
+        registers = self._registers
+        shift = 64 - self._precision
+        mask = (1 << shift) - 1
+        for item in items:
+            h = _hash64(item)
+            index = h >> shift
+            rank = shift - (h & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def merge(self, other):
+        """Merge another HyperLogLog of the same precision into this one."""
+        if other._precision != self._precision:
+            raise ValueError("Cannot merge HyperLogLog of precision {} with precision {}"
+                             .format(other._precision, self._precision))
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+    def cardinality(self):
+        """The estimated number of distinct items added."""
+        registers = self._registers
+        m = len(registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / math.fsum(2.0 ** -register for register in registers)
+        zeros = registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+
+class QuantileSketch:
+    """A KLL sketch of the distribution of orderable items.
+
+    Items are retained in a hierarchy of compactors, each of whose items
+    stands for twice as many added items as those of the level below. When
+    the sketch is full, a level is sorted and every other item, from a
+    random offset, is promoted to the level above. The error in the rank of
+    an estimated quantile is about 1.7 / k of the number of items added.
+
+    The error bound relies on the random choices of sketches which are
+    merged being independent. With a seed, the random number generator is
+    seeded at the first compaction from both the seed and the items then
+    held, so that sketches of different portions of a series of items make
+    different choices, while a sketch of the same items with the same seed
+    always makes the same choices.
+    """
+
+    __slots__ = ('_k', '_levels', '_size', '_capacity', '_count', '_min', '_max', '_seed', '_random')
+
+    def __init__(self, k=200, seed=None):
+        self._k = k
+        self._levels = []
+        self._size = 0
+        self._capacity = 0
+        self._count = 0
+        self._min = None
+        self._max = None
+        self._seed = seed
+        self._random = Random() if seed is None else None
+        self._grow()
+
+    def __len__(self):
+        """The number of items added."""
+        return self._count
+
+    def _level_capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return max(int(math.ceil(self._k * (2 / 3) ** depth)), 2)
+
+    def _grow(self):
+        self._levels.append([])
+        self._capacity = sum(map(self._level_capacity, range(len(self._levels))))
+
+    def add(self, item):
+        self._levels[0].append(item)
+        self._size += 1
+        self._count += 1
+        if self._min is None or item < self._min:
+            self._min = item
+        if self._max is None or self._max < item:
+            self._max = item
+        if self._size >= self._capacity:
+            self._compress()
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def _compress(self):
+        levels = self._levels
+        if self._random is None:
+            self._random = Random(_hash64((self._seed, tuple(map(tuple, levels)))))
+        while self._size >= self._capacity:
+            for index, level in enumerate(levels):
+                if len(level) >= self._level_capacity(index):
+                    break
+            if index + 1 == len(levels):
+                self._grow()
+            # Promoting pairs keeps the total weight equal to the item count.
+            kept = [level.pop()] if len(level) % 2 else []
+            level.sort()
+            promoted = level[self._random.getrandbits(1)::2]
+            levels[index] = kept
+            levels[index + 1].extend(promoted)
+            self._size -= len(level) - len(promoted)
+
+    def merge(self, other):
+        """Merge another QuantileSketch into this one."""
+        while len(self._levels) < len(other._levels):
+            self._grow()
+        for level, items in zip(self._levels, other._levels):
+            level.extend(items)
+        self._size += other._size
+        self._count += other._count
+        if other._count:
+            if self._min is None or other._min < self._min:
+                self._min = other._min
+            if self._max is None or self._max < other._max:
+                self._max = other._max
+        self._compress()
+
+    def _weighted(self):
+        weighted = [(item, 1 << level) for level, items in enumerate(self._levels) for item in items]
+        weighted.sort(key=lambda pair: pair[0])
+        return weighted
+
+    def rank(self, value):
+        """The estimated fraction of the items added which are not greater than value."""
+        if not self._count:
+            raise ValueError("rank() of empty QuantileSketch")
+        weight = sum(1 << level for level, items in enumerate(self._levels) for item in items
+                     if not value < item)
+        return weight / self._count
+
+    def quantile(self, q):
+        """The estimated q-quantile of the items added, for q between 0 and 1."""
+        return self.quantiles((q,))[0]
+
+    def quantiles(self, qs):
+        """The estimated quantiles of the items added, for each q in qs."""
+        if not self._count:
+            raise ValueError("quantiles() of empty QuantileSketch")
+        for q in qs:
+            if not 0 <= q <= 1:
+                raise ValueError("quantile {} is not between 0 and 1".format(q))
+        weighted = self._weighted()
+        cumulative = []
+        total = 0
+        for _, weight in weighted:
+            total += weight
+            cumulative.append(total)
+        results = []
+        for q in qs:
+            if q == 0:
+                results.append(self._min)
+            elif q == 1:
+                results.append(self._max)
+            else:
+                index = bisect_left(cumulative, q * self._count)
+                results.append(weighted[min(index, len(weighted) - 1)][0])
+        return results
+
+
+class CountMinSketch:
+    """An estimate of the number of times each item was added.
+
+    Estimates never fall below the true count, and exceed it by at most
+    e / width of the total count, with probability at least
+    1 - exp(-depth).
+    """
+
+    __slots__ = ('_width', '_depth', '_table', '_total')
+
+    def __init__(self, width, depth):
+        self._width = width
+        self._depth = depth
+        self._table = array('q', bytes(8 * width * depth))
+        self._total = 0
+
+    @property
+    def total(self):
+        """The total count of the items added."""
+        return self._total
+
+    def _indexes(self, item):
+        digest = _digest(item)
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        width = self._width
+        return [row * width + (h1 + row * h2) % width for row in range(self._depth)]
+
+    def add(self, item, count=1):
+        table = self._table
+        for index in self._indexes(item):
+            table[index] += count
+        self._total += count
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def estimate(self, item):
+        """The estimated number of times item was added."""
+        table = self._table
+        return min(table[index] for index in self._indexes(item))
+
+    def merge(self, other):
+        """Merge another CountMinSketch of the same dimensions into this one."""
+        if (other._width, other._depth) != (self._width, self._depth):
+            raise ValueError("Cannot merge CountMinSketch of width {} and depth {} with width {} and depth {}"
+                             .format(other._width, other._depth, self._width, self._depth))
+        self._table = array('q', map(int.__add__, self._table, other._table))
+        self._total += other._total
+
+
+class SpaceSaving:
+    """The most frequent items, with estimates of their counts.
+
+    At most capacity items are counted. When a new item arrives and the
+    sketch is full, the item with the lowest count is replaced, and the new
+    item inherits its count as an overestimate. Any item added more than
+    1 / capacity of the total number of times is guaranteed to be counted.
+
+    Counts are held in a dictionary of item to [count, error]. A heap of
+    (count, sequence, item) entries, one for each counted item, finds the
+    lowest count. Since counts only increase, heap entries are brought up
+    to date only when they reach the top.
+    """
+
+    __slots__ = ('_capacity', '_counters', '_heap', '_sequence', '_total')
+
+    def __init__(self, capacity):
+        self._capacity = capacity
+        self._counters = {}
+        self._heap = []
+        self._sequence = count()
+        self._total = 0
+
+    @property
+    def total(self):
+        """The total number of items added."""
+        return self._total
+
+    def add(self, item, weight=1):
+        self._total += weight
+        counter = self._counters.get(item)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self._counters) < self._capacity:
+            self._counters[item] = [weight, 0]
+            heappush(self._heap, (weight, next(self._sequence), item))
+        else:
+            minimum = self._evict()
+            self._counters[item] = [minimum + weight, minimum]
+            heappush(self._heap, (minimum + weight, next(self._sequence), item))
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def _evict(self):
+        heap = self._heap
+        counters = self._counters
+        while True:
+            recorded, _, item = heap[0]
+            current = counters[item][0]
+            if current == recorded:
+                heappop(heap)
+                del counters[item]
+                return current
+            heapreplace(heap, (current, next(self._sequence), item))
+
+    def _minimum(self):
+        if len(self._counters) < self._capacity:
+            return 0
+        return min(counter[0] for counter in self._counters.values())
+
+    def estimate(self, item):
+        """An upper bound on the number of times item was added."""
+        counter = self._counters.get(item)
+        return self._minimum() if counter is None else counter[0]
+
+    def top(self, n=None):
+        """The n most frequently added items, or all counted items, as (item, count, error) tuples.
+
+        The true count of each item lies between count - error and count.
+        """
+        ranked = sorted(((item, c, error) for item, (c, error) in self._counters.items()),
+                        key=lambda entry: entry[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def merge(self, other):
+        """Merge another SpaceSaving into this one, keeping this one's capacity."""
+        minimum = self._minimum()
+        other_minimum = other._minimum()
+        merged = {}
+        for item, (c, error) in self._counters.items():
+            other_counter = other._counters.get(item)
+            if other_counter is None:
+                merged[item] = [c + other_minimum, error + other_minimum]
+            else:
+                merged[item] = [c + other_counter[0], error + other_counter[1]]
+        for item, (c, error) in other._counters.items():
+            if item not in merged:
+                merged[item] = [c + minimum, error + minimum]
+        if len(merged) > self._capacity:
+            kept = sorted(merged.items(), key=lambda entry: entry[1][0], reverse=True)[:self._capacity]
+            merged = dict(kept)
+        self._counters = merged
+        self._heap = [(c, next(self._sequence), item) for item, (c, _) in merged.items()]
+        heapify(self._heap)
+        self._total += other._total
+
+
+class Sketching(Reducer):
+    """Accumulates items into a sketch created by a factory."""
+
+    __slots__ = ('_factory',)
+
+    def __init__(self, factory):
+        self._factory = factory
+
+    def initial(self):
+        return self._factory()
+
+    def step(self, result, item):
+        result.add(item)
+        return result
+
+    def step_batch(self, result, items):
+        result.update(items)
+        return result
+
+    def combine(self, left, right):
+        left.merge(right)
+        return left
+
+
+def hyperloglog(precision=14):
+    """Estimate the number of distinct items.
+
+    Args:
+        precision: The base two logarithm of the number of one byte
+            registers, between 4 and 18. The relative standard error is
+            about 1.04 / sqrt(2 ** precision): 0.8% at the default of 14,
+            using 16 KiB.
+
+    Returns:
+        A Sketching reducer, the result of which is a HyperLogLog, with a
+        cardinality() method.
+    """
+    if not 4 <= precision <= 18:
+        raise ValueError("hyperloglog() precision {} is not between 4 and 18".format(precision))
+
+    return Sketching(partial(HyperLogLog, precision))
+
+
+def quantiles(k=200, seed=None):
+    """Estimate quantiles and ranks of orderable items.
+
+    Args:
+        k: The capacity of the largest compactor. The sketch retains at most
+            about 3 * k items, and the error in rank of an estimated
+            quantile is about 1.7 / k: under 1% at the default of 200.
+        seed: An optional seed for the random choices made when compacting,
+            so that results can be reproduced. Each sketch combines it with
+            the items it holds when first compacted, so that sketches of
+            different items make independent choices.
+
+    Returns:
+        A Sketching reducer, the result of which is a QuantileSketch, with
+        quantile(), quantiles() and rank() methods.
+    """
+    if k < 2:
+        raise ValueError("quantiles() k {} is not at least 2".format(k))
+
+    return Sketching(partial(QuantileSketch, k, seed))
+
+
+def count_min(epsilon=0.001, delta=0.01):
+    """Estimate the number of times each item occurs.
+
+    Args:
+        epsilon: The maximum overestimate of each count, as a fraction of
+            the total count.
+        delta: The probability that an estimate exceeds that bound.
+
+    Returns:
+        A Sketching reducer, the result of which is a CountMinSketch, with
+        an estimate() method.
+    """
+    if not 0 < epsilon < 1:
+        raise ValueError("count_min() epsilon {} is not between 0 and 1".format(epsilon))
+
+    if not 0 < delta < 1:
+        raise ValueError("count_min() delta {} is not between 0 and 1".format(delta))
+
+    width = int(math.ceil(math.e / epsilon))
+    depth = int(math.ceil(math.log(1 / delta)))
+    return Sketching(partial(CountMinSketch, width, depth))
+
+
+def heavy_hitters(capacity=100):
+    """Find the most frequently occurring items, using the Space-Saving algorithm.
+
+    Args:
+        capacity: The number of items counted. Every item which occurs more
+            than 1 / capacity of the time is found.
+
+    Returns:
+        A Sketching reducer, the result of which is a SpaceSaving, with
+        top() and estimate() methods.
+    """
+    if capacity < 1:
+        raise ValueError("heavy_hitters() capacity {} is not at least 1".format(capacity))
+
+    return Sketching(partial(SpaceSaving, capacity))
@@ -2,12 +2,22 @@
 
 The functions in this module return transducers.
 """
-from collections import deque
+import asyncio
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from functools import reduce
+from heapq import heappop, heappush, heapreplace, merge
+from itertools import chain, repeat
+from math import exp, log, log1p
+import pickle
+from random import Random
+from time import monotonic
 
-from transducer._util import UNSET
-from transducer.functional import true
-from transducer.infrastructure import Reduced, Transducer
+from transducer._spill import SpilledSet, SpillFile
+from transducer._util import UNSET, BloomFilter, RingBuffer
+from transducer.functional import identity, true
+from transducer.infrastructure import Reduced, Reducer, Transducer, step_batch
+from transducer.reducers import appending
 
 
 # Functions for creating transducers, which are themselves
@@ -17,6 +27,8 @@ from transducer.infrastructure import Reduced, Transducer
 
 class Mapping(Transducer):
 
+    __slots__ = ('_transform',)
+
     def __init__(self, reducer, transform):
         super().__init__(reducer)
         self._transform = transform
@@ -24,6 +36,10 @@ class Mapping(Transducer):
     def step(self, result, item):
         return self._reducer(result, self._transform(item))
 
+    def step_batch(self, result, items):
+        transform = self._transform
+        return step_batch(self._reducer, result, [transform(item) for item in items])
+
 
 def mapping(transform):
     """Create a mapping transducer with the given transform.
@@ -47,8 +63,214 @@ def mapping(transform):
 # ---------------------------------------------------------------------
 
 
+class MappingConcurrent(Transducer):
+
+    __slots__ = ('_transform', '_max_workers', '_ordered', '_max_in_flight', '_executor', '_in_flight')
+
+    def __init__(self, reducer, transform, max_workers, ordered, max_in_flight):
+        super().__init__(reducer)
+        self._transform = transform
+        self._max_workers = max_workers
+        self._ordered = ordered
+        self._max_in_flight = max_in_flight
+        self._executor = None
+        self._in_flight = deque() if ordered else set()
+
+    def step(self, result, item):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        future = self._executor.submit(self._transform, item)
+        if self._ordered:
+            self._in_flight.append(future)
+        else:
+            self._in_flight.add(future)
+        return self._emit(result, self._max_in_flight - 1)
+
+    def complete(self, result):
+        result = self._emit(result, 0)
+        if isinstance(result, Reduced):
+            result = result.value
+        self._shutdown()
+        return self._reducer.complete(result)
+
+    def _emit(self, result, limit):
+        """Pass on finished results, waiting until no more than limit remain in flight."""
+        try:
+            for transformed in (self._finished_in_order(limit) if self._ordered else self._finished(limit)):
+                result = self._reducer(result, transformed)
+                if isinstance(result, Reduced):
+                    self._shutdown()
+                    break
+        except BaseException:
+            self._shutdown()
+            raise
+        return result
+
+    def _finished_in_order(self, limit):
+        in_flight = self._in_flight
+        while in_flight and (len(in_flight) > limit or in_flight[0].done()):
+            yield in_flight.popleft().result()
+
+    def _finished(self, limit):
+        in_flight = self._in_flight
+        while in_flight:
+            if len(in_flight) > limit:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            else:
+                done = [future for future in in_flight if future.done()]
+                if not done:
+                    break
+            for future in done:
+                in_flight.discard(future)
+                yield future.result()
+
+    def _shutdown(self):
+        for future in self._in_flight:
+            future.cancel()
+        self._in_flight.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def mapping_concurrent(transform, max_workers=None, ordered=True, max_in_flight=None):
+    """Create a mapping transducer which applies its transform in a pool of threads.
+
+    Suitable for transforms which spend most of their time waiting on I/O.
+    A bounded number of items are transformed concurrently, and results are
+    passed on as they become available. Any outstanding transforms are
+    waited for on completion, or cancelled if reduction is terminated early.
+
+    Args:
+        transform: A single-argument function which will be applied to
+            each input element to produce the corresponding output
+            element.
+        max_workers: The maximum number of threads. If not supplied the
+            default for concurrent.futures.ThreadPoolExecutor is used.
+        ordered: If True, results are passed on in the order of the
+            corresponding input items, otherwise in the order in which
+            they become available.
+        max_in_flight: The maximum number of items submitted to the pool
+            but not yet passed on. Defaults to twice max_workers, or 64
+            if max_workers is not supplied.
+
+    Returns: A mapping transducer.
+    """
+
+    if max_workers is not None and max_workers < 1:
+        raise ValueError("mapping_concurrent() max_workers {} is not at least 1".format(max_workers))
+
+    if max_in_flight is None:
+        max_in_flight = 64 if max_workers is None else 2 * max_workers
+
+    if max_in_flight < 1:
+        raise ValueError("mapping_concurrent() max_in_flight {} is not at least 1".format(max_in_flight))
+
+    def mapping_concurrent_transducer(reducer):
+        return MappingConcurrent(reducer, transform, max_workers, ordered, max_in_flight)
+
+    return mapping_concurrent_transducer
+
+# ---------------------------------------------------------------------
+
+
+class AMapping(Transducer):
+    """A mapping stage with asynchronous step() and complete() methods."""
+
+    __slots__ = ('_transform', '_concurrency', '_ordered', '_in_flight')
+
+    def __init__(self, reducer, transform, concurrency, ordered):
+        super().__init__(reducer)
+        self._transform = transform
+        self._concurrency = concurrency
+        self._ordered = ordered
+        self._in_flight = deque() if ordered else set()
+
+    async def step(self, result, item):
+        task = asyncio.ensure_future(self._transform(item))
+        if self._ordered:
+            self._in_flight.append(task)
+        else:
+            self._in_flight.add(task)
+        return await self._emit(result, self._concurrency - 1)
+
+    async def complete(self, result):
+        result = await self._emit(result, 0)
+        if isinstance(result, Reduced):
+            result = result.value
+        self._cancel()
+        return self._reducer.complete(result)
+
+    async def _emit(self, result, limit):
+        """Pass on finished results, waiting until no more than limit remain in flight."""
+        in_flight = self._in_flight
+        try:
+            while in_flight:
+                if self._ordered:
+                    if len(in_flight) <= limit and not in_flight[0].done():
+                        break
+                    transformed = [await in_flight[0]]
+                    in_flight.popleft()
+                else:
+                    if len(in_flight) > limit:
+                        done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    else:
+                        done = [task for task in in_flight if task.done()]
+                        if not done:
+                            break
+                    in_flight.difference_update(done)
+                    transformed = [task.result() for task in done]
+                for value in transformed:
+                    result = self._reducer(result, value)
+                    if isinstance(result, Reduced):
+                        self._cancel()
+                        return result
+        except BaseException:
+            self._cancel()
+            raise
+        return result
+
+    def _cancel(self):
+        for task in self._in_flight:
+            task.cancel()
+        self._in_flight.clear()
+
+
+def amapping(transform, concurrency=1, ordered=True):
+    """Create a mapping transducer with an asynchronous transform.
+
+    The transducer can only be used with the asynchronous transducible
+    processes in transducer.coop and transducer.lazy_coop. Up to
+    concurrency transforms are scheduled as asyncio tasks at once, and
+    any outstanding tasks are cancelled if reduction is terminated early.
+
+    Args:
+        transform: A single-argument coroutine function which will be
+            applied to each input element to produce the corresponding
+            output element.
+        concurrency: The maximum number of transforms in progress at once.
+        ordered: If True, results are passed on in the order of the
+            corresponding input items, otherwise in the order in which
+            they become available.
+
+    Returns: An asynchronous mapping transducer.
+    """
+
+    if concurrency < 1:
+        raise ValueError("amapping() concurrency {} is not at least 1".format(concurrency))
+
+    def amapping_transducer(reducer):
+        return AMapping(reducer, transform, concurrency, ordered)
+
+    return amapping_transducer
+
+# ---------------------------------------------------------------------
+
+
 class Filtering(Transducer):
 
+    __slots__ = ('_predicate',)
+
     def __init__(self, reducer, predicate):
         super().__init__(reducer)
         self._predicate = predicate
@@ -56,6 +278,10 @@ class Filtering(Transducer):
     def step(self, result, item):
         return self._reducer(result, item) if self._predicate(item) else result
 
+    def step_batch(self, result, items):
+        predicate = self._predicate
+        return step_batch(self._reducer, result, [item for item in items if predicate(item)])
+
 
 def filtering(predicate):
     """Create a filtering transducer with the given predicate.
@@ -82,6 +308,8 @@ def filtering(predicate):
 
 class Reducing(Transducer):
 
+    __slots__ = ('_reducer2', '_accumulator')
+
     def __init__(self, reducer, reducer2, init=UNSET):
         super().__init__(reducer)
         self._reducer2 = reducer2
@@ -123,6 +351,8 @@ def reducing(reducer, init=UNSET):
 
 class Scanning(Transducer):
 
+    __slots__ = ('_reducer2', '_accumulator')
+
     def __init__(self, reducer, reducer2, init=UNSET):
         super().__init__(reducer)
         self._reducer2 = reducer2
@@ -149,6 +379,8 @@ def scanning(reducer, init=UNSET):
 
 class Enumerating(Transducer):
 
+    __slots__ = ('_counter',)
+
     def __init__(self, reducer, start):
         super().__init__(reducer)
         self._counter = start
@@ -158,6 +390,11 @@ class Enumerating(Transducer):
         self._counter += 1
         return self._reducer(result, (index, item))
 
+    def step_batch(self, result, items):
+        start = self._counter
+        self._counter += len(items)
+        return step_batch(self._reducer, result, list(zip(range(start, self._counter), items)))
+
 
 def enumerating(start=0):
     """Create a transducer which enumerates items."""
@@ -172,6 +409,8 @@ def enumerating(start=0):
 
 class Mapcatting(Transducer):
 
+    __slots__ = ('_transform',)
+
     def __init__(self, reducer, transform):
         super().__init__(reducer)
         self._transform = transform
@@ -179,6 +418,10 @@ class Mapcatting(Transducer):
     def step(self, result, item):
         return reduce(self._reducer, self._transform(item), result)
 
+    def step_batch(self, result, items):
+        transform = self._transform
+        return step_batch(self._reducer, result, [output for item in items for output in transform(item)])
+
 
 def mapcatting(transform):
     """Create a transducer which transforms items and concatenates the results"""
@@ -193,6 +436,8 @@ def mapcatting(transform):
 
 class Taking(Transducer):
 
+    __slots__ = ('_counter', '_n')
+
     def __init__(self, reducer, n):
         super().__init__(reducer)
         self._counter = 0
@@ -203,6 +448,15 @@ class Taking(Transducer):
         result = self._reducer(result, item)
         return Reduced(result) if self._counter >= self._n else result
 
+    def step_batch(self, result, items):
+        # Like step(), always pass on at least one item before terminating.
+        remaining = max(self._n - self._counter, 1)
+        if len(items) < remaining:
+            self._counter += len(items)
+            return step_batch(self._reducer, result, items)
+        self._counter += remaining
+        return Reduced(step_batch(self._reducer, result, items[:remaining]))
+
 
 def taking(n):
     """Create a transducer which takes the first n items"""
@@ -220,6 +474,8 @@ def taking(n):
 
 class TakingWhile(Transducer):
 
+    __slots__ = ('_predicate',)
+
     def __init__(self, reducer, predicate):
         super().__init__(reducer)
         self._predicate = predicate
@@ -227,6 +483,13 @@ class TakingWhile(Transducer):
     def step(self, result, item):
         return self._reducer(result, item) if self._predicate(item) else Reduced(result)
 
+    def step_batch(self, result, items):
+        predicate = self._predicate
+        for index, item in enumerate(items):
+            if not predicate(item):
+                return Reduced(step_batch(self._reducer, result, items[:index]))
+        return step_batch(self._reducer, result, items)
+
 
 def taking_while(predicate):
     """Create a transducer which takes leading items while they satisfy a predicate."""
@@ -241,6 +504,8 @@ def taking_while(predicate):
 
 class Dropping(Transducer):
 
+    __slots__ = ('_counter', '_n')
+
     def __init__(self, reducer, n):
         super().__init__(reducer)
         self._counter = 0
@@ -251,6 +516,11 @@ class Dropping(Transducer):
         self._counter += 1
         return result
 
+    def step_batch(self, result, items):
+        remaining = self._n - self._counter
+        self._counter += len(items)
+        return step_batch(self._reducer, result, items[remaining:] if remaining > 0 else items)
+
 
 def dropping(n):
     """Create a transducer which drops the first n items"""
@@ -266,6 +536,8 @@ def dropping(n):
 
 class DroppingWhile(Transducer):
 
+    __slots__ = ('_predicate', '_dropping')
+
     def __init__(self, reducer, predicate):
         super().__init__(reducer)
         self._predicate = predicate
@@ -275,6 +547,18 @@ class DroppingWhile(Transducer):
         self._dropping = self._dropping and self._predicate(item)
         return result if self._dropping else self._reducer(result, item)
 
+    def step_batch(self, result, items):
+        if self._dropping:
+            predicate = self._predicate
+            for index, item in enumerate(items):
+                if not predicate(item):
+                    self._dropping = False
+                    items = items[index:]
+                    break
+            else:
+                return result
+        return step_batch(self._reducer, result, items)
+
 
 def dropping_while(predicate):
     """Create a transducer which drops leading items while a predicate holds."""
@@ -289,6 +573,8 @@ def dropping_while(predicate):
 
 class Distinct(Transducer):
 
+    __slots__ = ('_seen',)
+
     def __init__(self, reducer):
         super().__init__(reducer)
         self._seen = set()
@@ -300,10 +586,312 @@ class Distinct(Transducer):
         return result
 
 
-def distinct():
-    """Create a transducer which filters distinct items"""
+class DistinctBy(Transducer):
+
+    __slots__ = ('_key', '_seen')
+
+    def __init__(self, reducer, key):
+        super().__init__(reducer)
+        self._key = key
+        self._seen = set()
+
+    def step(self, result, item):
+        k = self._key(item)
+        if k not in self._seen:
+            self._seen.add(k)
+            return self._reducer(result, item)
+        return result
+
+
+class DistinctRecent(Transducer):
+    """Filters items distinct from those recently seen.
+
+    Remembers at most max_size keys, and forgets keys first seen more than
+    ttl seconds ago. Without a ttl, the least recently seen key is evicted.
+    With a ttl, keys are kept in the order in which they were first seen, so
+    that expired keys can be found at the front, and the key first seen
+    earliest is evicted.
+    """
+
+    __slots__ = ('_key', '_max_size', '_ttl', '_clock', '_seen', '_stats')
+
+    def __init__(self, reducer, key, max_size, ttl, clock, stats):
+        super().__init__(reducer)
+        self._key = key
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._seen = OrderedDict()
+        self._stats = stats
+
+    def step(self, result, item):
+        k = self._key(item)
+        seen = self._seen
+        if self._ttl is not None:
+            now = self._clock()
+            self._expire(now - self._ttl)
+        else:
+            now = None
+        if k in seen:
+            if self._ttl is None:
+                seen.move_to_end(k)
+            return result
+        seen[k] = now
+        if self._max_size is not None and len(seen) > self._max_size:
+            seen.popitem(last=False)
+            if self._stats is not None:
+                self._stats['evictions'] += 1
+        if self._stats is not None:
+            self._stats['size'] = len(seen)
+        return self._reducer(result, item)
+
+    def _expire(self, horizon):
+        # With a ttl, keys are ordered by the time they were first seen.
+        seen = self._seen
+        expired = 0
+        while seen:
+            k, timestamp = next(iter(seen.items()))
+            if timestamp > horizon:
+                break
+            del seen[k]
+            expired += 1
+        if expired and self._stats is not None:
+            self._stats['expirations'] += expired
+
+
+class DistinctApproximate(Transducer):
+    """Filters distinct items using Bloom filters.
+
+    A small proportion of distinct items may be mistaken for items already
+    seen and discarded. To bound the false positive rate on unbounded
+    streams, keys are added to a current filter, and when it has had
+    capacity keys added it becomes the previous filter, replacing the one
+    before. A key found only in the previous filter is added to the current
+    one, so keys seen within the last capacity distinct keys are always
+    remembered, and those not seen for two generations are forgotten.
+    """
+
+    __slots__ = ('_key', '_capacity', '_error_rate', '_current', '_previous', '_stats')
+
+    def __init__(self, reducer, key, capacity, error_rate, stats):
+        super().__init__(reducer)
+        self._key = key
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous = None
+        self._stats = stats
+        if stats is not None:
+            stats.update(bits=2 * self._current.num_bits, hashes=self._current.num_hashes, rotations=0)
+
+    def step(self, result, item):
+        k = self._key(item)
+        current = self._current
+        if self._previous is not None and k in self._previous:
+            current.add(k)
+            present = True
+        else:
+            present = current.add(k)
+        if len(current) >= self._capacity:
+            self._rotate()
+        if present:
+            return result
+        if self._stats is not None:
+            self._update_stats()
+        return self._reducer(result, item)
+
+    def _rotate(self):
+        self._previous = self._current
+        self._current = BloomFilter(self._capacity, self._error_rate)
+        if self._stats is not None:
+            self._stats['rotations'] += 1
+
+    def _update_stats(self):
+        previous = self._previous
+        self._stats['size'] = len(self._current) + (len(previous) if previous is not None else 0)
+        previous_rate = previous.false_positive_rate if previous is not None else 0.0
+        self._stats['false_positive_rate'] = 1.0 - (1.0 - self._current.false_positive_rate) * (1.0 - previous_rate)
+
+
+# The default number of keys held in memory when spilling to disk, and the
+# number of items whose keys are looked up on disk at once.
+_DEFAULT_MEMORY_LIMIT = 1000000
+_SPILL_BATCH_SIZE = 4096
+
+
+class DistinctSpilling(Transducer):
+    """Filters distinct items, spilling the keys seen to disk.
+
+    Up to memory_limit keys are held in memory. When the limit is exceeded
+    they are moved to a SpilledSet on disk. Thereafter, items are buffered
+    so that the keys of up to batch_size items are looked up on disk at
+    once, and the buffered items are passed on, in order, after each lookup.
+    """
+
+    __slots__ = ('_key', '_memory_limit', '_spill_dir', '_batch_size', '_hot', '_spilled', '_pending',
+                 '_stats')
+
+    def __init__(self, reducer, key, memory_limit, spill_dir, batch_size, stats):
+        super().__init__(reducer)
+        self._key = key
+        self._memory_limit = memory_limit
+        self._spill_dir = spill_dir
+        self._batch_size = batch_size
+        self._hot = set()
+        self._spilled = None
+        self._pending = []
+        self._stats = stats
+
+    def step(self, result, item):
+        if self._spilled is None:
+            k = self._key(item)
+            if k in self._hot:
+                return result
+            self._hot.add(k)
+            if len(self._hot) > self._memory_limit:
+                self._spill()
+            return self._reducer(result, item)
+        self._pending.append(item)
+        if len(self._pending) >= self._batch_size:
+            return self._flush(result)
+        return result
+
+    def complete(self, result):
+        try:
+            if self._pending:
+                result = self._flush(result)
+                if isinstance(result, Reduced):
+                    result = result.value
+        finally:
+            self._close()
+        return self._reducer.complete(result)
+
+    def _spill(self):
+        if self._spilled is None:
+            self._spilled = SpilledSet(self._spill_dir)
+        self._spilled.update(self._hot)
+        self._hot.clear()
+        if self._stats is not None:
+            self._stats['spills'] += 1
+            self._stats['spilled'] = len(self._spilled)
+
+    def _flush(self, result):
+        """Pass on the distinct items among those pending."""
+        pending = self._pending
+        self._pending = []
+        hot = self._hot
+        keys = [self._key(item) for item in pending]
+        on_disk = self._spilled.intersection({k for k in keys if k not in hot})
+        if self._stats is not None:
+            self._stats['disk_lookups'] += 1
+        for k, item in zip(keys, pending):
+            if k in hot or k in on_disk:
+                continue
+            hot.add(k)
+            result = self._reducer(result, item)
+            if isinstance(result, Reduced):
+                break
+        if len(hot) > self._memory_limit:
+            self._spill()
+        return result
+
+    def _close(self):
+        self._pending = []
+        self._hot.clear()
+        if self._spilled is not None:
+            self._spilled.close()
+
+
+def distinct(key=None, max_size=None, ttl=None, approximate=False, error_rate=0.01, stats=None, clock=monotonic,
+             memory_limit=None, spill_dir=None):
+    """Create a transducer which filters distinct items.
+
+    By default every item seen is remembered, so memory use grows with the
+    number of distinct items. For unbounded streams, max_size, ttl or
+    approximate bound the memory used.
+
+    Args:
+        key: An optional single-argument function returning the value by
+            which items are compared. Defaults to the item itself.
+        max_size: The maximum number of keys remembered. When exceeded, the
+            least recently seen key is forgotten, or with ttl the key first
+            seen earliest, so that a later repeat of it will be passed on.
+            With approximate, the number of distinct keys for which the
+            Bloom filter is sized.
+        ttl: If supplied, keys are forgotten this many seconds, according to
+            clock, after they were first seen, so that only repeats within
+            ttl seconds of an item are discarded.
+        approximate: If True, use two Bloom filters, each sized for
+            max_size keys, occupying a fixed number of bits. The newer
+            filter replaces the older once max_size keys have been added to
+            it, so that between max_size and twice max_size of the most
+            recently seen keys are remembered, and the false positive rate
+            remains below about twice error_rate. False positives cause
+            distinct items to be discarded. Requires max_size.
+        error_rate: The target false positive rate of the Bloom filter.
+        stats: An optional dictionary which is updated with the number of
+            keys remembered ('size'), and the number of 'evictions' and
+            'expirations', or for approximate the size of the filters in
+            'bits' and 'hashes', the number of 'rotations' of the filters
+            and their estimated 'false_positive_rate'.
+        clock: A function of no arguments returning the time in seconds,
+            used with ttl.
+        memory_limit: If supplied, every key is remembered exactly, but no
+            more than this number of keys are held in memory. Beyond that,
+            keys are moved to a temporary database on disk, and items are
+            then passed on in batches after their keys have been looked up.
+            Keys must pickle identically when equal, as do strings, bytes,
+            integers and tuples of them. stats records the number of
+            'spills', keys 'spilled' and 'disk_lookups'.
+        spill_dir: The directory in which to create the temporary database.
+            Defaults to the system temporary directory. If supplied without
+            memory_limit, a memory_limit of one million keys is used.
+
+    Returns: A distinct transducer.
+    """
+
+    if spill_dir is not None and memory_limit is None:
+        memory_limit = _DEFAULT_MEMORY_LIMIT
+
+    if memory_limit is not None:
+        if memory_limit < 1:
+            raise ValueError("distinct() memory_limit {} is not at least 1".format(memory_limit))
+        if max_size is not None or ttl is not None or approximate:
+            raise ValueError("distinct() memory_limit cannot be combined with max_size, ttl or approximate")
+
+    if max_size is not None and max_size < 1:
+        raise ValueError("distinct() max_size {} is not at least 1".format(max_size))
+
+    if ttl is not None and ttl <= 0:
+        raise ValueError("distinct() ttl {} is not positive".format(ttl))
+
+    if approximate:
+        if max_size is None:
+            raise ValueError("distinct() approximate requires max_size")
+        if ttl is not None:
+            raise ValueError("distinct() approximate does not support ttl")
+        if not 0 < error_rate < 1:
+            raise ValueError("distinct() error_rate {} is not between 0 and 1".format(error_rate))
+
+    if stats is not None:
+        stats.update(size=0, evictions=0, expirations=0)
+        if approximate:
+            stats.update(error_rate=error_rate, false_positive_rate=0.0)
+        if memory_limit is not None:
+            stats.update(spills=0, spilled=0, disk_lookups=0)
+
+    if key is None:
+        key = identity
 
     def distinct_transducer(reducer):
+        if memory_limit is not None:
+            return DistinctSpilling(reducer, key, memory_limit, spill_dir, _SPILL_BATCH_SIZE, stats)
+        if approximate:
+            return DistinctApproximate(reducer, key, max_size, error_rate, stats)
+        if max_size is not None or ttl is not None or stats is not None:
+            return DistinctRecent(reducer, key, max_size, ttl, clock, stats)
+        if key is not identity:
+            return DistinctBy(reducer, key)
         return Distinct(reducer)
 
     return distinct_transducer
@@ -313,6 +901,8 @@ def distinct():
 
 class Pairwise(Transducer):
 
+    __slots__ = ('_previous_item',)
+
     def __init__(self, reducer):
         super().__init__(reducer)
         self._previous_item = UNSET
@@ -326,11 +916,34 @@ class Pairwise(Transducer):
         return self._reducer.step(result, pair)
 
 
-def pairwise():
-    """Create a transducer which produces successive pairs"""
+class PairwiseView(Transducer):
+    """A pairwise stage which passes on views of a ring buffer rather than new tuples."""
+
+    __slots__ = ('_ring',)
+
+    def __init__(self, reducer):
+        super().__init__(reducer)
+        self._ring = RingBuffer(2)
+
+    def step(self, result, item):
+        self._ring.append(item)
+        if len(self._ring) < 2:
+            return result
+        return self._reducer.step(result, self._ring.view())
+
+
+def pairwise(view=False):
+    """Create a transducer which produces successive pairs
+
+    Args:
+        view: If True, each pair is passed on as a read-only WindowView
+            of length two, rather than a tuple. The same view is reused for
+            every pair, so it must be used or copied before the next item
+            is received.
+    """
 
     def pairwise_transducer(reducer):
-        return Pairwise(reducer)
+        return PairwiseView(reducer) if view else Pairwise(reducer)
 
     return pairwise_transducer
 
@@ -339,6 +952,8 @@ def pairwise():
 
 class Batching(Transducer):
 
+    __slots__ = ('_size', '_pending')
+
     def __init__(self, reducer, size):
         super().__init__(reducer)
         self._size = size
@@ -373,6 +988,8 @@ def batching(size):
 
 class Windowing(Transducer):
 
+    __slots__ = ('_size', '_padding', '_window', '_window_type')
+
     def __init__(self, reducer, size, padding, window_type):
         super().__init__(reducer)
         self._size = size
@@ -395,13 +1012,121 @@ class Windowing(Transducer):
         return self._reducer.complete(result)
 
 
-def windowing(size, padding=UNSET, window_type=tuple):
-    """Create a transducer which produces a moving window over items."""
+class SteppedWindowing(Windowing):
+    """A windowing stage which passes on only every step-th window."""
+
+    __slots__ = ('_step', '_counter')
+
+    def __init__(self, reducer, size, padding, window_type, step):
+        super().__init__(reducer, size, padding, window_type)
+        self._step = step
+        self._counter = 0
+
+    def step(self, result, item):
+        self._window.append(item)
+        self._counter += 1
+        if self._counter % self._step != 0:
+            return result
+        return self._reducer.step(result, self._window_type(self._window))
+
+    def complete(self, result):
+        if self._padding is not UNSET:
+            for _ in range(self._size - 1):
+                result = self.step(result, self._padding)
+                if isinstance(result, Reduced):
+                    result = result.value
+                    break
+        else:
+            while len(self._window) > 1:
+                self._window.popleft()
+                self._counter += 1
+                if self._counter % self._step == 0:
+                    result = self._reducer.step(result, self._window_type(self._window))
+                    if isinstance(result, Reduced):
+                        result = result.value
+                        break
+        return self._reducer.complete(result)
+
+
+class ViewWindowing(Transducer):
+    """A windowing stage which passes on views of a ring buffer rather than copies."""
+
+    __slots__ = ('_size', '_padding', '_step', '_counter', '_ring')
+
+    def __init__(self, reducer, size, padding, step, typecode):
+        super().__init__(reducer)
+        self._size = size
+        self._padding = padding
+        self._step = step
+        self._counter = 0
+        self._ring = RingBuffer(size, padding, typecode)
+
+    def step(self, result, item):
+        self._ring.append(item)
+        self._counter += 1
+        if self._counter % self._step != 0:
+            return result
+        return self._reducer.step(result, self._ring.view())
+
+    def complete(self, result):
+        if self._padding is not UNSET:
+            for _ in range(self._size - 1):
+                result = self.step(result, self._padding)
+                if isinstance(result, Reduced):
+                    result = result.value
+                    break
+        else:
+            while len(self._ring) > 1:
+                self._ring.popleft()
+                self._counter += 1
+                if self._counter % self._step == 0:
+                    result = self._reducer.step(result, self._ring.view())
+                    if isinstance(result, Reduced):
+                        result = result.value
+                        break
+        return self._reducer.complete(result)
+
+
+def windowing(size, padding=UNSET, window_type=tuple, step=1, view=False, typecode=None):
+    """Create a transducer which produces a moving window over items.
+
+    Args:
+        size: The number of items in each window.
+        padding: If supplied, windows are always of length size, with
+            padding filling the positions before the first item and after
+            the last. Otherwise the leading and trailing windows are shorter.
+        window_type: A callable which converts the contents of the window,
+            an iterable, to the type of the windows passed on.
+        step: Pass on only every step-th window, so that windows hop
+            step items at a time. For example, if size and step are equal
+            the windows do not overlap.
+        view: If True, windows are passed on as read-only WindowView
+            sequences over a ring buffer, without copying. The same view is
+            reused for every window and its contents change as items
+            arrive, so a window must be used or copied before the next item
+            is received. window_type cannot be used with view.
+        typecode: If supplied, the ring buffer is an array.array with this
+            typecode, and each window is a read-only memoryview of it,
+            suitable for numpy.frombuffer(). Implies view.
+
+    Returns: A windowing transducer.
+    """
 
     if size < 1:
         raise ValueError("windowing() size {} is not at least 1".format(size))
 
+    if step < 1:
+        raise ValueError("windowing() step {} is not at least 1".format(step))
+
+    view = view or typecode is not None
+    if view and window_type is not tuple:
+        raise ValueError("windowing() window_type cannot be used with view")
+
     def windowing_transducer(reducer):
+        if view:
+            return ViewWindowing(reducer, size, padding, step, typecode)
+        if step != 1:
+            return SteppedWindowing(reducer, size, padding, window_type, step)
         return Windowing(reducer, size, padding, window_type)
 
     return windowing_transducer
@@ -409,8 +1134,155 @@ def windowing(size, padding=UNSET, window_type=tuple):
 # ---------------------------------------------------------------------
 
 
+class _Subtracting:
+    """The aggregate of a window, maintained by applying an inverse to evicted items."""
+
+    __slots__ = ('_op', '_inverse', '_items', '_aggregate')
+
+    def __init__(self, op, inverse):
+        self._op = op
+        self._inverse = inverse
+        self._items = deque()
+        self._aggregate = UNSET
+
+    def __len__(self):
+        return len(self._items)
+
+    def push(self, item):
+        self._items.append(item)
+        self._aggregate = item if self._aggregate is UNSET else self._op(self._aggregate, item)
+
+    def pop(self):
+        item = self._items.popleft()
+        self._aggregate = self._inverse(self._aggregate, item) if self._items else UNSET
+
+    def aggregate(self):
+        return self._aggregate
+
+
+class _TwoStacks:
+    """The aggregate of a window of items under an associative operator.
+
+    Newer items are pushed onto a back stack, alongside their running
+    aggregate. Items are popped from a front stack, each entry of which
+    holds the aggregate of an item and all newer items in the front stack.
+    When the front stack is empty, the back stack is reversed onto it.
+    Each item is combined a constant number of times, so the amortized cost
+    of each operation is O(1).
+    """
+
+    __slots__ = ('_op', '_front', '_back', '_back_aggregate')
+
+    def __init__(self, op):
+        self._op = op
+        self._front = []
+        self._back = []
+        self._back_aggregate = UNSET
+
+    def __len__(self):
+        return len(self._front) + len(self._back)
+
+    def push(self, item):
+        self._back.append(item)
+        self._back_aggregate = item if self._back_aggregate is UNSET else self._op(self._back_aggregate, item)
+
+    def pop(self):
+        if not self._front:
+            op = self._op
+            front = self._front
+            aggregate = UNSET
+            for item in reversed(self._back):
+                aggregate = item if aggregate is UNSET else op(item, aggregate)
+                front.append(aggregate)
+            self._back.clear()
+            self._back_aggregate = UNSET
+        self._front.pop()
+
+    def aggregate(self):
+        if not self._front:
+            return self._back_aggregate
+        if not self._back:
+            return self._front[-1]
+        return self._op(self._front[-1], self._back_aggregate)
+
+
+class WindowedReducing(Transducer):
+
+    __slots__ = ('_size', '_padding', '_window')
+
+    def __init__(self, reducer, size, op, inverse, padding):
+        super().__init__(reducer)
+        self._size = size
+        self._padding = padding
+        self._window = _TwoStacks(op) if inverse is None else _Subtracting(op, inverse)
+        if padding is not UNSET:
+            for _ in range(size):
+                self._window.push(padding)
+
+    def step(self, result, item):
+        window = self._window
+        window.push(item)
+        if len(window) > self._size:
+            window.pop()
+        return self._reducer.step(result, window.aggregate())
+
+    def complete(self, result):
+        window = self._window
+        if self._padding is not UNSET:
+            for _ in range(self._size - 1):
+                result = self.step(result, self._padding)
+                if isinstance(result, Reduced):
+                    result = result.value
+                    break
+        else:
+            while len(window) > 1:
+                window.pop()
+                result = self._reducer.step(result, window.aggregate())
+                if isinstance(result, Reduced):
+                    result = result.value
+                    break
+        return self._reducer.complete(result)
+
+
+def windowed_reducing(size, op, inverse=None, padding=UNSET):
+    """Create a transducer which reduces a moving window over items.
+
+    Equivalent to compose(windowing(size, padding), mapping(lambda w: reduce(op, w)))
+    but the aggregate of each window is updated incrementally as items enter
+    and leave it, rather than being recomputed from every item.
+
+    Args:
+        size: The number of items in each window.
+        op: An associative two-argument function, such as operator.add, min
+            or math.gcd.
+        inverse: An optional two-argument function which removes the
+            contribution of an item from an aggregate, such that
+            inverse(op(a, x), x) == a, for example operator.sub when op is
+            operator.add. If supplied, each update costs one call of op and
+            one of inverse. Otherwise, windows are maintained with two
+            stacks, at an amortized cost of three calls of op per item.
+            Note that with floating point items, repeatedly applying an
+            inverse accumulates rounding error.
+        padding: As for windowing().
+
+    Returns: A windowed reducing transducer.
+    """
+
+    if size < 1:
+        raise ValueError("windowed_reducing() size {} is not at least 1".format(size))
+
+    def windowed_reducing_transducer(reducer):
+        return WindowedReducing(reducer, size, op, inverse, padding)
+
+    return windowed_reducing_transducer
+
+# ---------------------------------------------------------------------
+
+
 class First(Transducer):
 
+    __slots__ = ('_predicate',)
+
     def __init__(self, reducer, predicate):
         super().__init__(reducer)
         self._predicate = predicate
@@ -434,6 +1306,8 @@ def first(predicate=None):
 
 class Last(Transducer):
 
+    __slots__ = ('_predicate', '_last_seen')
+
     def __init__(self, reducer, predicate):
         super().__init__(reducer)
         self._predicate = predicate
@@ -465,6 +1339,8 @@ def last(predicate=None):
 
 class ElementAt(Transducer):
 
+    __slots__ = ('_index', '_counter')
+
     def __init__(self, reducer, index):
         super().__init__(reducer)
         self._index = index
@@ -499,6 +1375,8 @@ def element_at(index):
 
 class Repeating(Transducer):
 
+    __slots__ = ('_num_times',)
+
     def __init__(self, reducer, num_times):
         super().__init__(reducer)
         self._num_times = num_times
@@ -508,6 +1386,10 @@ class Repeating(Transducer):
             result = self._reducer.step(result, item)
         return result
 
+    def step_batch(self, result, items):
+        num_times = self._num_times
+        return step_batch(self._reducer, result, [item for item in items for _ in range(num_times)])
+
 
 def repeating(num_times):
 
@@ -524,6 +1406,8 @@ def repeating(num_times):
 
 class Reversing(Transducer):
 
+    __slots__ = ('_items',)
+
     def __init__(self, reducer):
         super().__init__(reducer)
         self._items = deque()
@@ -535,24 +1419,89 @@ class Reversing(Transducer):
     def complete(self, result):
         for item in self._items:
             result = self._reducer.step(result, item)
+            if isinstance(result, Reduced):
+                result = result.value
+                break
 
         self._items.clear()
 
         return self._reducer.complete(result)
 
 
-def reversing():
+class SpillingReversing(Transducer):
+    """A reversing stage which holds at most memory_limit items in memory.
 
-    def reversing_transducer(reducer):
-        return Reversing(reducer)
+    Each time the limit is exceeded, the items held, already reversed, are
+    written as a chunk to a SpillFile. On completion the items in memory,
+    then each chunk from the most recent, are passed on.
+    """
 
-    return reversing_transducer
+    __slots__ = ('_memory_limit', '_spill_dir', '_items', '_file', '_chunks')
 
-# ---------------------------------------------------------------------
+    def __init__(self, reducer, memory_limit, spill_dir):
+        super().__init__(reducer)
+        self._memory_limit = memory_limit
+        self._spill_dir = spill_dir
+        self._items = deque()
+        self._file = None
+        self._chunks = []
+
+    def step(self, result, item):
+        self._items.appendleft(item)
+        if len(self._items) > self._memory_limit:
+            if self._file is None:
+                self._file = SpillFile(self._spill_dir)
+            self._chunks.append(self._file.write(list(self._items)))
+            self._items.clear()
+        return result
+
+    def complete(self, result):
+        try:
+            reversed_items = chain(self._items, *(self._file.read(chunk) for chunk in reversed(self._chunks)))
+            for item in reversed_items:
+                result = self._reducer.step(result, item)
+                if isinstance(result, Reduced):
+                    result = result.value
+                    break
+        finally:
+            self._items.clear()
+            self._chunks.clear()
+            if self._file is not None:
+                self._file.close()
+        return self._reducer.complete(result)
+
+
+def reversing(memory_limit=None, spill_dir=None):
+    """Create a transducer which reverses items.
+
+    Args:
+        memory_limit: If supplied, no more than this number of items are
+            held in memory. Beyond that, items are written in chunks to a
+            temporary file, which is read back in reverse on completion.
+            Items must be picklable.
+        spill_dir: The directory in which to create the temporary file.
+            Defaults to the system temporary directory.
+
+    Returns: A reversing transducer.
+    """
+
+    if memory_limit is not None and memory_limit < 1:
+        raise ValueError("reversing() memory_limit {} is not at least 1".format(memory_limit))
+
+    def reversing_transducer(reducer):
+        if memory_limit is not None:
+            return SpillingReversing(reducer, memory_limit, spill_dir)
+        return Reversing(reducer)
+
+    return reversing_transducer
+
+# ---------------------------------------------------------------------
 
 
 class Ordering(Transducer):
 
+    __slots__ = ('_key', '_reverse', '_items')
+
     def __init__(self, reducer, key, reverse):
         super().__init__(reducer)
         self._key = key
@@ -568,15 +1517,241 @@ class Ordering(Transducer):
 
         for item in self._items:
             result = self._reducer.step(result, item)
+            if isinstance(result, Reduced):
+                result = result.value
+                break
 
         self._items.clear()
 
         return self._reducer.complete(result)
 
 
-def ordering(key=None, reverse=False):
+class _Last:
+    """A heap entry which orders (key, index) pairs in reverse."""
+
+    __slots__ = ('key', 'index', 'item')
+
+    def __init__(self, key, index, item):
+        self.key = key
+        self.index = index
+        self.item = item
+
+    def __lt__(self, other):
+        return (other.key, other.index) < (self.key, self.index)
+
+
+class TopOrdering(Transducer):
+    """An ordering stage which retains only the first limit items in order.
+
+    The retained items are held in a heap, the root of which is the item
+    which would be passed on last, so that each item need only be compared
+    with the root to determine whether it displaces it. Items with equal
+    keys retain their input order, as with a stable sort.
+    """
+
+    __slots__ = ('_key', '_reverse', '_limit', '_heap', '_index')
+
+    def __init__(self, reducer, key, reverse, limit):
+        super().__init__(reducer)
+        self._key = identity if key is None else key
+        self._reverse = reverse
+        self._limit = limit
+        self._heap = []
+        self._index = 0
+
+    def step(self, result, item):
+        key = self._key(item)
+        index = self._index
+        self._index += 1
+        heap = self._heap
+        if self._reverse:
+            # The root has the least key and, of those, the latest index.
+            if len(heap) < self._limit:
+                heappush(heap, (key, -index, item))
+            elif heap[0][0] < key:
+                heapreplace(heap, (key, -index, item))
+        else:
+            if len(heap) < self._limit:
+                heappush(heap, _Last(key, index, item))
+            elif key < heap[0].key:
+                heapreplace(heap, _Last(key, index, item))
+        return result
+
+    def complete(self, result):
+        if self._reverse:
+            entries = sorted((-negated_index, key, item) for key, negated_index, item in self._heap)
+        else:
+            entries = sorted((entry.index, entry.key, entry.item) for entry in self._heap)
+        entries.sort(key=_second, reverse=self._reverse)
+        self._heap.clear()
+
+        for _, _, item in entries:
+            result = self._reducer.step(result, item)
+            if isinstance(result, Reduced):
+                result = result.value
+                break
+
+        return self._reducer.complete(result)
+
+
+def _second(entry):
+    return entry[1]
+
+
+class SpillingOrdering(Transducer):
+    """An ordering stage which holds at most memory_limit items in memory.
+
+    Each time the limit is exceeded, the items held are sorted and written
+    as a run to a SpillFile. On completion the runs, and the items in
+    memory, are merged. The merge is stable since the runs are merged in
+    the order in which they were written.
+    """
+
+    __slots__ = ('_key', '_reverse', '_memory_limit', '_spill_dir', '_items', '_file', '_runs')
+
+    def __init__(self, reducer, key, reverse, memory_limit, spill_dir):
+        super().__init__(reducer)
+        self._key = key
+        self._reverse = reverse
+        self._memory_limit = memory_limit
+        self._spill_dir = spill_dir
+        self._items = []
+        self._file = None
+        self._runs = []
+
+    def step(self, result, item):
+        self._items.append(item)
+        if len(self._items) > self._memory_limit:
+            if self._file is None:
+                self._file = SpillFile(self._spill_dir)
+            self._items.sort(key=self._key, reverse=self._reverse)
+            self._runs.append(self._file.write(self._items))
+            self._items = []
+        return result
+
+    def complete(self, result):
+        try:
+            self._items.sort(key=self._key, reverse=self._reverse)
+            runs = [self._file.read(run) for run in self._runs] + [self._items]
+            for item in merge(*runs, key=self._key, reverse=self._reverse):
+                result = self._reducer.step(result, item)
+                if isinstance(result, Reduced):
+                    result = result.value
+                    break
+        finally:
+            self._items = []
+            self._runs.clear()
+            if self._file is not None:
+                self._file.close()
+        return self._reducer.complete(result)
+
+
+def _sorted(items, key, reverse):
+    return sorted(items, key=key, reverse=reverse)
+
+
+def _is_picklable(obj):
+    try:
+        pickle.dumps(obj)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+class ParallelOrdering(Ordering):
+    """An ordering stage which sorts chunks of items in worker processes.
+
+    The sorted chunks are merged lazily in this process, so that the first
+    items are passed on without waiting for the whole merge. If there are
+    too few items to be worth distributing, or the key cannot be pickled,
+    items are sorted in this process instead.
+    """
+
+    __slots__ = ('_workers',)
+
+    def __init__(self, reducer, key, reverse, workers):
+        super().__init__(reducer, key, reverse)
+        self._workers = workers
+
+    def complete(self, result):
+        items = self._items
+        if len(items) < _PARALLEL_SORT_MIN_ITEMS or not _is_picklable(self._key):
+            return super().complete(result)
+
+        chunk_size = -(-len(items) // self._workers)
+        chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+        self._items = []
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            runs = list(executor.map(_sorted, chunks, repeat(self._key), repeat(self._reverse)))
+        del chunks
+
+        for item in merge(*runs, key=self._key, reverse=self._reverse):
+            result = self._reducer.step(result, item)
+            if isinstance(result, Reduced):
+                result = result.value
+                break
+
+        return self._reducer.complete(result)
+
+
+# The fewest items for which sorting in parallel is worthwhile.
+_PARALLEL_SORT_MIN_ITEMS = 50000
+
+
+def ordering(key=None, reverse=False, limit=None, memory_limit=None, spill_dir=None, parallel=None):
+    """Create a transducer which sorts items.
+
+    Items are sorted on completion, stably, as by sorted().
+
+    Args:
+        key: An optional single-argument function returning the value by
+            which items are compared.
+        reverse: If True, sort in descending order.
+        limit: If supplied, only the first limit items in sorted order are
+            passed on, and only that many items are retained while
+            reducing, in a heap. If ordering() is directly followed by
+            taking(n), a limit of n is applied automatically.
+        memory_limit: If supplied, no more than this number of items are
+            held in memory. Beyond that, sorted runs of items are written to
+            a temporary file, and merged on completion. Items must be
+            picklable. Not needed with limit.
+        spill_dir: The directory in which to create the temporary file.
+            Defaults to the system temporary directory.
+        parallel: If supplied, the number of worker processes in which to
+            sort chunks of the items on completion. The sorted chunks are
+            merged as they are passed on. Items and key must be picklable,
+            so key should be defined at module level; if it cannot be
+            pickled, or there are few items, the items are sorted in this
+            process. Cannot be combined with memory_limit, and not needed
+            with limit.
+
+    Returns: An ordering transducer.
+    """
+
+    if parallel is not None:
+        if parallel < 1:
+            raise ValueError("ordering() parallel {} is not at least 1".format(parallel))
+        if memory_limit is not None:
+            raise ValueError("ordering() parallel cannot be combined with memory_limit")
+
+    if limit is not None and limit < 1:
+        raise ValueError("ordering() limit {} is not at least 1".format(limit))
+
+    if memory_limit is not None and memory_limit < 1:
+        raise ValueError("ordering() memory_limit {} is not at least 1".format(memory_limit))
 
     def ordering_transducer(reducer):
+        top = limit
+        if type(reducer) is Taking:
+            # Like Taking.step(), which always passes on at least one item.
+            taken = max(reducer._n, 1)
+            top = taken if top is None else min(top, taken)
+        if top is not None:
+            return TopOrdering(reducer, key, reverse, top)
+        if memory_limit is not None:
+            return SpillingOrdering(reducer, key, reverse, memory_limit, spill_dir)
+        if parallel is not None and parallel > 1:
+            return ParallelOrdering(reducer, key, reverse, parallel)
         return Ordering(reducer, key, reverse)
 
     return ordering_transducer
@@ -586,6 +1761,8 @@ def ordering(key=None, reverse=False):
 
 class Counting(Transducer):
 
+    __slots__ = ('_predicate', '_count')
+
     def __init__(self, reducer, predicate):
         super().__init__(reducer)
         self._predicate = predicate
@@ -609,3 +1786,999 @@ def counting(predicate=None):
         return Counting(reducer, predicate)
 
     return counting_transducer
+
+# ---------------------------------------------------------------------
+
+
+class EventTimeWindowing(Transducer):
+    """A base for stages which aggregate items in windows of event time.
+
+    The watermark is the greatest timestamp seen, less the permitted
+    lateness. Windows are closed, and their aggregates passed on, once the
+    watermark reaches their end. Items which would only belong to windows
+    which have already closed are discarded as late.
+
+    Each window is a [reducer, accumulator] list, where reducer is obtained
+    from window_reducer, a function of no arguments, when the window opens.
+    """
+
+    __slots__ = ('_window_reducer', '_timestamp', '_lateness', '_watermark', '_stats', '_terminated')
+
+    def __init__(self, reducer, window_reducer, timestamp, lateness, stats):
+        super().__init__(reducer)
+        self._window_reducer = window_reducer
+        self._timestamp = timestamp
+        self._lateness = lateness
+        self._watermark = UNSET
+        self._stats = stats
+        self._terminated = False
+
+    def step(self, result, item):
+        t = self._timestamp(item)
+        watermark = self._watermark
+        if watermark is not UNSET and self._is_late(t, watermark):
+            if self._stats is not None:
+                self._stats['late'] += 1
+            return result
+        self._assign(t, item)
+        if watermark is UNSET or t - self._lateness > watermark:
+            self._watermark = t - self._lateness
+            result = self._close(result, self._watermark)
+            self._terminated = isinstance(result, Reduced)
+        return result
+
+    def complete(self, result):
+        # Open windows are only passed on if reduction was not terminated early.
+        if not self._terminated:
+            result = self._close(result, UNSET)
+            if isinstance(result, Reduced):
+                result = result.value
+        return self._reducer.complete(result)
+
+    def _open(self):
+        reducer = self._window_reducer()
+        return [reducer, reducer.initial()]
+
+    def _aggregate(self, window, item):
+        reducer, accumulator = window
+        if not isinstance(accumulator, Reduced):
+            window[1] = reducer.step(accumulator, item)
+
+    def _emit(self, result, start, end, window):
+        reducer, accumulator = window
+        if isinstance(accumulator, Reduced):
+            accumulator = accumulator.value
+        return self._reducer.step(result, (start, end, reducer.complete(accumulator)))
+
+    def _is_late(self, t, watermark):
+        raise NotImplementedError
+
+    def _assign(self, t, item):
+        raise NotImplementedError
+
+    def _close(self, result, watermark):
+        """Pass on the windows ending at or before watermark, or all windows if it is UNSET."""
+        raise NotImplementedError
+
+
+class FixedWindowing(EventTimeWindowing):
+    """Windows of fixed duration starting at every multiple of every."""
+
+    __slots__ = ('_duration', '_every', '_windows', '_ends')
+
+    def __init__(self, reducer, duration, every, window_reducer, timestamp, lateness, stats):
+        super().__init__(reducer, window_reducer, timestamp, lateness, stats)
+        self._duration = duration
+        self._every = every
+        self._windows = {}
+        self._ends = []
+
+    def _is_late(self, t, watermark):
+        return t - t % self._every + self._duration <= watermark
+
+    def _assign(self, t, item):
+        watermark = self._watermark
+        windows = self._windows
+        start = t - t % self._every
+        while start > t - self._duration:
+            end = start + self._duration
+            if watermark is not UNSET and end <= watermark:
+                break
+            if start not in windows:
+                windows[start] = self._open()
+                heappush(self._ends, (end, start))
+            self._aggregate(windows[start], item)
+            start -= self._every
+
+    def _close(self, result, watermark):
+        ends = self._ends
+        while ends and (watermark is UNSET or ends[0][0] <= watermark):
+            end, start = heappop(ends)
+            result = self._emit(result, start, end, self._windows.pop(start))
+            if isinstance(result, Reduced):
+                return result
+        return result
+
+
+class SessionWindowing(EventTimeWindowing):
+    """Windows which extend while items arrive less than gap apart."""
+
+    __slots__ = ('_gap', '_sessions')
+
+    def __init__(self, reducer, gap, window_reducer, timestamp, lateness, stats):
+        super().__init__(reducer, window_reducer, timestamp, lateness, stats)
+        self._gap = gap
+        # Non-overlapping [start, end, window] lists, ordered by start, where
+        # end is the time of the last item plus gap.
+        self._sessions = []
+
+    def _is_late(self, t, watermark):
+        # An item behind the watermark is still accepted if it falls within,
+        # or within gap before, a session which is still open.
+        if t + self._gap > watermark:
+            return False
+        gap = self._gap
+        return not any(start - gap < t < end for start, end, _ in self._sessions)
+
+    def _assign(self, t, item):
+        sessions = self._sessions
+        gap = self._gap
+        # Find the sessions which t would extend or bridge, searching from
+        # the most recent since items are usually roughly in order.
+        hi = len(sessions)
+        while hi > 0 and sessions[hi - 1][0] >= t + gap:
+            hi -= 1
+        lo = hi
+        while lo > 0 and sessions[lo - 1][1] > t:
+            lo -= 1
+        if lo == hi:
+            window = self._open()
+            self._aggregate(window, item)
+            sessions.insert(lo, [t, t + gap, window])
+            return
+        session = sessions[lo]
+        session[0] = min(session[0], t)
+        session[1] = max(session[1], t + gap)
+        self._aggregate(session[2], item)
+        # The item bridges the gap between sessions, which are merged in order.
+        for following in sessions[lo + 1:hi]:
+            session[1] = max(session[1], following[1])
+            self._combine(session[2], following[2])
+        del sessions[lo + 1:hi]
+
+    def _combine(self, window, following):
+        reducer, left = window
+        right = following[1]
+        if isinstance(left, Reduced):
+            return
+        if isinstance(right, Reduced):
+            window[1] = Reduced(reducer.combine(left, right.value))
+        else:
+            window[1] = reducer.combine(left, right)
+
+    def _close(self, result, watermark):
+        sessions = self._sessions
+        while sessions and (watermark is UNSET or sessions[0][1] <= watermark):
+            start, end, window = sessions.pop(0)
+            result = self._emit(result, start, end, window)
+            if isinstance(result, Reduced):
+                return result
+        return result
+
+
+def _event_time_arguments(name, reducer, lateness, stats):
+    if lateness < 0:
+        raise ValueError("{}() lateness {} is negative".format(name, lateness))
+    if stats is not None:
+        stats.update(late=0)
+    return _group_reducer_factory(name, reducer, None)
+
+
+def tumbling(duration, reducer=None, timestamp=identity, lateness=0, stats=None):
+    """Create a transducer which aggregates items in consecutive windows of event time.
+
+    Each item is assigned to the window [start, start + duration) containing
+    its timestamp, where start is a multiple of duration. Items may arrive
+    out of order. A window is closed once an item arrives with a timestamp
+    at least lateness beyond its end, and (start, end, value) is passed on,
+    where value is the completed result of reducing the items in the window,
+    in order of arrival. Items arriving after their window has closed are
+    discarded. Any open windows are closed on completion. Only open windows
+    are held in memory.
+
+    Args:
+        duration: The length of each window, in the units of the timestamps.
+        reducer: The reducer used to aggregate the items in each window,
+            which may be a reducer such as appending(), shared by every
+            window, or a function of no arguments returning a new reducer
+            for each window, for reducers which hold state. Defaults to
+            appending().
+        timestamp: A single-argument function returning the timestamp of
+            an item. Defaults to the item itself.
+        lateness: How far behind the latest timestamp seen an item may be
+            without being discarded.
+        stats: An optional dictionary in which the number of 'late' items
+            discarded is recorded.
+
+    Returns: A tumbling window transducer.
+    """
+
+    if duration <= 0:
+        raise ValueError("tumbling() duration {} is not positive".format(duration))
+    window_reducer = _event_time_arguments('tumbling', reducer, lateness, stats)
+
+    def tumbling_transducer(reducer):
+        return FixedWindowing(reducer, duration, duration, window_reducer, timestamp, lateness, stats)
+
+    return tumbling_transducer
+
+
+def sliding(duration, every, reducer=None, timestamp=identity, lateness=0, stats=None):
+    """Create a transducer which aggregates items in overlapping windows of event time.
+
+    As tumbling(), but windows start at every multiple of every, so that
+    each item is assigned to each of the windows [start, start + duration)
+    containing its timestamp.
+
+    Args:
+        duration: The length of each window.
+        every: The interval between the starts of successive windows.
+        reducer, timestamp, lateness, stats: As for tumbling().
+
+    Returns: A sliding window transducer.
+    """
+
+    if duration <= 0:
+        raise ValueError("sliding() duration {} is not positive".format(duration))
+    if every <= 0:
+        raise ValueError("sliding() every {} is not positive".format(every))
+    window_reducer = _event_time_arguments('sliding', reducer, lateness, stats)
+
+    def sliding_transducer(reducer):
+        return FixedWindowing(reducer, duration, every, window_reducer, timestamp, lateness, stats)
+
+    return sliding_transducer
+
+
+def session(gap, reducer=None, timestamp=identity, lateness=0, stats=None):
+    """Create a transducer which aggregates items in sessions of activity.
+
+    A session contains items with timestamps less than gap apart. Each is
+    passed on as (start, end, value) once closed, where start is the
+    earliest timestamp in the session and end is the latest plus gap. An
+    out of order item which bridges two sessions merges them, using the
+    combine() method of reducer. An item is discarded as late only if it
+    is behind the watermark and cannot join a session which is still open.
+    Otherwise, as tumbling().
+
+    Args:
+        gap: The period of inactivity which ends a session.
+        reducer, timestamp, lateness, stats: As for tumbling().
+
+    Returns: A session window transducer.
+    """
+
+    if gap <= 0:
+        raise ValueError("session() gap {} is not positive".format(gap))
+    window_reducer = _event_time_arguments('session', reducer, lateness, stats)
+
+    def session_transducer(reducer):
+        return SessionWindowing(reducer, gap, window_reducer, timestamp, lateness, stats)
+
+    return session_transducer
+
+# ---------------------------------------------------------------------
+
+
+class GroupingBy(Transducer):
+    """Reduces the items with each key separately, passing on (key, result) pairs on completion.
+
+    The state of each group is a [reducer, accumulator] pair, where the
+    reducer is the chain for that group. Once a group's accumulator is
+    Reduced, further items with its key are discarded.
+
+    If memory_limit is not None, no more groups than that are held in
+    memory. Items with keys first seen beyond the limit are written to one
+    of several partitions in a SpillFile, by hash of their key, and each
+    partition is grouped in turn on completion, being partitioned again if
+    it too has too many keys.
+    """
+
+    __slots__ = ('_key', '_group_reducer', '_memory_limit', '_spill_dir', '_groups', '_file', '_partitions')
+
+    def __init__(self, reducer, key, group_reducer, memory_limit, spill_dir):
+        super().__init__(reducer)
+        self._key = key
+        self._group_reducer = group_reducer
+        self._memory_limit = memory_limit
+        self._spill_dir = spill_dir
+        self._groups = {}
+        self._file = None
+        self._partitions = None
+
+    def step(self, result, item):
+        k = self._key(item)
+        groups = self._groups
+        group = groups.get(k)
+        if group is None:
+            if self._memory_limit is not None and len(groups) >= self._memory_limit:
+                if self._partitions is None:
+                    self._file = SpillFile(self._spill_dir)
+                    self._partitions = _Partitions(self._file, 0)
+                self._partitions.add(k, item)
+                return result
+            reducer = self._group_reducer()
+            group = groups[k] = [reducer, reducer.initial()]
+        accumulator = group[1]
+        if not isinstance(accumulator, Reduced):
+            group[1] = group[0].step(accumulator, item)
+        return result
+
+    def complete(self, result):
+        try:
+            for pair in self._grouped():
+                result = self._reducer.step(result, pair)
+                if isinstance(result, Reduced):
+                    result = result.value
+                    break
+        finally:
+            self._groups.clear()
+            if self._file is not None:
+                self._file.close()
+        return self._reducer.complete(result)
+
+    def _grouped(self):
+        yield from _completed_groups(self._groups)
+        if self._partitions is not None:
+            for items in self._partitions.contents():
+                yield from self._regrouped(items, 1)
+
+    def _regrouped(self, items, depth):
+        """Group spilled items, partitioning them again if they have too many keys."""
+        key = self._key
+        groups = {}
+        partitions = None
+        for item in items:
+            k = key(item)
+            group = groups.get(k)
+            if group is None:
+                if len(groups) >= self._memory_limit and depth < _MAX_PARTITION_DEPTH:
+                    if partitions is None:
+                        partitions = _Partitions(self._file, depth)
+                    partitions.add(k, item)
+                    continue
+                reducer = self._group_reducer()
+                group = groups[k] = [reducer, reducer.initial()]
+            accumulator = group[1]
+            if not isinstance(accumulator, Reduced):
+                group[1] = group[0].step(accumulator, item)
+        yield from _completed_groups(groups)
+        groups.clear()
+        if partitions is not None:
+            for partition_items in partitions.contents():
+                yield from self._regrouped(partition_items, depth + 1)
+
+
+def _completed_groups(groups):
+    for k, (reducer, accumulator) in groups.items():
+        if isinstance(accumulator, Reduced):
+            accumulator = accumulator.value
+        yield k, reducer.complete(accumulator)
+
+
+class _Partitions:
+    """Items divided by the hash of their key between runs in a SpillFile."""
+
+    __slots__ = ('_file', '_depth', '_pending', '_runs')
+
+    def __init__(self, file, depth):
+        self._file = file
+        self._depth = depth
+        self._pending = [[] for _ in range(_NUM_PARTITIONS)]
+        self._runs = [[] for _ in range(_NUM_PARTITIONS)]
+
+    def add(self, key, item):
+        # Salt the hash with the depth, so that a partition which is
+        # partitioned again is divided differently.
+        index = hash((self._depth, key)) % _NUM_PARTITIONS
+        pending = self._pending[index]
+        pending.append(item)
+        if len(pending) >= _PARTITION_BLOCK_SIZE:
+            self._runs[index].append(self._file.write(pending))
+            self._pending[index] = []
+
+    def contents(self):
+        """Iterate over the items in each non-empty partition."""
+        for runs, pending in zip(self._runs, self._pending):
+            if runs or pending:
+                yield chain(chain.from_iterable(self._file.read(run) for run in runs), pending)
+
+
+_NUM_PARTITIONS = 16
+_PARTITION_BLOCK_SIZE = 1024
+_MAX_PARTITION_DEPTH = 8
+
+
+def grouping_by(key, reducer=None, transducer=None, memory_limit=None, spill_dir=None):
+    """Create a transducer which reduces the items with each key separately.
+
+    Each group of items with the same key is reduced as it arrives, so only
+    the reduced state of each group is held, rather than its items. On
+    completion, a (key, result) pair is passed on for each group, in the
+    order in which the keys were first seen.
+
+    Args:
+        key: A single-argument function returning the key of an item.
+        reducer: The reducer for each group, which may be a reducer such as
+            adding() or completing(operator.add, 0), shared by every group,
+            or a function of no arguments returning a new reducer for each
+            group, for reducers which hold state. Defaults to appending().
+        transducer: An optional transducer applied separately to the items
+            of each group, such as taking(3) for the first three items with
+            each key. A group which terminates early, by returning Reduced,
+            receives no further items.
+        memory_limit: If supplied, no more than this number of groups are
+            held in memory. Items with keys first seen beyond the limit are
+            written to temporary files, partitioned by the hash of their
+            key, and grouped partition by partition on completion, in which
+            case the order of keys is unspecified. Items must be picklable.
+        spill_dir: The directory in which to create temporary files.
+            Defaults to the system temporary directory.
+
+    Returns: A grouping transducer.
+    """
+
+    if memory_limit is not None and memory_limit < 1:
+        raise ValueError("grouping_by() memory_limit {} is not at least 1".format(memory_limit))
+
+    group_reducer = _group_reducer_factory('grouping_by', reducer, transducer)
+
+    def grouping_by_transducer(reducer):
+        return GroupingBy(reducer, key, group_reducer, memory_limit, spill_dir)
+
+    return grouping_by_transducer
+
+
+def _group_reducer_factory(name, reducer, transducer):
+    """A function of no arguments returning the reducer chain for a new group."""
+    if reducer is None:
+        reducer = appending()
+    if not hasattr(reducer, 'initial'):
+        if not callable(reducer):
+            raise TypeError("{}() reducer {!r} is neither a reducer nor callable".format(name, reducer))
+        make_reducer = reducer
+    else:
+        def make_reducer():
+            return reducer
+
+    if transducer is None:
+        return make_reducer
+
+    def make_chain():
+        return transducer(make_reducer())
+
+    return make_chain
+
+# ---------------------------------------------------------------------
+
+
+class GroupingRuns(Transducer):
+
+    __slots__ = ('_key', '_group_reducer', '_current_key', '_group', '_accumulator')
+
+    def __init__(self, reducer, key, group_reducer):
+        super().__init__(reducer)
+        self._key = key
+        self._group_reducer = group_reducer
+        self._current_key = UNSET
+        self._group = None
+        self._accumulator = None
+
+    def step(self, result, item):
+        k = self._key(item)
+        if self._current_key is UNSET or k != self._current_key:
+            if self._current_key is not UNSET:
+                result = self._emit(result)
+                if isinstance(result, Reduced):
+                    self._current_key = UNSET
+                    return result
+            self._current_key = k
+            self._group = self._group_reducer()
+            self._accumulator = self._group.initial()
+        if not isinstance(self._accumulator, Reduced):
+            self._accumulator = self._group.step(self._accumulator, item)
+        return result
+
+    def complete(self, result):
+        if self._current_key is not UNSET:
+            result = self._emit(result)
+            if isinstance(result, Reduced):
+                result = result.value
+        return self._reducer.complete(result)
+
+    def _emit(self, result):
+        accumulator = self._accumulator
+        if isinstance(accumulator, Reduced):
+            accumulator = accumulator.value
+        pair = (self._current_key, self._group.complete(accumulator))
+        self._group = None
+        self._accumulator = None
+        return self._reducer.step(result, pair)
+
+
+def grouping_runs(key, reducer=None, transducer=None):
+    """Create a transducer which reduces each run of consecutive items with the same key.
+
+    A (key, result) pair is passed on each time the key changes, and for
+    the final run on completion, so only the state of the current run is
+    held. For input sorted by key this is equivalent to grouping_by(), in
+    constant memory. A key which recurs after a run of another key starts a
+    new run.
+
+    Args:
+        key: A single-argument function returning the key of an item.
+        reducer, transducer: As for grouping_by().
+
+    Returns: A run grouping transducer.
+    """
+
+    group_reducer = _group_reducer_factory('grouping_runs', reducer, transducer)
+
+    def grouping_runs_transducer(reducer):
+        return GroupingRuns(reducer, key, group_reducer)
+
+    return grouping_runs_transducer
+
+# ---------------------------------------------------------------------
+
+
+class DistinctConsecutive(Transducer):
+
+    __slots__ = ('_key', '_previous_key')
+
+    def __init__(self, reducer, key):
+        super().__init__(reducer)
+        self._key = key
+        self._previous_key = UNSET
+
+    def step(self, result, item):
+        k = self._key(item)
+        if self._previous_key is not UNSET and k == self._previous_key:
+            return result
+        self._previous_key = k
+        return self._reducer(result, item)
+
+
+def distinct_consecutive(key=None):
+    """Create a transducer which drops items with the same key as the item before.
+
+    Only the key of the previous item is held, so for input sorted by key
+    this is equivalent to distinct(), in constant memory.
+
+    Args:
+        key: An optional single-argument function returning the value by
+            which items are compared. Defaults to the item itself.
+
+    Returns: A transducer which filters consecutive duplicates.
+    """
+
+    key = identity if key is None else key
+
+    def distinct_consecutive_transducer(reducer):
+        return DistinctConsecutive(reducer, key)
+
+    return distinct_consecutive_transducer
+
+# ---------------------------------------------------------------------
+
+
+class _Forwarding(Reducer):
+    """The reducer at the end of each partition's chain, which forwards items downstream.
+
+    Completion is a no-op, since the downstream reducer is completed only
+    once, by the partitioning stage. Records whether downstream terminated
+    reduction, to distinguish that from termination of the partition.
+    """
+
+    __slots__ = ('_reducer', 'terminated')
+
+    def __init__(self, reducer):
+        self._reducer = reducer
+        self.terminated = False
+
+    def initial(self):
+        return self._reducer.initial()
+
+    def step(self, result, item):
+        result = self._reducer.step(result, item)
+        if isinstance(result, Reduced):
+            self.terminated = True
+        return result
+
+
+class _Tagging(_Forwarding):
+    """Forwards (key, item) pairs downstream."""
+
+    __slots__ = ('_key',)
+
+    def __init__(self, reducer, key):
+        super().__init__(reducer)
+        self._key = key
+
+    def step(self, result, item):
+        return super().step(result, (self._key, item))
+
+
+class PartitioningBy(Transducer):
+    """Routes items to a separate chain for each key.
+
+    Partitions are held in an OrderedDict of key to [chain, forwarding,
+    last_active], ordered from least to most recently active. A partition
+    whose chain terminates early is completed, and its entry retained with
+    a chain of None so that further items with its key are discarded,
+    until it is evicted. Once downstream terminates reduction, no partition
+    is flushed.
+    """
+
+    __slots__ = ('_key', '_transducer', '_max_partitions', '_idle', '_clock', '_tagged', '_partitions', '_stats',
+                 '_terminated')
+
+    def __init__(self, reducer, key, transducer, max_partitions, idle, clock, tagged, stats):
+        super().__init__(reducer)
+        self._key = key
+        self._transducer = transducer
+        self._max_partitions = max_partitions
+        self._idle = idle
+        self._clock = clock
+        self._tagged = tagged
+        self._partitions = OrderedDict()
+        self._stats = stats
+        self._terminated = False
+
+    def step(self, result, item):
+        result = self._step(result, item)
+        self._terminated = isinstance(result, Reduced)
+        return result
+
+    def _step(self, result, item):
+        k = self._key(item)
+        partitions = self._partitions
+        now = self._clock() if self._idle is not None else None
+        if now is not None:
+            result = self._evict_idle(result, now - self._idle)
+            if isinstance(result, Reduced):
+                return result
+
+        partition = partitions.get(k)
+        if partition is None:
+            if self._max_partitions is not None and len(partitions) >= self._max_partitions:
+                result = self._evict(result, next(iter(partitions)))
+                if isinstance(result, Reduced):
+                    return result
+            forwarding = _Tagging(self._reducer, k) if self._tagged else _Forwarding(self._reducer)
+            partition = partitions[k] = [self._transducer(forwarding), forwarding, now]
+            if self._stats is not None:
+                self._stats['partitions'] += 1
+        else:
+            partitions.move_to_end(k)
+            partition[2] = now
+
+        chain, forwarding, _ = partition
+        if chain is None:
+            return result
+        result = chain.step(result, item)
+        if isinstance(result, Reduced):
+            if forwarding.terminated:
+                return result
+            # Only this partition has terminated.
+            partition[0] = None
+            return self._completed(chain, forwarding, result.value)
+        return result
+
+    def complete(self, result):
+        partitions = self._partitions
+        while partitions and not self._terminated:
+            _, (chain, forwarding, _) = partitions.popitem(last=False)
+            if chain is not None:
+                result = self._completed(chain, forwarding, result)
+                if isinstance(result, Reduced):
+                    result = result.value
+                    break
+        partitions.clear()
+        return self._reducer.complete(result)
+
+    def _completed(self, chain, forwarding, result):
+        """Complete a partition's chain, returning Reduced if downstream terminated."""
+        result = chain.complete(result)
+        if isinstance(result, Reduced):
+            result = result.value
+        return Reduced(result) if forwarding.terminated else result
+
+    def _evict(self, result, k):
+        chain, forwarding, _ = self._partitions.pop(k)
+        if self._stats is not None:
+            self._stats['evictions'] += 1
+        return result if chain is None else self._completed(chain, forwarding, result)
+
+    def _evict_idle(self, result, horizon):
+        partitions = self._partitions
+        while partitions:
+            k, (_, _, last_active) = next(iter(partitions.items()))
+            if last_active > horizon:
+                break
+            result = self._evict(result, k)
+            if isinstance(result, Reduced):
+                break
+        return result
+
+
+def partitioning_by(key, transducer, max_partitions=None, idle=None, tagged=False, stats=None, clock=monotonic):
+    """Create a transducer which applies a separate instance of a transducer to the items with each key.
+
+    A chain is created from transducer for each key when an item with that
+    key first arrives, and the items with that key are passed through it.
+    The output of every chain is passed on to the same downstream reducer,
+    as it is produced. A chain which terminates early, by returning Reduced,
+    is completed and receives no further items, while other partitions
+    continue; if the downstream reducer terminates, so does the whole
+    reduction.
+
+    A partition is evicted, by completing its chain and discarding its
+    state, when it is the least recently active partition and the number of
+    partitions would exceed max_partitions, or when no item with its key
+    has arrived for idle seconds. If an item with its key arrives later, a
+    new chain is created for it.
+
+    Args:
+        key: A single-argument function returning the key of an item.
+        transducer: The transducer applied to the items of each partition,
+            such as compose(windowing(3), mapping(sum)).
+        max_partitions: The maximum number of partitions held at once.
+        idle: The number of seconds, according to clock, after which an
+            inactive partition is evicted.
+        tagged: If True, pass on (key, item) pairs for each item produced by
+            a partition's chain, rather than the item alone.
+        stats: An optional dictionary which is updated with the number of
+            'partitions' created and 'evictions'.
+        clock: A function of no arguments returning the time in seconds,
+            used with idle.
+
+    Returns: A partitioning transducer.
+    """
+
+    if max_partitions is not None and max_partitions < 1:
+        raise ValueError("partitioning_by() max_partitions {} is not at least 1".format(max_partitions))
+
+    if idle is not None and idle <= 0:
+        raise ValueError("partitioning_by() idle {} is not positive".format(idle))
+
+    if stats is not None:
+        stats.update(partitions=0, evictions=0)
+
+    def partitioning_by_transducer(reducer):
+        return PartitioningBy(reducer, key, transducer, max_partitions, idle, clock, tagged, stats)
+
+    return partitioning_by_transducer
+
+# ---------------------------------------------------------------------
+
+
+class Sampling(Transducer):
+    """Passes on each item with a fixed probability.
+
+    Rather than drawing a random number for each item, the number of items
+    to skip before the next sampled item is drawn from the geometric
+    distribution, so discarded items cost only a decrement.
+    """
+
+    __slots__ = ('_log_complement', '_random', '_skip')
+
+    def __init__(self, reducer, rate, seed):
+        super().__init__(reducer)
+        self._log_complement = log1p(-rate) if rate < 1 else None
+        self._random = Random(seed)
+        self._skip = self._next_skip()
+
+    def _next_skip(self):
+        if self._log_complement is None:
+            return 0
+        return int(log(1.0 - self._random.random()) / self._log_complement)
+
+    def step(self, result, item):
+        if self._skip:
+            self._skip -= 1
+            return result
+        self._skip = self._next_skip()
+        return self._reducer(result, item)
+
+    def step_batch(self, result, items):
+        sampled = []
+        index = self._skip
+        while index < len(items):
+            sampled.append(items[index])
+            index += 1 + self._next_skip()
+        self._skip = index - len(items)
+        return step_batch(self._reducer, result, sampled)
+
+
+def sampling(rate, seed=None):
+    """Create a transducer which passes on a random sample of items.
+
+    Each item is passed on independently with probability rate. The cost
+    of the randomness is incurred once for each sampled item, rather than
+    once for each item.
+
+    Args:
+        rate: The probability with which each item is passed on, greater
+            than zero and at most one.
+        seed: An optional seed for the random number generator, so that
+            the sample can be reproduced.
+
+    Returns: A sampling transducer.
+    """
+
+    if not 0 < rate <= 1:
+        raise ValueError("sampling() rate {} is not greater than 0 and at most 1".format(rate))
+
+    def sampling_transducer(reducer):
+        return Sampling(reducer, rate, seed)
+
+    return sampling_transducer
+
+
+class _Reservoir:
+    """A uniform random sample of at most k items, using Li's Algorithm L.
+
+    Once the reservoir is full, the number of items to skip before the next
+    replacement is drawn directly, so skipped items cost only a decrement.
+    """
+
+    __slots__ = ('items', '_k', '_random', '_weight', '_skip')
+
+    def __init__(self, k, random):
+        self.items = []
+        self._k = k
+        self._random = random
+        self._weight = 1.0
+        self._skip = 0
+
+    def _advance(self):
+        self._weight *= exp(log(1.0 - self._random.random()) / self._k)
+        self._skip = int(log(1.0 - self._random.random()) / log1p(-self._weight))
+
+    def _replace(self, item):
+        self.items[self._random.randrange(self._k)] = item
+        self._advance()
+
+    def offer(self, item):
+        items = self.items
+        if len(items) < self._k:
+            items.append(item)
+            if len(items) == self._k:
+                self._advance()
+        elif self._skip:
+            self._skip -= 1
+        else:
+            self._replace(item)
+
+    def offer_batch(self, batch):
+        index = 0
+        while index < len(batch) and len(self.items) < self._k:
+            self.offer(batch[index])
+            index += 1
+        if index == len(batch):
+            return
+        index += self._skip
+        while index < len(batch):
+            self._replace(batch[index])
+            index += 1 + self._skip
+        self._skip = index - len(batch)
+
+
+class ReservoirSampling(Transducer):
+
+    __slots__ = ('_reservoir',)
+
+    def __init__(self, reducer, k, seed):
+        super().__init__(reducer)
+        self._reservoir = _Reservoir(k, Random(seed))
+
+    def step(self, result, item):
+        self._reservoir.offer(item)
+        return result
+
+    def step_batch(self, result, items):
+        self._reservoir.offer_batch(items)
+        return result
+
+    def complete(self, result):
+        for item in self._reservoir.items:
+            result = self._reducer.step(result, item)
+            if isinstance(result, Reduced):
+                result = result.value
+                break
+
+        self._reservoir.items.clear()
+
+        return self._reducer.complete(result)
+
+
+def reservoir_sampling(k, seed=None):
+    """Create a transducer which passes on a uniform random sample of k items on completion.
+
+    Every item has an equal chance of being sampled, and at most k items
+    are held. If there are fewer than k items, all are passed on. The
+    sampled items are passed on in no particular order.
+
+    Args:
+        k: The number of items to sample.
+        seed: An optional seed for the random number generator, so that
+            the sample can be reproduced.
+
+    Returns: A reservoir sampling transducer.
+    """
+
+    if k < 1:
+        raise ValueError("reservoir_sampling() k {} is not at least 1".format(k))
+
+    def reservoir_sampling_transducer(reducer):
+        return ReservoirSampling(reducer, k, seed)
+
+    return reservoir_sampling_transducer
+
+
+class SamplingBy(Transducer):
+
+    __slots__ = ('_key', '_k', '_random', '_reservoirs')
+
+    def __init__(self, reducer, key, k, seed):
+        super().__init__(reducer)
+        self._key = key
+        self._k = k
+        self._random = Random(seed)
+        self._reservoirs = {}
+
+    def step(self, result, item):
+        k = self._key(item)
+        reservoir = self._reservoirs.get(k)
+        if reservoir is None:
+            reservoir = self._reservoirs[k] = _Reservoir(self._k, self._random)
+        reservoir.offer(item)
+        return result
+
+    def complete(self, result):
+        for item in chain.from_iterable(reservoir.items for reservoir in self._reservoirs.values()):
+            result = self._reducer.step(result, item)
+            if isinstance(result, Reduced):
+                result = result.value
+                break
+
+        self._reservoirs.clear()
+
+        return self._reducer.complete(result)
+
+
+def sampling_by(key, k, seed=None):
+    """Create a transducer which passes on a uniform random sample of k items with each key on completion.
+
+    The samples are passed on in the order in which their keys first
+    occurred, with the items of each sample in no particular order. At most
+    k items are held for each key.
+
+    Args:
+        key: A single-argument function returning the key, or stratum, of
+            an item.
+        k: The number of items to sample for each key.
+        seed: An optional seed for the random number generator, so that
+            the samples can be reproduced.
+
+    Returns: A stratified sampling transducer.
+    """
+
+    if k < 1:
+        raise ValueError("sampling_by() k {} is not at least 1".format(k))
+
+    def sampling_by_transducer(reducer):
+        return SamplingBy(reducer, key, k, seed)
+
+    return sampling_by_transducer